@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark streamed chat rendering: console.print per chunk vs StreamRenderer
+
+Feeds token-sized deltas through an event loop as fast as they can be drawn,
+the way ChatSession streams a fast local model, and reports chunks rendered
+per second and terminal writes for each mode.
+"""
+
+import argparse
+import asyncio
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rich.console import Console  # noqa: E402
+
+from tokligence.chat.render import StreamRenderer  # noqa: E402
+
+WORDS = ('Set ', 'the ', '`gateway.port` ', 'key ', 'in ', 'config.yaml ', 'to ', '[8081] ',
+         'and ', 'restart ', 'with ', 'tgw ', 'gateway ', 'restart.', '\n')
+
+
+class CountingWriter(io.StringIO):
+    """StringIO that counts write calls (one terminal write each)"""
+
+    writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+def chunks(count):
+    return [WORDS[i % len(WORDS)] for i in range(count)]
+
+
+async def per_chunk(console, deltas):
+    for text in deltas:
+        console.print(text, end='')
+        await asyncio.sleep(0)
+
+
+async def buffered(console, deltas):
+    renderer = StreamRenderer(console.file)
+    for text in deltas:
+        renderer.write(text)
+        await asyncio.sleep(0)
+    renderer.close()
+
+
+def measure(render, deltas):
+    """Return (chunks per second, terminal writes)."""
+    out = CountingWriter()
+    console = Console(file=out, force_terminal=True, color_system='truecolor', width=100)
+    start = time.perf_counter()
+    asyncio.run(render(console, deltas))
+    return len(deltas) / (time.perf_counter() - start), out.writes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--chunks', type=int, default=20000, help='Deltas per run')
+    args = parser.parse_args()
+
+    deltas = chunks(args.chunks)
+    before, before_writes = measure(per_chunk, deltas)
+    after, after_writes = measure(buffered, deltas)
+
+    print(f"{args.chunks} chunks per mode")
+    print(f"console.print   {before:10.0f} chunks/s  {before_writes:6d} writes")
+    print(f"StreamRenderer  {after:10.0f} chunks/s  {after_writes:6d} writes  "
+          f"({after / before:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
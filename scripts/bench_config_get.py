@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark Config.get dotted-key lookups against the previous nested walk
+
+Looks up provider and model settings the way a per-request routing layer
+would, using the indexed Config.get, a ConfigView and the old implementation.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tokligence.config import Config  # noqa: E402
+
+KEYS = [
+    'providers.openai.base_url',
+    'providers.openai.models',
+    'providers.anthropic.enabled',
+    'gateway.auth.enabled',
+    'gateway.logging.level',
+    'providers.missing.base_url',
+]
+
+
+def legacy_get(data, key, default=None):
+    """Config.get as it was before the lookup index."""
+    keys = key.split('.')
+    value = data
+
+    for k in keys:
+        if isinstance(value, dict):
+            value = value.get(k)
+            if value is None:
+                return default
+        else:
+            return default
+
+    return value
+
+
+def measure(lookup, calls):
+    """Return mean time per lookup in nanoseconds."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        for key in KEYS:
+            lookup(key)
+    return (time.perf_counter() - start) / (calls * len(KEYS)) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=200000, help='Rounds over the key set')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = Config(str(Path(tmp) / 'config.yaml'))
+
+    view = config.view('providers')
+    view_keys = {key: key.split('.', 1)[1] for key in KEYS if key.startswith('providers.')}
+
+    legacy = measure(lambda key: legacy_get(config.data, key), args.calls)
+    indexed = measure(config.get, args.calls)
+    viewed = measure(lambda key: view.get(view_keys.get(key, key)), args.calls)
+
+    print(f"{args.calls * len(KEYS)} lookups per mode")
+    print(f"nested walk   {legacy:7.1f} ns/lookup")
+    print(f"Config.get    {indexed:7.1f} ns/lookup  ({legacy / indexed:.1f}x)")
+    print(f"ConfigView    {viewed:7.1f} ns/lookup")
+
+
+if __name__ == '__main__':
+    main()
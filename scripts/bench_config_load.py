@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark Config.load on a large YAML config
+
+Generates a multi-provider config of about --lines lines and compares the
+pure-Python YAML loader, the libyaml C loader and a warm snapshot sidecar.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import yaml  # noqa: E402
+
+from tokligence.config import Config  # noqa: E402
+
+
+def make_config(lines):
+    """Return a config dict whose YAML dump is roughly the given number of lines."""
+    providers = {}
+    i = 0
+    while len(yaml.safe_dump({'providers': providers}).splitlines()) < lines:
+        for j in range(50):
+            providers[f'provider-{i:04d}'] = {
+                'enabled': i % 3 != 0,
+                'api_key': f'sk-{i:08x}',
+                'base_url': f'https://llm-{i}.example.com/v1',
+                'timeout': 30.5,
+                'max_retries': 3,
+                'models': [f'model-{i}-{k}' for k in range(8)],
+                'headers': {'x-team': f'team-{i % 7}', 'x-region': 'eu-west-1'},
+            }
+            i += 1
+    return {'gateway': Config.get_defaults()['gateway'], 'providers': providers}
+
+
+def measure(fn, runs):
+    """Return the median run time in milliseconds."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--lines', type=int, default=5000, help='Approximate config size')
+    parser.add_argument('--runs', type=int, default=20, help='Runs per mode')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['XDG_CONFIG_HOME'] = tmp
+        path = Path(tmp) / 'config.yaml'
+        path.write_text(yaml.safe_dump(make_config(args.lines), default_flow_style=False))
+        # Snapshots are only written for files that have not just been modified
+        os.utime(path, (time.time() - 60, time.time() - 60))
+        text = path.read_text()
+        print(f"{len(text.splitlines())} lines, {len(text) / 1024:.0f} KiB")
+
+        python = measure(lambda: yaml.load(text, Loader=yaml.SafeLoader), args.runs)
+        print(f"yaml SafeLoader (pure Python)  {python:8.2f} ms")
+        if hasattr(yaml, 'CSafeLoader'):
+            c = measure(lambda: yaml.load(text, Loader=yaml.CSafeLoader), args.runs)
+            print(f"yaml CSafeLoader (libyaml)     {c:8.2f} ms  ({python / c:.1f}x)")
+        else:
+            print("yaml CSafeLoader              unavailable (PyYAML built without libyaml)")
+
+        os.environ['TOKLIGENCE_CONFIG_CACHE'] = '0'
+        uncached = measure(lambda: Config(str(path)), args.runs)
+        del os.environ['TOKLIGENCE_CONFIG_CACHE']
+        Config(str(path))  # Write the snapshot
+        cached = measure(lambda: Config(str(path)), args.runs)
+        print(f"Config() without snapshot      {uncached:8.2f} ms")
+        print(f"Config() with snapshot         {cached:8.2f} ms  "
+              f"({python / cached:.0f}x vs pure Python)")
+
+
+if __name__ == '__main__':
+    main()
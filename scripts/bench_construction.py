@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark Gateway construction cost with and without the resolved-binary cache
+
+Uses a fake bundled binary in a temporary directory so it runs without the
+real binaries.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tokligence import utils  # noqa: E402
+from tokligence.gateway import Gateway  # noqa: E402
+
+
+def measure(calls, clear_cache):
+    """Return mean construction time in microseconds."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        if clear_cache:
+            utils.clear_binary_cache()
+            utils.get_platform_info.cache_clear()
+        Gateway()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def count_stats(clear_cache):
+    """Count os.stat/os.chmod calls made by one construction."""
+    calls = {'stat': 0, 'chmod': 0}
+    real_stat, real_chmod = os.stat, os.chmod
+
+    def counting_stat(*args, **kwargs):
+        calls['stat'] += 1
+        return real_stat(*args, **kwargs)
+
+    def counting_chmod(*args, **kwargs):
+        calls['chmod'] += 1
+        return real_chmod(*args, **kwargs)
+
+    if clear_cache:
+        utils.clear_binary_cache()
+    os.stat, os.chmod = counting_stat, counting_chmod
+    try:
+        Gateway()
+    finally:
+        os.stat, os.chmod = real_stat, real_chmod
+    return calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=10000, help='Constructions per mode')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os_name, arch = utils.get_platform_info()
+        suffix = '.exe' if os_name == 'windows' else ''
+        binary = Path(tmp) / f'gateway-{os_name}-{arch}{suffix}'
+        binary.write_text('')
+        binary.chmod(0o755)
+        utils.BINARIES_DIR = Path(tmp)
+
+        cold = measure(args.calls, clear_cache=True)
+        warm = measure(args.calls, clear_cache=False)
+        cold_calls = count_stats(clear_cache=True)
+        warm_calls = count_stats(clear_cache=False)
+
+    print(f"{args.calls} constructions per mode")
+    print(f"uncached  {cold:8.2f} us/construction  syscalls={cold_calls}")
+    print(f"cached    {warm:8.2f} us/construction  syscalls={warm_calls}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-call latency of Gateway commands: one process per call vs persistent worker
+
+Both paths use stand-ins so the benchmark runs without the real binary:
+a tiny shell script for the per-call path and a Python worker speaking the
+line-delimited JSON protocol for the persistent path.
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tokligence.gateway import Gateway  # noqa: E402
+
+USERS_JSON = '[{"id": 1, "username": "alice"}]'
+
+FAKE_BINARY = f"""#!/bin/sh
+echo '{USERS_JSON}'
+"""
+
+FAKE_WORKER = f"""
+from tokligence.worker import serve
+serve(lambda args: (0, '{USERS_JSON}', ''))
+"""
+
+
+def measure(gateway, calls):
+    """Return per-call latencies in milliseconds."""
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        gateway.list_users()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label, samples):
+    """Print a latency summary line."""
+    samples = sorted(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(f"{label:<12} mean={statistics.mean(samples):8.3f} ms  "
+          f"p50={statistics.median(samples):8.3f} ms  p99={p99:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=500, help='Calls per mode')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        binary = Path(tmp) / 'gateway'
+        binary.write_text(FAKE_BINARY)
+        binary.chmod(0o755)
+        worker = Path(tmp) / 'worker.py'
+        worker.write_text(FAKE_WORKER)
+
+        subprocess_samples = measure(Gateway(binary_path=str(binary)), args.calls)
+
+        with Gateway(binary_path=str(binary), persistent=True,
+                     worker_command=[sys.executable, str(worker)]) as gateway:
+            gateway.list_users()  # exclude worker startup from the samples
+            worker_samples = measure(gateway, args.calls)
+
+    print(f"{args.calls} calls per mode")
+    report('subprocess', subprocess_samples)
+    report('worker', worker_samples)
+    speedup = statistics.mean(subprocess_samples) / statistics.mean(worker_samples)
+    print(f"speedup      {speedup:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
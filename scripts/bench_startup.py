@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark tgw CLI startup time
+
+Reports the cumulative import time of tokligence.cli (via python -X importtime)
+and the wall-clock time of `tgw version`. Exits non-zero when the median import
+time exceeds the regression budget.
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that `tgw version` must not load
+HEAVY_MODULES = ('rich', 'yaml', 'asyncio', 'tokligence.gateway', 'tokligence.daemon',
+                 'tokligence.config')
+
+
+def import_time_ms():
+    """Return the cumulative import time of tokligence.cli in milliseconds."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import tokligence.cli'],
+        capture_output=True, text=True, cwd=ROOT, check=True
+    )
+    for line in result.stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \| tokligence\.cli$', line)
+        if match:
+            return int(match.group(1)) / 1000
+    raise RuntimeError('tokligence.cli not found in -X importtime output')
+
+
+def version_wall_ms():
+    """Return the wall-clock time of `tgw version` in milliseconds."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-m', 'tokligence.cli', 'version'],
+                   capture_output=True, cwd=ROOT, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def loaded_heavy_modules():
+    """Return heavy modules that are loaded by importing the CLI."""
+    code = (
+        'import sys, tokligence.cli; '
+        f'print(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))'
+    )
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                            text=True, cwd=ROOT, check=True)
+    return [m for m in result.stdout.strip().split(',') if m]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=10, help='Number of runs')
+    parser.add_argument('--budget-ms', type=float, default=100.0,
+                        help='Maximum median import time of tokligence.cli')
+    args = parser.parse_args()
+
+    imports = [import_time_ms() for _ in range(args.runs)]
+    walls = [version_wall_ms() for _ in range(args.runs)]
+    heavy = loaded_heavy_modules()
+
+    print(f"import tokligence.cli  median={statistics.median(imports):7.1f} ms  "
+          f"min={min(imports):7.1f} ms")
+    print(f"tgw version (wall)     median={statistics.median(walls):7.1f} ms  "
+          f"min={min(walls):7.1f} ms")
+    print(f"heavy modules loaded   {', '.join(heavy) or 'none'}")
+
+    if heavy or statistics.median(imports) > args.budget_ms:
+        print(f"FAIL: startup budget of {args.budget_ms:.0f} ms exceeded or heavy modules loaded")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Tests for chat client stream normalization
+"""
+
+import json
+from types import SimpleNamespace as NS
+
+import pytest
+from tokligence.chat.client import (
+    Finish,
+    MessageAccumulator,
+    TextDelta,
+    ToolCallDelta,
+    stream_events,
+)
+from tokligence.chat.detector import Endpoint
+
+
+def endpoint(type_):
+    return Endpoint(type_, type_, 'http://localhost', True)
+
+
+async def aiter(items):
+    for item in items:
+        yield item
+
+
+async def collect(type_, chunks):
+    return [event async for event in stream_events(endpoint(type_), aiter(chunks))]
+
+
+def openai_chunk(content=None, tool_calls=None, finish_reason=None):
+    delta = NS(content=content, tool_calls=tool_calls)
+    return NS(choices=[NS(delta=delta, finish_reason=finish_reason)])
+
+
+def openai_tool(index, id=None, name=None, arguments=None):
+    return NS(index=index, id=id, function=NS(name=name, arguments=arguments))
+
+
+@pytest.mark.asyncio
+async def test_openai_stream_events():
+    """Test OpenAI chunks become text, tool-call and finish events"""
+    events = await collect('openai', [
+        NS(choices=[]),
+        openai_chunk('Let me '),
+        openai_chunk('check.'),
+        openai_chunk(tool_calls=[openai_tool(0, 'call_1', 'get_status', '{"ver')]),
+        openai_chunk(tool_calls=[openai_tool(0, arguments='bose": true}')]),
+        openai_chunk(finish_reason='tool_calls'),
+    ])
+    assert events == [
+        TextDelta('Let me '),
+        TextDelta('check.'),
+        ToolCallDelta(0, 'call_1', 'get_status', '{"ver'),
+        ToolCallDelta(0, None, None, 'bose": true}'),
+        Finish('tool_calls'),
+    ]
+
+    # A stream that ends without a finish reason still finishes
+    assert await collect('ollama', [openai_chunk('hi')]) == [TextDelta('hi'), Finish('stop')]
+
+
+@pytest.mark.asyncio
+async def test_anthropic_stream_events():
+    """Test Anthropic events map tool input deltas onto the right tool call"""
+    events = await collect('anthropic', [
+        NS(type='message_start'),
+        NS(type='content_block_start', index=0, content_block=NS(type='text')),
+        NS(type='content_block_delta', index=0, delta=NS(type='text_delta', text='Checking')),
+        NS(type='content_block_start', index=1,
+           content_block=NS(type='tool_use', id='toolu_1', name='get_config')),
+        NS(type='content_block_delta', index=1,
+           delta=NS(type='input_json_delta', partial_json='{"key"')),
+        NS(type='content_block_delta', index=1,
+           delta=NS(type='input_json_delta', partial_json=': "x"}')),
+        NS(type='message_delta', delta=NS(stop_reason='tool_use')),
+        NS(type='message_stop'),
+    ])
+    assert events == [
+        TextDelta('Checking'),
+        ToolCallDelta(0, 'toolu_1', 'get_config'),
+        ToolCallDelta(0, arguments='{"key"'),
+        ToolCallDelta(0, arguments=': "x"}'),
+        Finish('tool_calls'),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_google_stream_events():
+    """Test Gemini chunks, including function-call chunks without text"""
+    class CallOnly:
+        function_calls = [NS(name='get_status', args={'verbose': True})]
+
+        @property
+        def text(self):
+            raise ValueError('no text part')
+
+    events = await collect('google', [NS(text='Sure. ', function_calls=None), CallOnly()])
+    assert events == [
+        TextDelta('Sure. '),
+        ToolCallDelta(0, 'google_0', 'get_status', json.dumps({'verbose': True})),
+        Finish('tool_calls'),
+    ]
+
+
+def test_message_accumulator():
+    """Test events are joined into an assistant message"""
+    reply = MessageAccumulator()
+    for event in [
+        TextDelta('a' * 3), TextDelta('b'),
+        ToolCallDelta(1, 'call_2', 'second', '{}'),
+        ToolCallDelta(0, 'call_1', 'first', '{"x"'),
+        ToolCallDelta(0, arguments=': 1}'),
+        Finish('tool_calls'),
+    ]:
+        reply.add(event)
+
+    assert reply.finish_reason == 'tool_calls'
+    assert reply.message() == {
+        'role': 'assistant',
+        'content': 'aaab',
+        'tool_calls': [
+            {'id': 'call_1', 'type': 'function',
+             'function': {'name': 'first', 'arguments': '{"x": 1}'}},
+            {'id': 'call_2', 'type': 'function', 'function': {'name': 'second', 'arguments': '{}'}},
+        ],
+    }
+
+    empty = MessageAccumulator()
+    empty.add(Finish('stop'))
+    assert empty.message() == {'role': 'assistant', 'content': None}
@@ -0,0 +1,125 @@
+"""
+Tests for token-budgeted chat history compaction
+"""
+
+import json
+
+import pytest
+import tokligence.chat.session as session_module
+from tokligence.chat.context import ContextBudget, estimate_tokens, message_tokens
+from tokligence.chat.detector import Endpoint
+from tokligence.chat.session import ChatSession
+
+
+def turn(question, answer, doc_chars=0):
+    """A user turn; with doc_chars, the answer follows a get_doc tool result that long"""
+    messages = [{'role': 'user', 'content': question}]
+    if doc_chars:
+        messages += [
+            {'role': 'assistant', 'content': None, 'tool_calls': [
+                {'id': 'call_1', 'type': 'function',
+                 'function': {'name': 'get_doc', 'arguments': '{"name": "README"}'}}]},
+            {'role': 'tool', 'tool_call_id': 'call_1', 'name': 'get_doc',
+             'content': json.dumps({'content': 'x' * doc_chars})},
+        ]
+    return messages + [{'role': 'assistant', 'content': answer}]
+
+
+def history(*turns):
+    messages = [{'role': 'system', 'content': 'system prompt'}]
+    for t in turns:
+        messages += t
+    return messages
+
+
+def test_estimate_tokens():
+    """Test token estimates from text length, tool calls included"""
+    assert estimate_tokens(None) == 0
+    assert estimate_tokens('abcd') == 1 and estimate_tokens('abcde') == 2
+    tool_call = turn('q', 'a', doc_chars=10)[1]
+    assert message_tokens(tool_call) == (
+        4 + estimate_tokens('get_doc') + estimate_tokens('{"name": "README"}'))
+
+
+def test_history_within_budget_is_untouched():
+    """Test a history under budget is returned as is and its size reported"""
+    budget = ContextBudget(1000)
+    messages = history(turn('hi', 'hello'))
+    assert budget.compact(messages) is messages
+    assert budget.last_report == {'tokens': budget.count(messages), 'messages': 3,
+                                  'budget': 1000, 'truncated': 0, 'summarized': 0}
+
+    unlimited = ContextBudget(0)
+    big = history(turn('q', 'a', doc_chars=100000))
+    assert unlimited.compact(big) is big and unlimited.last_report['budget'] is None
+
+
+def test_old_tool_results_are_truncated_first():
+    """Test long tool results of older turns are cut before any turn is dropped"""
+    budget = ContextBudget(1500, keep_turns=2, tool_result_chars=200)
+    messages = history(turn('read the guide', 'done', doc_chars=8000),
+                       turn('and now?', 'ok'), turn('last', 'bye'))
+    original = json.dumps(messages)
+
+    compacted = budget.compact(messages)
+    assert json.dumps(messages) == original  # input not modified
+    assert len(compacted) == len(messages)
+    assert '[truncated' in compacted[3]['content'] and len(compacted[3]['content']) < 300
+    assert budget.last_report['truncated'] == 1 and budget.last_report['summarized'] == 0
+    assert budget.last_report['tokens'] <= 1500
+
+
+def test_old_turns_are_summarized_into_system_prompt():
+    """Test turns over budget are dropped, summarized and recent turns kept verbatim"""
+    budget = ContextBudget(300, keep_turns=2)
+    old = [turn(f'question {i} ' + 'q' * 200, f'answer {i} ' + 'a' * 200) for i in range(4)]
+    messages = history(*old)
+
+    compacted = budget.compact(messages)
+    assert compacted[0]['role'] == 'system'
+    assert compacted[0]['content'].startswith('system prompt\n\nEarlier in this conversation')
+    assert '- User: question 0' in compacted[0]['content']
+    assert compacted[1:] == old[2] + old[3]
+    assert budget.last_report['summarized'] == 2
+
+    # Later compactions extend the summary of the original prompt
+    compacted = budget.compact(compacted + turn('next ' + 'n' * 400, 'fine'))
+    assert compacted[0]['content'].count('- User:') == 3
+    assert compacted[0]['content'].count('system prompt') == 1
+
+
+def test_current_turn_tool_results_truncated_as_last_resort():
+    """Test a single oversized turn keeps its messages with the tool result cut"""
+    budget = ContextBudget(500, tool_result_chars=100)
+    compacted = budget.compact(history(turn('read everything', 'ok', doc_chars=20000)))
+    assert [m['role'] for m in compacted] == ['system', 'user', 'assistant', 'tool', 'assistant']
+    assert budget.last_report['truncated'] == 1 and budget.last_report['tokens'] < 500
+
+
+@pytest.mark.asyncio
+async def test_session_compacts_history_before_each_request(monkeypatch):
+    """Test ChatSession sends a compacted history"""
+    class Knowledge:
+        def build_system_prompt(self):
+            return 'system prompt'
+
+    sent = []
+
+    async def fake_streaming_chat(client, endpoint, model, messages, options):
+        sent.append(list(messages))
+
+        async def stream():
+            from types import SimpleNamespace as NS
+            yield NS(choices=[NS(delta=NS(content='ok', tool_calls=None), finish_reason='stop')])
+        return stream()
+
+    monkeypatch.setattr(session_module, 'create_streaming_chat', fake_streaming_chat)
+    endpoint = Endpoint('Local', 'openai', 'http://127.0.0.1:1/v1', True, local=True)
+    session = ChatSession(endpoint, object(), 'm', Knowledge(), context_budget=200)
+    for i in range(5):
+        session.messages.append({'role': 'user', 'content': f'question {i} ' + 'q' * 300})
+        await session.get_response()
+
+    assert session.context.last_report['summarized'] > 0
+    assert len(sent[-1]) < 1 + 2 * 5
+    assert 'Earlier in this conversation' in sent[-1][0]['content']
@@ -3,10 +3,64 @@ Tests for chat LLM detector module
 """
 
 import pytest
+import json
 import os
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from tokligence.chat.detector import LLMDetector, Endpoint, select_endpoint
 
 
+@pytest.fixture(autouse=True)
+def isolated_config_dir(tmp_path, monkeypatch):
+    """Keep the endpoint cache out of the real config directory"""
+    monkeypatch.setenv('XDG_CONFIG_HOME', str(tmp_path / 'config'))
+    monkeypatch.setenv('HOME', str(tmp_path))
+    return tmp_path / 'config'
+
+
+def closed_port():
+    """Return a local port nothing listens on"""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class FakeOllama(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/v1/models':
+            body = json.dumps({'data': [{'id': 'mistral-7b'}]}).encode()
+        else:
+            body = json.dumps({'models': [{'name': 'qwen2.5:7b'}, {'name': 'llama3.2'}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_servers(monkeypatch):
+    """Serve a fake Ollama; vLLM and LM Studio point at closed ports"""
+    server = HTTPServer(('127.0.0.1', 0), FakeOllama)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv('OLLAMA_BASE_URL', f'http://127.0.0.1:{server.server_port}')
+    monkeypatch.setenv('VLLM_BASE_URL', f'http://127.0.0.1:{closed_port()}')
+    monkeypatch.setenv('LM_STUDIO_BASE_URL', f'http://127.0.0.1:{closed_port()}')
+    for name in ('TOKLIGENCE_OPENAI_API_KEY', 'OPENAI_API_KEY',
+                 'TOKLIGENCE_ANTHROPIC_API_KEY', 'ANTHROPIC_API_KEY',
+                 'TOKLIGENCE_GOOGLE_API_KEY', 'GOOGLE_API_KEY', 'GEMINI_API_KEY'):
+        monkeypatch.delenv(name, raising=False)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
 @pytest.mark.asyncio
 async def test_detector_init():
     """Test LLMDetector initialization"""
@@ -145,3 +199,177 @@ async def test_select_endpoint_no_endpoints():
 
     with pytest.raises(RuntimeError, match="No LLM endpoints available"):
         await select_endpoint(detector)
+
+
+@pytest.mark.asyncio
+async def test_detect_all_caches_local_probes(local_servers, isolated_config_dir):
+    """Test local probe results are cached and served while fresh, then refreshed"""
+    detector = LLMDetector()
+    await detector.detect_all()
+    assert not detector.from_cache
+    [ollama] = detector.endpoints
+    assert ollama.type == 'ollama'
+    assert ollama.models == ['qwen2.5:7b', 'llama3.2']
+    assert ollama.default_model == 'qwen2.5:7b'
+    assert ollama.latency_ms is not None
+
+    cache_file = isolated_config_dir / 'tokligence' / 'cache' / 'endpoints.json'
+    assert json.loads(cache_file.read_text())['endpoints'][0]['base_url'] == ollama.base_url
+
+    # The server goes away: the cached result is returned at once, then refreshed
+    local_servers.shutdown()
+    local_servers.server_close()
+    detector = LLMDetector()
+    await detector.detect_all()
+    assert detector.from_cache
+    assert detector.endpoints == [ollama]
+    assert detector.wait_refresh(timeout=10)
+    assert detector.endpoints == []
+    assert json.loads(cache_file.read_text())['endpoints'] == []
+
+    # A cached "nothing found" is not trusted when there is nothing else to use
+    server = HTTPServer(('127.0.0.1', local_servers.server_port), FakeOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        detector = LLMDetector()
+        await detector.detect_all()
+        assert not detector.from_cache
+        assert [e.type for e in detector.endpoints] == ['ollama']
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_detect_cache_invalidation(local_servers, monkeypatch):
+    """Test expired caches, changed targets and rescans probe again"""
+    await LLMDetector().detect_all()
+
+    detector = LLMDetector(cache_ttl=0)
+    await detector.detect_all()
+    assert not detector.from_cache
+
+    detector = LLMDetector()
+    await detector.detect_all(use_cache=False)
+    assert not detector.from_cache
+
+    monkeypatch.setenv('VLLM_BASE_URL', f'http://127.0.0.1:{closed_port()}')
+    detector = LLMDetector()
+    await detector.detect_all()
+    assert not detector.from_cache
+    assert [e.type for e in detector.endpoints] == ['ollama']
+
+
+@pytest.mark.asyncio
+async def test_probes_share_client_and_cancel_hung_servers(local_servers, monkeypatch):
+    """Test probes share one client, slow servers are still found and a hung one is cut off"""
+    import httpx
+
+    # Accepts connections (via the backlog) but never answers
+    hung = socket.socket()
+    hung.bind(('127.0.0.1', 0))
+    hung.listen(8)
+    monkeypatch.setenv('VLLM_BASE_URL', f'http://127.0.0.1:{hung.getsockname()[1]}')
+
+    clients = []
+    real_client = httpx.AsyncClient
+
+    def counting_client(*args, **kwargs):
+        clients.append(kwargs)
+        return real_client(*args, **kwargs)
+    monkeypatch.setattr(httpx, 'AsyncClient', counting_client)
+
+    # A second server that only answers after a cold start
+    class SlowServer(FakeOllama):
+        def do_GET(self):
+            time.sleep(0.5)
+            super().do_GET()
+
+    slow = HTTPServer(('127.0.0.1', 0), SlowServer)
+    threading.Thread(target=slow.serve_forever, daemon=True).start()
+
+    port = local_servers.server_port
+    monkeypatch.setenv('TOKLIGENCE_CHAT_ENDPOINTS', f'http://127.0.0.1:{port}/v1/, '
+                       f'http://127.0.0.1:{closed_port()}/v1, '
+                       f'http://localhost:{slow.server_port}/v1')
+    detector = LLMDetector(cache_ttl=0, probe_timeout=1.5)
+    assert detector.extra_targets[0] == f'http://127.0.0.1:{port}/v1'
+
+    started = time.perf_counter()
+    try:
+        await detector.detect_all()
+    finally:
+        elapsed = time.perf_counter() - started
+        hung.close()
+        slow.shutdown()
+        slow.server_close()
+
+    assert len(clients) == 1
+    assert elapsed < 2.5
+    assert sorted((e.name, e.priority, e.models) for e in detector.endpoints) == [
+        ('Ollama (Local)', 80, ['qwen2.5:7b', 'llama3.2']),
+        ('OpenAI-compatible (127.0.0.1)', 85, ['mistral-7b']),
+        ('OpenAI-compatible (localhost)', 83, ['mistral-7b']),
+    ]
+    assert all(e.local for e in detector.endpoints)
+    assert [e.probed_unauthenticated for e in sorted(detector.endpoints, key=lambda e: e.name)] == [
+        False, True, True]
+
+
+def test_endpoint_latency_ewma_and_ranking():
+    """Test latency averages and ranking by latency band, then priority"""
+    from tokligence.chat.detector import rank_key
+
+    endpoint = Endpoint('Ollama (Local)', 'ollama', 'http://localhost:11434', True, priority=80)
+    endpoint.record_latency(100.0)
+    endpoint.record_latency(200.0, alpha=0.5)
+    assert endpoint.stats()['latency_ewma_ms'] == 150.0
+    assert endpoint.stats()['latency_samples'] == 2
+    assert endpoint.score_ms == 150.0
+    endpoint.record_ttft(900.0)
+    assert endpoint.score_ms == 900.0
+
+    remote = Endpoint('OpenAI API', 'openai', 'https://api.openai.com/v1', True, priority=100)
+    fast = Endpoint('vLLM (Local)', 'openai', 'http://localhost:8000/v1', True, priority=70)
+    unmeasured = Endpoint('Anthropic API', 'anthropic', 'https://api.anthropic.com', True,
+                          priority=95)
+    remote.record_latency(120.0)
+    fast.record_latency(3.0)
+    assert sorted([unmeasured, remote, fast], key=rank_key) == [fast, remote, unmeasured]
+
+    # Within one latency band the static priority decides
+    fast.record_latency(130.0, alpha=1.0)
+    assert sorted([fast, remote], key=rank_key) == [remote, fast]
+
+
+@pytest.mark.asyncio
+async def test_measure_ranks_by_ttft_and_persists_stats(local_servers, monkeypatch):
+    """Test measure() samples TTFT, re-ranks and keeps averages across runs"""
+    import tokligence.chat.detector as detector_module
+
+    port = local_servers.server_port
+    monkeypatch.setenv('TOKLIGENCE_OPENAI_API_KEY', 'sk-test')
+    monkeypatch.setenv('TOKLIGENCE_OPENAI_BASE_URL', f'http://127.0.0.1:{port}/v1')
+
+    detector = LLMDetector()
+    await detector.detect_all()
+    # Only the probed local server has a latency yet
+    assert [e.type for e in detector.endpoints] == ['ollama', 'openai']
+
+    ttft = {'ollama': 2500.0, 'openai': 300.0}
+
+    async def fake_ttft(endpoint):
+        return ttft[endpoint.type]
+    monkeypatch.setattr(detector_module, '_sample_ttft', fake_ttft)
+
+    await detector.measure(ttft=True)
+    assert [e.type for e in detector.endpoints] == ['openai', 'ollama']
+    remote = detector.endpoints[0]
+    assert remote.latency_samples == 1 and remote.ttft_ewma_ms == 300.0
+
+    # A new run restores the averages from the cache
+    detector = LLMDetector()
+    await detector.detect_all(use_cache=False)
+    assert [e.type for e in detector.endpoints] == ['openai', 'ollama']
+    assert detector.endpoints[0].ttft_samples == 1
+    assert detector.endpoints[1].latency_samples == 3
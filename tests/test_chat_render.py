@@ -0,0 +1,52 @@
+"""
+Tests for buffered rendering of streamed chat text
+"""
+
+import asyncio
+import io
+
+import pytest
+from tokligence.chat.render import StreamRenderer
+
+
+class CountingWriter(io.StringIO):
+    writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+@pytest.mark.asyncio
+async def test_deltas_are_coalesced_per_frame():
+    """Test deltas within a frame become one write and the timer flushes the rest"""
+    out = CountingWriter()
+    renderer = StreamRenderer(out, fps=20)
+
+    renderer.write('a')  # first write opens the frame
+    for text in ('b', 'c', '[bold]d[/bold]'):
+        renderer.write(text)
+    assert out.getvalue() == 'a'
+
+    await asyncio.sleep(0.1)
+    assert out.getvalue() == 'abc[bold]d[/bold]'
+    assert out.writes == 2 and renderer.flushes == 2
+
+    renderer.write('e')
+    renderer.write('f\n')  # newline flushes at once
+    assert out.getvalue().endswith('ef\n')
+
+
+def test_close_flushes_and_reports_stats():
+    """Test close() writes what is left, without an event loop"""
+    out = io.StringIO()
+    renderer = StreamRenderer(out, fps=1)
+    for text in ('one ', 'two ', 'three', ''):
+        renderer.write(text)
+    assert out.getvalue() == 'one '
+
+    renderer.close()
+    assert out.getvalue() == 'one two three'
+    stats = renderer.stats()
+    assert stats['chunks'] == 3 and stats['chars'] == 13 and stats['flushes'] == 2
+    assert stats['chunks_per_second'] > 0
@@ -0,0 +1,300 @@
+"""
+Tests for chat session failover, hedging and endpoint health monitoring
+"""
+
+import asyncio
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from types import SimpleNamespace
+
+import pytest
+import tokligence.chat.session as session_module
+from tokligence.chat.detector import Endpoint, LLMDetector
+from tokligence.chat.health import HealthMonitor
+from tokligence.chat.session import ChatSession
+
+
+class FakeKnowledge:
+    def build_system_prompt(self):
+        return 'system prompt'
+
+
+def make_detector(*endpoints):
+    detector = LLMDetector(cache_ttl=0)
+    detector.endpoints = list(endpoints)
+    return detector
+
+
+def openai_chunks(text):
+    """Fake OpenAI streaming chunks: one text delta, then stop"""
+    async def stream():
+        delta = SimpleNamespace(content=text, tool_calls=None)
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=None)])
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=None, finish_reason='stop')])
+    return stream()
+
+
+@pytest.fixture
+def endpoints():
+    primary = Endpoint('vLLM (Local)', 'openai', 'http://127.0.0.1:1/v1', True, local=True,
+                       default_model='primary-model', priority=70)
+    backup = Endpoint('LM Studio (Local)', 'openai', 'http://127.0.0.1:2/v1', True, local=True,
+                      default_model='backup-model', priority=60)
+    return primary, backup
+
+
+@pytest.mark.asyncio
+async def test_failover_keeps_history(endpoints, monkeypatch):
+    """Test a failing endpoint is replaced mid-turn and the history is kept"""
+    primary, backup = endpoints
+    calls = []
+
+    async def fake_streaming_chat(client, endpoint, model, messages, options):
+        calls.append((endpoint.name, model, len(messages)))
+        if endpoint is primary:
+            raise ConnectionError('connection refused')
+        return openai_chunks('hello from backup')
+
+    monkeypatch.setattr(session_module, 'create_streaming_chat', fake_streaming_chat)
+    monkeypatch.setattr(session_module, 'create_client', lambda endpoint: f'client:{endpoint.name}')
+
+    session = ChatSession(primary, 'client:primary', 'primary-model', FakeKnowledge(),
+                          detector=make_detector(primary, backup))
+    session.messages.append({'role': 'user', 'content': 'hi'})
+    await session.get_response()
+
+    assert calls == [('vLLM (Local)', 'primary-model', 2), ('LM Studio (Local)', 'backup-model', 2)]
+    assert session.endpoint is backup
+    assert session.client == 'client:LM Studio (Local)'
+    assert [m['role'] for m in session.messages] == ['system', 'user', 'assistant']
+    assert session.messages[-1]['content'] == 'hello from backup'
+
+
+@pytest.mark.asyncio
+async def test_failover_gives_up_when_all_fail(endpoints, monkeypatch):
+    """Test the error surfaces once every endpoint has failed"""
+    primary, backup = endpoints
+
+    async def failing_streaming_chat(client, endpoint, model, messages, options):
+        raise ConnectionError(endpoint.name)
+
+    monkeypatch.setattr(session_module, 'create_streaming_chat', failing_streaming_chat)
+    monkeypatch.setattr(session_module, 'create_client', lambda endpoint: object())
+
+    session = ChatSession(primary, None, 'primary-model', FakeKnowledge(),
+                          detector=make_detector(primary, backup))
+    with pytest.raises(ConnectionError, match='LM Studio'):
+        await session.get_response()
+
+    # Without a detector there is nothing to fail over to
+    session = ChatSession(primary, None, 'primary-model', FakeKnowledge())
+    with pytest.raises(ConnectionError, match='vLLM'):
+        await session.get_response()
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(404)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_health_monitor_marks_endpoints(monkeypatch):
+    """Test probes mark unreachable endpoints down and sessions leave them"""
+    server = HTTPServer(('127.0.0.1', 0), OkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        closed = s.getsockname()[1]
+
+    down = Endpoint('Down', 'openai', f'http://127.0.0.1:{closed}/v1', True, priority=90)
+    up = Endpoint('Up', 'openai', f'http://127.0.0.1:{server.server_port}/v1', True, priority=80)
+    detector = make_detector(down, up)
+    monitor = HealthMonitor(detector, failure_threshold=2)
+
+    try:
+        await monitor.check()
+        assert monitor.is_healthy(down)
+        await monitor.check()
+        assert not monitor.is_healthy(down)
+        assert monitor.healthy_endpoints() == [up]
+        assert up.latency_samples == 2
+
+        async def fake_streaming_chat(client, endpoint, model, messages, options):
+            assert endpoint is up
+            return openai_chunks('ok')
+
+        monkeypatch.setattr(session_module, 'create_streaming_chat', fake_streaming_chat)
+        monkeypatch.setattr(session_module, 'create_client', lambda endpoint: object())
+        session = ChatSession(down, None, 'm', FakeKnowledge(), detector=detector, monitor=monitor)
+        await session.get_response()
+        assert session.endpoint is up
+
+        # A single successful probe brings an endpoint back
+        monitor.report_success(down)
+        assert monitor.healthy_endpoints() == [down, up]
+
+        monitor.interval = 0.05
+        monitor.start()
+        monitor.stop(timeout=5)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_health_monitor_5xx_and_probation():
+    """Test 5xx answers count as failures and a failed endpoint needs several good probes"""
+    class StatusHandler(OkHandler):
+        status = 503
+
+        def do_GET(self):
+            self.send_response(StatusHandler.status)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+    server = HTTPServer(('127.0.0.1', 0), StatusHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = Endpoint('Flaky', 'openai', f'http://127.0.0.1:{server.server_port}/v1', True)
+    monitor = HealthMonitor(make_detector(endpoint), failure_threshold=2)
+
+    try:
+        await monitor.check()
+        await monitor.check()
+        assert not monitor.is_healthy(endpoint)
+        assert endpoint.latency_samples == 0
+
+        # Back up, but a request just failed on it: one good probe is not enough
+        StatusHandler.status = 404
+        await monitor.check()
+        assert monitor.is_healthy(endpoint)
+        monitor.report_failure(endpoint)
+        await monitor.check()
+        assert not monitor.is_healthy(endpoint)
+
+        # A failed probe restarts the count
+        StatusHandler.status = 500
+        await monitor.check()
+        StatusHandler.status = 200
+        await monitor.check()
+        assert not monitor.is_healthy(endpoint)
+        await monitor.check()
+        assert monitor.is_healthy(endpoint)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class FakeStream:
+    """Async stream that waits before each chunk and records whether it was closed"""
+
+    def __init__(self, chunks, delay=0.0):
+        self.chunks = list(chunks)
+        self.delay = delay
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(self.delay)
+        if not self.chunks:
+            raise StopAsyncIteration
+        return self.chunks.pop(0)
+
+    async def close(self):
+        self.closed = True
+
+
+def hedging_setup(monkeypatch, behaviour):
+    """Patch create_streaming_chat with per-endpoint behaviour: a FakeStream or an exception"""
+    import tokligence.chat.client as client_module
+    started = []
+
+    async def fake_streaming_chat(client, endpoint, model, messages, options):
+        started.append(endpoint.name)
+        result = behaviour[endpoint.name]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(client_module, 'create_streaming_chat', fake_streaming_chat)
+    return started
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_uses_first_to_stream(endpoints, monkeypatch):
+    """Test a slow primary is hedged, the backup wins and the primary is closed"""
+    from tokligence.chat.client import create_hedged_streaming_chat
+
+    primary, backup = endpoints
+    slow, fast = FakeStream(['p1', 'p2'], delay=1.0), FakeStream(['b1', 'b2'], delay=0.01)
+    started = hedging_setup(monkeypatch, {primary.name: slow, backup.name: fast})
+
+    endpoint, client, model, stream = await create_hedged_streaming_chat(
+        [(primary, 'pc', 'pm'), (backup, 'bc', 'bm')], [], hedge_delay=0.05
+    )
+    assert (endpoint, client, model) == (backup, 'bc', 'bm')
+    assert [chunk async for chunk in stream] == ['b1', 'b2']
+    assert started == [primary.name, backup.name]
+    assert slow.closed and not fast.closed
+    assert backup.ttft_samples == 1 and primary.ttft_samples == 0
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_fast_primary_and_errors(endpoints, monkeypatch):
+    """Test no hedge is sent for a fast primary and a failing primary hedges at once"""
+    from tokligence.chat.client import create_hedged_streaming_chat
+
+    primary, backup = endpoints
+    started = hedging_setup(monkeypatch, {primary.name: FakeStream(['p1']),
+                                          backup.name: FakeStream(['b1'])})
+    endpoint, _, _, stream = await create_hedged_streaming_chat(
+        [(primary, None, 'pm'), (backup, None, 'bm')], [], hedge_delay=5.0
+    )
+    assert endpoint is primary and [c async for c in stream] == ['p1']
+    assert started == [primary.name]
+
+    started = hedging_setup(monkeypatch, {primary.name: ConnectionError('down'),
+                                          backup.name: FakeStream(['b1'])})
+    loop = asyncio.get_running_loop()
+    begin = loop.time()
+    endpoint, _, _, stream = await create_hedged_streaming_chat(
+        [(primary, None, 'pm'), (backup, None, 'bm')], [], hedge_delay=5.0
+    )
+    assert endpoint is backup and loop.time() - begin < 1.0
+
+    hedging_setup(monkeypatch, {primary.name: ConnectionError('primary down'),
+                                backup.name: ConnectionError('backup down')})
+    with pytest.raises(ConnectionError):
+        await create_hedged_streaming_chat(
+            [(primary, None, 'pm'), (backup, None, 'bm')], [], hedge_delay=0.01
+        )
+
+
+@pytest.mark.asyncio
+async def test_session_hedges_with_next_best_endpoint(endpoints, monkeypatch):
+    """Test ChatSession answers from the hedge when the current endpoint stalls"""
+    primary, backup = endpoints
+
+    def chunk(text, finish=None):
+        delta = SimpleNamespace(content=text, tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=finish)])
+
+    stalled = FakeStream([chunk('late')], delay=2.0)
+    hedging_setup(monkeypatch, {primary.name: stalled,
+                                backup.name: FakeStream([chunk('quick'), chunk(None, 'stop')])})
+    monkeypatch.setattr(session_module, 'create_client', lambda endpoint: object())
+
+    session = ChatSession(primary, object(), 'pm', FakeKnowledge(),
+                          detector=make_detector(primary, backup), hedge_delay=0.05)
+    session.messages.append({'role': 'user', 'content': 'hi'})
+    await session.get_response()
+    assert session.messages[-1]['content'] == 'quick'
+    assert session.endpoint is primary
+    assert stalled.closed
@@ -9,6 +9,7 @@ from tokligence.chat.tools import (
     get_platform_info,
     TOOLS,
     execute_tool,
+    execute_tool_calls,
     parse_tool_calls
 )
 from tokligence.utils import find_available_binary
@@ -140,6 +141,90 @@ async def test_execute_tool_unknown():
     assert 'Unknown tool' in result['message']
 
 
+@pytest.mark.asyncio
+async def test_execute_tool_set_config_validates():
+    """Test set_config rejects values that do not match the settings schema"""
+    result = await execute_tool('set_config', {'key': 'work_mode', 'value': 'turbo'})
+    assert not result['success']
+    assert 'auto, passthrough, translation' in result['message']
+
+    result = await execute_tool('set_config', {'key': 'email', 'value': 'not-an-email'})
+    assert not result['success']
+    assert 'not-an-email' not in result['message']
+
+    result = await execute_tool('set_config', {'key': 'auth_disabled', 'value': 'true'})
+    assert result['success']
+
+
+@pytest.mark.asyncio
+async def test_execute_tool_calls_runs_read_only_calls_concurrently(monkeypatch):
+    """Test read-only calls overlap, state changes run alone and results keep their order"""
+    import asyncio
+    import json
+    import tokligence.chat.tools as tools_module
+
+    delays = {'search_docs': 0.2, 'get_doc': 0.1, 'get_status': 0.05, 'stop_gateway': 0.05}
+    running = set()
+    log = []
+
+    async def fake_execute_tool(name, args):
+        running.add(name)
+        log.append((name, sorted(running)))
+        await asyncio.sleep(delays.get(name, 5.0))
+        running.discard(name)
+        return {'success': True, 'message': name}
+
+    monkeypatch.setattr(tools_module, 'execute_tool', fake_execute_tool)
+    calls = [{'id': f'call_{i}', 'name': name, 'args': {}}
+             for i, name in enumerate(['search_docs', 'get_doc', 'get_status',
+                                       'stop_gateway', 'get_status', 'start_gateway'])]
+
+    loop = asyncio.get_running_loop()
+    begin = loop.time()
+    results = await execute_tool_calls(calls, timeout=0.5)
+    elapsed = loop.time() - begin
+
+    assert [r['tool_call_id'] for r in results] == [c['id'] for c in calls]
+    assert [json.loads(r['content'])['success'] for r in results] == [True] * 5 + [False]
+    assert 'timed out after 0.5s' in json.loads(results[-1]['content'])['error']
+    # The first three overlap; stop_gateway waits for them and runs alone
+    assert log[2] == ('get_status', ['get_doc', 'get_status', 'search_docs'])
+    assert log[3] == ('stop_gateway', ['stop_gateway'])
+    assert elapsed < 0.2 + 0.05 + 0.05 + 0.5 + 0.2
+
+
+@pytest.mark.asyncio
+async def test_execute_tool_get_status_with_daemon(tmp_path, monkeypatch):
+    """Test get_status reaches a real Daemon built on the main thread"""
+    import atexit
+    import os
+    import signal
+    import sys
+    from tokligence import utils
+
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    stub = bin_dir / 'gatewayd'
+    stub.write_text(f'#!{sys.executable}\n')
+    stub.chmod(0o755)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv('XDG_CONFIG_HOME', str(tmp_path / 'config'))
+    # Keep the Daemon's shutdown hooks from outliving the test
+    monkeypatch.setattr(atexit, 'register', lambda func: func)
+    handlers = {sig: signal.getsignal(sig) for sig in (signal.SIGTERM, signal.SIGINT)}
+    utils.clear_binary_cache()
+    try:
+        result = await execute_tool('get_status', {})
+    finally:
+        for sig, handler in handlers.items():
+            signal.signal(sig, handler)
+        utils.clear_binary_cache()
+
+    assert result['success'], result
+    assert not result['running']
+    assert result['message'] == 'Gateway is not running'
+
+
 def test_parse_tool_calls():
     """Test parsing tool calls from message"""
     import json
@@ -0,0 +1,65 @@
+"""
+Tests for the tgw CLI
+"""
+
+import subprocess
+import sys
+
+from click.testing import CliRunner
+from tokligence.cli import cli
+
+
+def test_version_command():
+    """Test tgw version prints the package version"""
+    import tokligence
+
+    result = CliRunner().invoke(cli, ['version'], obj={})
+
+    assert result.exit_code == 0
+    assert tokligence.__version__ in result.output
+
+
+def test_cli_import_is_lazy():
+    """Test importing the CLI does not load rich, yaml or the binary wrappers"""
+    heavy = ('rich', 'yaml', 'asyncio', 'tokligence.gateway', 'tokligence.daemon',
+             'tokligence.config')
+    code = (
+        'import sys, tokligence.cli; '
+        f'print(",".join(m for m in {heavy!r} if m in sys.modules))'
+    )
+
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ''
+
+
+def test_package_attributes_load_on_demand():
+    """Test public names are still importable from the package"""
+    import tokligence
+
+    assert tokligence.Gateway.__name__ == 'Gateway'
+    assert 'Daemon' in dir(tokligence)
+
+
+def test_config_show_merges_layers(tmp_path, monkeypatch):
+    """Test tgw config show applies TOKLIGENCE_* variables and --set overrides"""
+    import json
+
+    monkeypatch.setenv('TOKLIGENCE_GATEWAY_PORT', '9000')
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps({'gateway': {'host': '0.0.0.0'}}))
+
+    result = CliRunner().invoke(cli, ['--config', str(path), 'config', 'show', '--json',
+                                      '--set', 'gateway.auth.enabled=true'], obj={})
+
+    assert result.exit_code == 0, result.output
+    data = json.loads(result.output)
+    assert data['gateway']['host'] == '0.0.0.0'
+    assert data['gateway']['port'] == 9000
+    assert data['gateway']['auth']['enabled'] is True
+
+    # --set belongs to config show; other commands do not accept it
+    result = CliRunner().invoke(cli, ['--set', 'gateway.port=9000', 'daemon', 'start'], obj={})
+    assert result.exit_code == 2
+    assert 'No such option' in result.output
@@ -0,0 +1,395 @@
+"""
+Tests for configuration management
+"""
+
+import json
+import os
+import time
+
+import pytest
+from tokligence.config import MISSING, Config, diff_config
+
+
+def test_diff_config():
+    """Test diffs report changed, added and removed leaves by dotted key"""
+    old = {'gateway': {'port': 8081, 'auth': {'enabled': False}}, 'marketplace': {'enabled': False}}
+    new = {'gateway': {'port': 9000, 'auth': {'enabled': False}, 'host': 'x'}}
+    assert diff_config(old, new) == {
+        'gateway.port': (8081, 9000),
+        'gateway.host': (MISSING, 'x'),
+        'marketplace': ({'enabled': False}, MISSING),
+    }
+    assert diff_config(old, old) == {}
+
+
+def test_reload_fires_callbacks(tmp_path):
+    """Test reload() swaps in the new data and reports the changes"""
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps({'gateway': {'port': 8081}}))
+    config = Config(str(path))
+    seen = []
+    config.on_change(lambda changes, cfg: seen.append(changes))
+
+    assert config.reload() == {}
+    assert seen == []
+
+    path.write_text(json.dumps({'gateway': {'port': 9000}}))
+    assert config.reload() == {'gateway.port': (8081, 9000)}
+    assert config.get('gateway.port') == 9000
+    assert seen == [{'gateway.port': (8081, 9000)}]
+
+
+@pytest.mark.parametrize('use_inotify', [True, False])
+def test_watch_reloads_on_change(tmp_path, use_inotify):
+    """Test the watcher picks up edits (inotify or polling) and survives bad writes"""
+    from tokligence.utils import wait_for
+
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps({'gateway': {'port': 8081}}))
+    config = Config(str(path))
+    seen = []
+    config.on_change(lambda changes, cfg: seen.append(changes))
+
+    watcher = config.watch(interval=0.05, use_inotify=use_inotify)
+    try:
+        # A half-written file is reported and skipped; the old data stays
+        path.write_text('{"gateway": ')
+        time.sleep(0.2)
+        assert config.get('gateway.port') == 8081
+
+        # Replace via rename like editors do
+        tmp = tmp_path / 'config.json.tmp'
+        tmp.write_text(json.dumps({'gateway': {'port': 9000}}))
+        tmp.replace(path)
+        assert wait_for(lambda: seen, 5)
+        assert seen == [{'gateway.port': (8081, 9000)}]
+    finally:
+        watcher.stop()
+
+    if not use_inotify:
+        assert watcher.backend == 'poll'
+
+
+def legacy_get(data, key, default=None):
+    """The nested walk Config.get() used before the lookup index."""
+    value = data
+    for k in key.split('.'):
+        if isinstance(value, dict):
+            value = value.get(k)
+            if value is None:
+                return default
+        else:
+            return default
+    return value
+
+
+def test_get_matches_nested_walk(tmp_path):
+    """Test indexed lookups return exactly what the nested walk returned"""
+    config = Config(str(tmp_path / 'missing.yaml'))
+    config.data = {
+        'gateway': {'port': 8081, 'logging': {'file': None, 'level': 'info'}},
+        'providers': {'openai': {'models': ['gpt-4']}, 'a.b': 1, 3: 'int key'},
+        'flag': False,
+    }
+    keys = ['gateway', 'gateway.port', 'gateway.logging.file', 'gateway.logging.level',
+            'gateway.port.x', 'providers.openai.models', 'providers.a.b', 'providers.3',
+            'flag', 'nope', 'gateway.nope.deeper', '']
+    for key in keys:
+        assert config.get(key, 'default') == legacy_get(config.data, key, 'default'), key
+
+
+def test_index_invalidated_by_writes(tmp_path):
+    """Test set(), update(), data assignment and invalidate() refresh lookups"""
+    config = Config(str(tmp_path / 'missing.yaml'))
+    assert config.get('gateway.port') == 8081
+
+    config.set('gateway.port', 9000)
+    assert config.get('gateway.port') == 9000
+
+    config.update({'gateway': {'auth': {'enabled': True}}})
+    assert config.get('gateway.auth.enabled') is True
+
+    config.data = {'gateway': {'port': 1}}
+    assert config.get('gateway.auth.enabled') is None
+
+    config.data['gateway']['port'] = 2
+    config.invalidate()
+    assert config.get('gateway.port') == 2
+
+
+def test_view(tmp_path):
+    """Test views are read-only mappings relative to their prefix"""
+    config = Config(str(tmp_path / 'missing.yaml'))
+    openai = config.view('providers.openai')
+
+    assert openai.get('base_url') == 'https://api.openai.com/v1'
+    assert openai['enabled'] is True
+    assert 'models' in openai and 'nope' not in openai
+    assert set(openai) == {'enabled', 'api_key', 'base_url', 'models'}
+    assert config.view('providers').view('anthropic').get('enabled') is True
+    with pytest.raises(KeyError):
+        openai['nope']
+    with pytest.raises(TypeError):
+        openai['enabled'] = False
+
+    # Views reflect later changes
+    config.set('providers.openai.enabled', False)
+    assert openai['enabled'] is False
+    assert len(config.view('missing')) == 0
+
+    # Keys with None values can be iterated and looked up
+    logging = config.view('gateway.logging')
+    assert dict(logging)['file'] is None
+    assert logging['file'] is None and 'file' in logging
+    assert config.view('gateway')['logging.file'] is None
+
+
+@pytest.fixture
+def layered(tmp_path, monkeypatch):
+    """A config file plus a clean environment and snapshot cache."""
+    from tokligence.layers import clear_config_cache
+
+    for name in list(os.environ):
+        if name.startswith('TOKLIGENCE_'):
+            monkeypatch.delenv(name)
+    clear_config_cache()
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps({'gateway': {'host': '0.0.0.0', 'port': 8090}}))
+    yield path
+    clear_config_cache()
+
+
+def test_layers_precedence_and_provenance(layered, monkeypatch):
+    """Test defaults < file < TOKLIGENCE_* env < overrides, with sources per key"""
+    from tokligence.config import load_config
+
+    monkeypatch.setenv('TOKLIGENCE_GATEWAY_PORT', '9000')
+    monkeypatch.setenv('TOKLIGENCE_GATEWAY_AUTH_ENABLED', 'yes')
+    monkeypatch.setenv('TOKLIGENCE_PROVIDERS_OPENAI_MODELS', 'gpt-4o, gpt-4o-mini')
+    monkeypatch.setenv('TOKLIGENCE_UNKNOWN_KEY', 'ignored')
+
+    config = load_config(str(layered), overrides={'gateway.logging.level': 'debug',
+                                                   'routing.default': 'openai'})
+    snapshot = config.snapshot
+
+    assert config.get('gateway.host') == '0.0.0.0'
+    assert config.get('gateway.port') == 9000
+    assert config.get('gateway.auth.enabled') is True
+    assert config.get('providers.openai.models') == ['gpt-4o', 'gpt-4o-mini']
+    assert config.get('gateway.logging.level') == 'debug'
+    assert config.get('database.type') == 'sqlite'
+    assert config.get('unknown') is None
+
+    assert snapshot.source('database.type') == 'default'
+    assert snapshot.source('gateway.host') == 'file'
+    assert snapshot.source('gateway.port') == 'env:TOKLIGENCE_GATEWAY_PORT'
+    assert snapshot.source('gateway.logging.level') == 'cli'
+    assert snapshot.source('routing.default') == 'cli'
+
+    monkeypatch.setenv('TOKLIGENCE_GATEWAY_PORT', 'eighty')
+    with pytest.raises(ValueError, match='TOKLIGENCE_GATEWAY_PORT'):
+        load_config(str(layered))
+
+
+def test_load_config_is_cached(layered, monkeypatch):
+    """Test repeated loads reuse one snapshot until the file or environment changes"""
+    from tokligence.config import load_config
+
+    first = load_config(str(layered)).snapshot
+    assert load_config(str(layered)).snapshot is first
+
+    monkeypatch.setenv('TOKLIGENCE_GATEWAY_PORT', '9000')
+    second = load_config(str(layered)).snapshot
+    assert second is not first and second.get('gateway.port') == 9000
+
+    layered.write_text(json.dumps({'gateway': {'host': 'example.com'}}))
+    assert load_config(str(layered)).get('gateway.host') == 'example.com'
+
+
+def test_layered_config_copy_on_write(layered, monkeypatch):
+    """Test changes to a loaded config neither leak into the cache nor save env values"""
+    from tokligence.config import load_config
+
+    monkeypatch.setenv('TOKLIGENCE_GATEWAY_PORT', '9000')
+    config = load_config(str(layered))
+    config.set('gateway.host', 'changed')
+    config.get('providers')['openai']['enabled'] = False
+
+    fresh = load_config(str(layered))
+    assert fresh.get('gateway.host') == '0.0.0.0'
+    assert fresh.get('providers.openai.enabled') is True
+    with pytest.raises(TypeError):
+        fresh.snapshot.get('gateway')['host'] = 'x'
+
+    # Only the file layer and explicit changes are written back
+    config.save()
+    assert json.loads(layered.read_text()) == {'gateway': {'host': 'changed', 'port': 8090}}
+
+
+def test_yaml_snapshot_cache(tmp_path, monkeypatch):
+    """Test parsed YAML is reused from the sidecar until the file changes"""
+    monkeypatch.setenv('XDG_CONFIG_HOME', str(tmp_path / 'home'))
+    path = tmp_path / 'config.yaml'
+    path.write_text('gateway:\n  port: 9000\n')
+
+    # Just-modified files are not snapshotted
+    assert Config(str(path)).get('gateway.port') == 9000
+    assert not list((tmp_path / 'home').rglob('*.marshal'))
+
+    old = time.time() - 60
+    os.utime(path, (old, old))
+    assert Config(str(path)).get('gateway.port') == 9000
+    assert len(list((tmp_path / 'home').rglob('*.marshal'))) == 1
+
+    def fail(self):
+        raise AssertionError('file was parsed again')
+
+    monkeypatch.setattr(Config, '_parse', fail)
+    assert Config(str(path)).get('gateway.port') == 9000
+
+    # Any change to the file invalidates the snapshot
+    monkeypatch.undo()
+    monkeypatch.setenv('XDG_CONFIG_HOME', str(tmp_path / 'home'))
+    path.write_text('gateway:\n  port: 9001\n')
+    os.utime(path, (old, old))
+    assert Config(str(path)).get('gateway.port') == 9001
+
+    monkeypatch.setenv('TOKLIGENCE_CONFIG_CACHE', '0')
+    monkeypatch.setattr(Config, '_parse', lambda self: {'parsed': True})
+    assert Config(str(path)).get('parsed') is True
+
+
+def test_schema_validation_on_writes(tmp_path):
+    """Test set(), update() and save() reject invalid values and leave data untouched"""
+    from tokligence.schema import ConfigValidationError
+
+    path = tmp_path / 'config.json'
+    config = Config(str(path))
+
+    with pytest.raises(ConfigValidationError, match='gateway.port'):
+        config.set('gateway.port', 'eighty')
+    with pytest.raises(ConfigValidationError, match='at most 65535'):
+        config.set('gateway.port', 70000)
+    with pytest.raises(ConfigValidationError) as excinfo:
+        config.update({'gateway': {'host': 'ok', 'logging': {'level': 'loud'}},
+                       'providers': {'custom': {'base_url': 'ftp://x', 'models': ['a', 1]}}})
+    assert [key for key, _ in excinfo.value.errors] == [
+        'gateway.logging.level', 'providers.custom.base_url', 'providers.custom.models'
+    ]
+    assert config.get('gateway.host') == 'localhost'
+    assert config.get('gateway.port') == 8081
+
+    # Keys outside the schema are accepted
+    config.set('routing.rules', [{'model': 'gpt-*'}])
+    config.set('gateway.port', 9000)
+
+    config.data['marketplace']['enabled'] = 'yes'
+    with pytest.raises(ConfigValidationError, match='marketplace.enabled'):
+        config.save()
+    assert not path.exists()
+
+    config.schema = None
+    config.save()
+    assert path.exists()
+
+
+def test_defaults_match_schema():
+    """Test the built-in defaults are valid"""
+    from tokligence.schema import CONFIG_SCHEMA
+
+    assert CONFIG_SCHEMA.errors(Config.get_defaults()) == []
+
+
+def test_save_is_atomic_and_skips_clean_configs(tmp_path, monkeypatch):
+    """Test save() replaces the file atomically and only when something changed"""
+    path = tmp_path / 'config.yaml'
+    config = Config(str(path))
+    assert config.save()
+    os.chmod(path, 0o600)
+    assert not config.dirty
+    assert not config.save()
+
+    config.set('gateway.port', 9000)
+    assert config.dirty
+
+    # A failing write leaves the old file (and no temporary files) behind
+    def fail(*args):
+        raise OSError('disk full')
+    monkeypatch.setattr(os, 'replace', fail)
+    with pytest.raises(OSError):
+        config.save()
+    monkeypatch.undo()
+    assert Config(str(path)).get('gateway.port') == 8081
+    assert config.dirty
+
+    assert config.save()
+    assert Config(str(path)).get('gateway.port') == 9000
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    assert [p.name for p in tmp_path.iterdir()] == ['config.yaml']
+
+    # In-place edits are written even though they do not mark the config dirty
+    config.data['gateway']['port'] = 9999
+    assert not config.dirty
+    assert config.save()
+    assert Config(str(path)).get('gateway.port') == 9999
+    assert not config.save()
+
+    # A file changed by someone else since the last write is written again
+    path.write_text('gateway: {port: 1}\n')
+    assert config.save()
+    assert Config(str(path)).get('gateway.port') == 9999
+
+
+@pytest.mark.parametrize('name', ['config.yaml', 'config.json'])
+def test_unchanged_config_is_not_rewritten(tmp_path, name):
+    """Test saving a freshly loaded, unchanged config leaves the file alone"""
+    path = tmp_path / name
+    Config(str(path)).save()
+    os.utime(path, ns=(1, 1))
+
+    config = Config(str(path))
+    assert not config.save()
+    with config.transaction():
+        pass
+    assert os.stat(path).st_mtime_ns == 1
+
+    config.data['gateway']['port'] = 9999
+    assert config.save()
+    assert Config(str(path)).get('gateway.port') == 9999
+
+
+def test_transaction_coalesces_writes(tmp_path, monkeypatch):
+    """Test a transaction writes once on success and rolls back on error"""
+    import tokligence.config as config_module
+
+    path = tmp_path / 'config.json'
+    config = Config(str(path))
+    config.save()
+
+    writes = []
+    real_write = config_module._atomic_write
+    monkeypatch.setattr(config_module, '_atomic_write',
+                        lambda p, text: (writes.append(p), real_write(p, text)))
+
+    with config.transaction():
+        for port in range(9000, 9100):
+            config.set('gateway.port', port)
+            config.save()
+        with config.transaction():
+            config.set('gateway.host', '0.0.0.0')
+    assert len(writes) == 1
+    assert json.loads(path.read_text())['gateway'] == {**config.get('gateway'), 'port': 9099}
+
+    with pytest.raises(RuntimeError):
+        with config.transaction():
+            config.set('gateway.port', 1234)
+            config.update({'marketplace': {'enabled': True}})
+            raise RuntimeError('abort')
+    assert config.get('gateway.port') == 9099
+    assert config.get('marketplace.enabled') is False
+    assert not config.dirty
+    assert len(writes) == 1
+
+    with config.transaction():
+        pass
+    assert len(writes) == 1
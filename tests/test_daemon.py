@@ -0,0 +1,370 @@
+"""
+Tests for the Daemon wrapper
+"""
+
+import socket
+import sys
+import textwrap
+import time
+
+import pytest
+from tokligence import daemon as daemon_module
+from tokligence.daemon import Daemon
+
+FAKE_GATEWAYD = textwrap.dedent('''
+    import argparse, sys, time
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config')
+    parser.add_argument('--port', type=int)
+    parser.add_argument('--startup-delay', type=float, default=0.2)
+    parser.add_argument('--exit-code', type=int)
+    args = parser.parse_args()
+
+    time.sleep(args.startup_delay)
+    if args.exit_code is not None:
+        sys.exit(args.exit_code)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200 if self.path == '/health' else 404)
+            self.end_headers()
+            self.wfile.write(str(args.port).encode())
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', args.port), Handler)
+    print(f'listening on {args.port}', flush=True)
+    print('stderr line', file=sys.stderr, flush=True)
+    server.serve_forever()
+''')
+
+
+def free_port():
+    """Return a currently unused local TCP port."""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def free_ports(n):
+    """Return the first of n consecutive currently unused local TCP ports."""
+    while True:
+        base = free_port()
+        sockets = []
+        try:
+            for port in range(base, base + n):
+                s = socket.socket()
+                sockets.append(s)
+                s.bind(('127.0.0.1', port))
+            return base
+        except OSError:
+            continue
+        finally:
+            for s in sockets:
+                s.close()
+
+
+@pytest.fixture
+def fake_gatewayd(tmp_path, monkeypatch):
+    """Install a stand-in gatewayd that serves /health after a short delay."""
+    script = tmp_path / 'gatewayd'
+    script.write_text(f'#!{sys.executable}\n' + FAKE_GATEWAYD)
+    script.chmod(0o755)
+
+    monkeypatch.setattr(daemon_module, 'find_available_binary', lambda name: script)
+    monkeypatch.setattr(Daemon, '_setup_signal_handlers', lambda self: None)
+    monkeypatch.setenv('XDG_CONFIG_HOME', str(tmp_path / 'config'))
+    return script
+
+
+def test_start_returns_when_ready(fake_gatewayd):
+    """Test start() blocks until the port accepts connections, then stop() is prompt"""
+    d = Daemon(port=free_port())
+    try:
+        d.start()
+        assert d.is_ready()
+    finally:
+        start = time.monotonic()
+        d.stop()
+        assert time.monotonic() - start < 2
+
+    assert d.process is None
+    assert not d.is_ready()
+
+
+def test_health_path_probe(fake_gatewayd):
+    """Test readiness can be probed through an HTTP health endpoint"""
+    d = Daemon(port=free_port(), health_path='/health')
+    try:
+        d.start(background=True)
+        assert d.status()['status'] == 'running'
+        assert d.is_ready()
+
+        d.health_path = '/missing'
+        assert not d.is_ready()
+    finally:
+        d.stop()
+
+
+def test_background_logs_go_through_pump(fake_gatewayd, tmp_path):
+    """Test background output reaches the log files without fds left open here"""
+    import os
+
+    def open_fds():
+        return set(os.listdir('/proc/self/fd')) if os.path.isdir('/proc/self/fd') else set()
+
+    d = Daemon(port=free_port())
+    before = open_fds()
+    try:
+        d.start(background=True)
+        assert d.log_pump is not None
+        assert open_fds() <= before
+    finally:
+        d.stop()
+
+    assert d.log_pump is None
+    log_dir = tmp_path / 'config' / 'tokligence' / 'logs'
+    assert (log_dir / 'gatewayd.log').read_text() == f'listening on {d.port}\n'
+    assert (log_dir / 'gatewayd.error.log').read_text() == 'stderr line\n'
+
+
+def test_start_fails_fast_when_daemon_exits(fake_gatewayd, monkeypatch):
+    """Test start() raises immediately if the daemon dies during startup"""
+    d = Daemon(port=free_port(), ready_timeout=30)
+    d.binary_path = fake_gatewayd
+    real_popen = daemon_module.subprocess.Popen
+
+    def popen(cmd, **kwargs):
+        return real_popen(cmd + ['--startup-delay', '0', '--exit-code', '3'], **kwargs)
+
+    monkeypatch.setattr(daemon_module.subprocess, 'Popen', popen)
+
+    start = time.monotonic()
+    with pytest.raises(RuntimeError, match='exit code 3'):
+        d.start()
+    assert time.monotonic() - start < 5
+
+
+def test_restart_has_no_fixed_delay(fake_gatewayd):
+    """Test restart() is bounded by real shutdown/startup time, not sleeps"""
+    d = Daemon(port=free_port())
+    try:
+        d.start()
+        old_pid = d.process.pid
+
+        start = time.monotonic()
+        d.restart()
+        assert time.monotonic() - start < 2
+        assert d.process.pid != old_pid
+        assert d.is_ready()
+    finally:
+        d.stop()
+
+
+def test_supervisor_restarts_crashed_workers(fake_gatewayd):
+    """Test the supervisor tracks workers per port and restarts crashed ones"""
+    from tokligence.supervisor import Supervisor
+
+    base_port = free_ports(2)
+    supervisor = Supervisor(2, base_port=base_port, restart_delay=0.01, check_interval=60)
+    try:
+        supervisor.start()
+        status = supervisor.status()
+        assert status['status'] == 'running'
+        assert [w['port'] for w in status['workers']] == [base_port, base_port + 1]
+        assert supervisor.daemons[1].pid_file.name == f'gatewayd-{base_port + 1}.pid'
+
+        crashed = supervisor.daemons[1].process
+        crashed.kill()
+        crashed.wait()
+        assert supervisor.status()['status'] == 'degraded'
+
+        supervisor.check_workers()
+        assert supervisor.restarts == [0, 1]
+        assert supervisor.daemons[1].process.pid != crashed.pid
+        assert supervisor.daemons[1].is_ready()
+    finally:
+        supervisor.stop()
+
+    assert supervisor.status()['status'] == 'stopped'
+
+
+def test_supervisor_stop_kills_workers_from_pid_files(fake_gatewayd):
+    """Test stop() without a running supervisor stops workers listed in PID files"""
+    import subprocess
+    import threading
+    from tokligence.supervisor import Supervisor
+
+    base_port = free_ports(2)
+    supervisor = Supervisor(2, base_port=base_port)
+    processes = []
+    for daemon in supervisor.daemons:
+        process = subprocess.Popen([str(fake_gatewayd), '--port', str(daemon.port)])
+        # Reap in the background, as init would for a detached worker
+        threading.Thread(target=process.wait, daemon=True).start()
+        daemon.pid_file.write_text(str(process.pid))
+        processes.append(process)
+
+    try:
+        assert Supervisor(2, base_port=base_port).status()['running'] == 2
+        Supervisor(2, base_port=base_port).stop()
+        assert all(p.wait(timeout=5) is not None for p in processes)
+        assert not any(d.pid_file.exists() for d in supervisor.daemons)
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+
+
+def http_get(port, path='/'):
+    """Send a GET over a raw socket and return the response body."""
+    with socket.create_connection(('127.0.0.1', port), timeout=5) as conn:
+        conn.sendall(f'GET {path} HTTP/1.0\r\n\r\n'.encode())
+        return recv_all(conn).split(b'\r\n\r\n', 1)[1].decode()
+
+
+def recv_all(conn):
+    """Read from a socket until the peer closes it."""
+    chunks = []
+    while True:
+        data = conn.recv(65536)
+        if not data:
+            return b''.join(chunks)
+        chunks.append(data)
+
+
+def wait_until(predicate, timeout=5):
+    """Poll a predicate until it is true or the timeout passes."""
+    from tokligence.utils import wait_for
+    return wait_for(predicate, timeout)
+
+
+def test_blue_green_restart_keeps_in_flight_connections(fake_gatewayd):
+    """Test a rolling restart switches new connections and drains old ones"""
+    import threading
+    from tokligence.rolling import BlueGreenDaemon
+
+    public, blue, green = free_port(), free_port(), free_port()
+    bg = BlueGreenDaemon(port=public, backend_ports=(blue, green), drain_timeout=10)
+    try:
+        bg.start()
+        assert http_get(public) == str(blue)
+
+        # A connection opened before the restart stays on the old backend
+        in_flight = socket.create_connection(('127.0.0.1', public), timeout=5)
+        assert wait_until(lambda: bg.forwarder.backends[blue].active == 1)
+        assert bg.forwarder.wait_drained(blue, 0.05) is False
+
+        results = {}
+        restart = threading.Thread(target=lambda: results.update(bg.rolling_restart()))
+        restart.start()
+
+        # New connections reach the new backend while the old one drains
+        assert wait_until(lambda: bg.daemon.port == green)
+        assert http_get(public) == str(green)
+        assert bg.slots[0].is_ready()
+
+        in_flight.sendall(b'GET / HTTP/1.0\r\n\r\n')
+        assert recv_all(in_flight).endswith(str(blue).encode())
+        in_flight.close()
+
+        restart.join(10)
+        assert results == {'old_port': blue, 'new_port': green, 'drained': True}
+        assert not bg.slots[0].is_ready()
+    finally:
+        bg.stop()
+
+
+def test_supervisor_load_balances_least_outstanding(fake_gatewayd):
+    """Test the front proxy sends new connections to the least busy worker"""
+    from tokligence.supervisor import Supervisor
+
+    base_port, proxy_port = free_ports(2), free_port()
+    supervisor = Supervisor(2, base_port=base_port, check_interval=60, proxy_port=proxy_port)
+    try:
+        supervisor.start()
+        first = socket.create_connection(('127.0.0.1', proxy_port), timeout=5)
+        assert wait_until(lambda: sum(b.active for b in supervisor.proxy.backends.values()) == 1)
+        busy = next(b.port for b in supervisor.proxy.backends.values() if b.active)
+
+        # While one worker holds an open connection, new ones go to the other
+        other = base_port + 1 if busy == base_port else base_port
+        assert http_get(proxy_port) == str(other)
+        assert http_get(proxy_port) == str(other)
+
+        first.sendall(b'GET / HTTP/1.0\r\n\r\n')
+        assert recv_all(first).endswith(str(busy).encode())
+        first.close()
+
+        stats = {b['port']: b for b in supervisor.status()['proxy']['backends']}
+        assert stats[other]['total'] == 2
+        assert stats[other]['latency_samples'] == 2
+        assert stats[other]['latency_mean_ms'] > 0
+        assert stats[busy]['errors'] == 0
+    finally:
+        supervisor.stop()
+
+
+def test_load_balancer_streams_without_buffering():
+    """Test streamed (SSE) chunks reach the client before the response ends"""
+    import threading
+    from tokligence.proxy import LoadBalancer
+
+    release = threading.Event()
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen()
+
+    def stream():
+        conn, _ = server.accept()
+        with conn:
+            conn.recv(1024)
+            conn.sendall(b'HTTP/1.0 200 OK\r\n\r\ndata: first\n\n')
+            release.wait(5)
+            conn.sendall(b'data: second\n\n')
+
+    threading.Thread(target=stream, daemon=True).start()
+    balancer = LoadBalancer(free_port(), [server.getsockname()[1]])
+    balancer.start()
+    try:
+        with socket.create_connection(('127.0.0.1', balancer.listen_port), timeout=5) as conn:
+            conn.sendall(b'GET /stream HTTP/1.0\r\n\r\n')
+            received = b''
+            while b'data: first' not in received:
+                received += conn.recv(1024)
+            release.set()
+            assert recv_all(conn).endswith(b'data: second\n\n')
+    finally:
+        balancer.stop()
+        server.close()
+
+
+def test_watch_config_restarts_on_relevant_changes(fake_gatewayd, tmp_path):
+    """Test only changes to sections gatewayd reads restart the daemon"""
+    import json
+
+    path = tmp_path / 'gateway.json'
+
+    def write(host, enabled):
+        path.write_text(json.dumps({'gateway': {'host': host}, 'marketplace': {'enabled': enabled}}))
+
+    write('localhost', False)
+    d = Daemon(config_path=str(path), port=free_port())
+    try:
+        d.start(background=True)
+        first_pid = d.process.pid
+        watcher = d.watch_config(interval=0.05)
+
+        write('localhost', True)
+        assert wait_until(lambda: watcher.config.get('marketplace.enabled') is True)
+        assert d.process.pid == first_pid
+
+        write('0.0.0.0', True)
+        assert wait_until(lambda: d.process is not None and d.process.pid != first_pid)
+        assert wait_until(d.is_ready)
+    finally:
+        d.unwatch_config()
+        d.stop()
@@ -0,0 +1,244 @@
+"""
+Tests for the Gateway CLI wrapper
+"""
+
+import json
+import sys
+import textwrap
+
+import pytest
+from tokligence.gateway import Gateway
+from tokligence.worker import GatewayWorker, WorkerUnavailable
+
+FAKE_HANDLER = '''
+import json
+
+def handle(args):
+    if args[:2] == ['user', 'list']:
+        return 0, json.dumps([{'id': 1, 'username': 'alice'}]), ''
+    if args[:2] == ['user', 'create']:
+        if args[2] == 'broken':
+            return 1, '', 'user already exists'
+        return 0, json.dumps({'id': 42, 'username': args[2]}), ''
+    if args[:2] == ['apikey', 'create']:
+        return 0, json.dumps({'key': 'tok-' + args[2]}), ''
+    return 1, '', 'unknown command'
+'''
+
+
+@pytest.fixture
+def fake_binary(tmp_path):
+    """A stand-in gateway binary that answers one command per process."""
+    script = tmp_path / 'gateway'
+    script.write_text(
+        f'#!{sys.executable}\n'
+        + FAKE_HANDLER
+        + textwrap.dedent('''
+            import sys
+            code, out, err = handle(sys.argv[1:])
+            sys.stdout.write(out)
+            sys.stderr.write(err)
+            sys.exit(code)
+        ''')
+    )
+    script.chmod(0o755)
+    return script
+
+
+@pytest.fixture
+def worker_command(tmp_path):
+    """A stand-in worker speaking the line-delimited JSON protocol."""
+    script = tmp_path / 'worker.py'
+    script.write_text(
+        FAKE_HANDLER
+        + textwrap.dedent('''
+            from tokligence.worker import serve
+            serve(handle)
+        ''')
+    )
+    return [sys.executable, str(script)]
+
+
+def test_gateway_subprocess_path(fake_binary):
+    """Test commands run through one subprocess per call"""
+    gateway = Gateway(binary_path=str(fake_binary))
+
+    assert gateway.list_users() == [{'id': 1, 'username': 'alice'}]
+    assert gateway.create_user('bob')['id'] == 42
+
+
+def test_gateway_persistent_worker(fake_binary, worker_command):
+    """Test captured commands reuse a single worker process"""
+    with Gateway(binary_path=str(fake_binary), persistent=True,
+                 worker_command=worker_command) as gateway:
+        assert gateway.list_users() == [{'id': 1, 'username': 'alice'}]
+        pid = gateway._worker.process.pid
+
+        assert gateway.create_user('bob')['username'] == 'bob'
+        assert gateway.create_api_key('42')['key'] == 'tok-42'
+        assert gateway._worker.process.pid == pid
+
+        with pytest.raises(RuntimeError, match='user already exists'):
+            gateway.create_user('broken')
+
+    assert gateway._worker is None
+
+
+def test_gateway_falls_back_without_worker_mode(fake_binary):
+    """Test a binary without worker mode falls back to per-call processes"""
+    gateway = Gateway(
+        binary_path=str(fake_binary),
+        persistent=True,
+        worker_command=[sys.executable, '-c', 'import sys; sys.exit(2)'],
+    )
+
+    assert gateway.list_users() == [{'id': 1, 'username': 'alice'}]
+    assert not gateway.persistent
+
+
+def test_worker_unavailable_before_first_reply():
+    """Test a worker that never answers is reported as unavailable"""
+    worker = GatewayWorker([sys.executable, '-c', 'print("not json")'])
+
+    with pytest.raises(WorkerUnavailable):
+        worker.call(['user', 'list'])
+
+    worker.close()
+
+
+def test_hung_worker_falls_back_without_rerunning(fake_binary, tmp_path, monkeypatch):
+    """Test a silent worker fails the handshake, and a crash after a command is not retried"""
+    import time
+    import tokligence.gateway as gateway_module
+
+    # A binary that blocks on the unknown 'worker' subcommand
+    hung = [sys.executable, '-c', 'import time; time.sleep(60)']
+    gateway = Gateway(binary_path=str(fake_binary), persistent=True, worker_command=hung)
+    gateway._get_worker().handshake_timeout = 0.5
+    started = time.perf_counter()
+    assert gateway.list_users() == [{'id': 1, 'username': 'alice'}]
+    assert time.perf_counter() - started < 5
+    assert not gateway.persistent
+
+    # The worker answers the handshake, then dies while running a command
+    script = tmp_path / 'crashing_worker.py'
+    script.write_text(FAKE_HANDLER + textwrap.dedent('''
+        import os
+        from tokligence.worker import serve
+
+        def crash(args):
+            if args[:2] == ['user', 'create']:
+                os._exit(1)
+            return handle(args)
+        serve(crash)
+    '''))
+    fallbacks = []
+    monkeypatch.setattr(gateway_module.subprocess, 'run', lambda *a, **k: fallbacks.append(a))
+    with Gateway(binary_path=str(fake_binary), persistent=True,
+                 worker_command=[sys.executable, str(script)]) as gateway:
+        assert gateway.list_users() == [{'id': 1, 'username': 'alice'}]
+        with pytest.raises(RuntimeError, match='exited unexpectedly'):
+            gateway.create_user('bob')
+        assert gateway.persistent
+    assert fallbacks == []
+
+
+def test_worker_call_timeout(tmp_path):
+    """Test a command that hangs is cut off after the call timeout"""
+    script = tmp_path / 'slow_worker.py'
+    script.write_text(textwrap.dedent('''
+        import time
+        from tokligence.worker import serve
+        serve(lambda args: (time.sleep(60), (0, '', ''))[1])
+    '''))
+    worker = GatewayWorker([sys.executable, str(script)], timeout=0.5)
+    with pytest.raises(RuntimeError, match='did not reply within 0.5s'):
+        worker.call(['user', 'list'])
+    assert worker.process is None
+
+
+def test_worker_reply_is_completed_process(worker_command):
+    """Test worker replies are exposed as CompletedProcess objects"""
+    with GatewayWorker(worker_command) as worker:
+        result = worker.call(['user', 'list', '--json'])
+
+    assert result.returncode == 0
+    assert json.loads(result.stdout)[0]['username'] == 'alice'
+    assert result.stderr == ''
+
+
+def test_create_users_bulk_reports_failures(fake_binary):
+    """Test bulk user creation streams results and keeps going on failure"""
+    gateway = Gateway(binary_path=str(fake_binary))
+    rows = [{'username': 'bob', 'email': 'bob@example.com'}, 'broken', {'username': 'carol'}]
+
+    run = gateway.create_users_bulk(rows, max_workers=2)
+    results = sorted(run, key=lambda r: r.index)
+
+    assert [r.ok for r in results] == [True, False, True]
+    assert results[0].result['username'] == 'bob'
+    assert 'user already exists' in results[1].error
+    assert (run.total, run.succeeded, run.failed) == (3, 2, 1)
+    assert run.throughput > 0
+
+
+def test_create_api_keys_bulk(fake_binary):
+    """Test bulk API key creation"""
+    gateway = Gateway(binary_path=str(fake_binary))
+
+    results = list(gateway.create_api_keys_bulk(['1', {'user_id': 2, 'name': 'ci'}]))
+
+    assert sorted(r.result['key'] for r in results) == ['tok-1', 'tok-2']
+
+
+def test_cli_user_import(fake_binary, tmp_path, monkeypatch):
+    """Test tgw user import creates users from a CSV file"""
+    from click.testing import CliRunner
+    from tokligence import gateway as gateway_module
+    from tokligence.cli import cli
+
+    monkeypatch.setattr(gateway_module, 'find_available_binary', lambda name: fake_binary)
+    csv_file = tmp_path / 'users.csv'
+    csv_file.write_text('username,email\nalice,alice@example.com\nbroken,\n')
+
+    result = CliRunner().invoke(cli, ['user', 'import', str(csv_file)], obj={})
+
+    assert result.exit_code == 1
+    assert 'Imported 1/2 users' in result.output
+    assert 'user already exists' in result.output
+
+
+@pytest.mark.asyncio
+async def test_async_gateway_mirrors_gateway(fake_binary):
+    """Test AsyncGateway runs commands concurrently without blocking"""
+    import asyncio
+    from tokligence.async_gateway import AsyncGateway
+
+    gateway = AsyncGateway(binary_path=str(fake_binary), max_concurrency=4)
+
+    users, created, key = await asyncio.gather(
+        gateway.list_users(),
+        gateway.create_user('bob'),
+        gateway.create_api_key('42'),
+    )
+
+    assert users == [{'id': 1, 'username': 'alice'}]
+    assert created['id'] == 42
+    assert key['key'] == 'tok-42'
+
+    with pytest.raises(RuntimeError, match='user already exists'):
+        await gateway.create_user('broken')
+
+
+@pytest.mark.asyncio
+async def test_async_gateway_bulk(fake_binary):
+    """Test async bulk creation yields every row and counts failures"""
+    from tokligence.async_gateway import AsyncGateway
+
+    gateway = AsyncGateway(binary_path=str(fake_binary))
+    run = gateway.create_users_bulk(['a', 'broken', 'c'], max_workers=2)
+
+    results = [result async for result in run]
+
+    assert len(results) == 3
+    assert (run.succeeded, run.failed) == (2, 1)
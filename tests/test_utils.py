@@ -0,0 +1,73 @@
+"""
+Tests for binary resolution utilities
+"""
+
+import os
+
+import pytest
+from tokligence import utils
+
+
+@pytest.fixture
+def binaries_dir(tmp_path, monkeypatch):
+    """Point binary resolution at a temporary directory with a fake gateway."""
+    os_name, arch = utils.get_platform_info()
+    suffix = '.exe' if os_name == 'windows' else ''
+    binary = tmp_path / 'binaries' / f'gateway-{os_name}-{arch}{suffix}'
+    binary.parent.mkdir()
+    binary.write_text('')
+    binary.chmod(0o644)
+
+    monkeypatch.setattr(utils, 'BINARIES_DIR', binary.parent)
+    monkeypatch.setenv('XDG_CONFIG_HOME', str(tmp_path / 'config'))
+    monkeypatch.delenv('TOKLIGENCE_BINARY_CACHE', raising=False)
+    utils.clear_binary_cache()
+    yield binary
+    utils.clear_binary_cache()
+
+
+def test_get_binary_path_makes_binary_executable(binaries_dir):
+    """Test the first lookup validates and fixes the executable bit"""
+    assert utils.get_binary_path('gateway') == binaries_dir
+    if os.name != 'nt':
+        assert os.access(binaries_dir, os.X_OK)
+
+
+def test_get_binary_path_is_cached(binaries_dir, monkeypatch):
+    """Test repeated lookups do not touch the filesystem"""
+    utils.get_binary_path('gateway')
+
+    def no_syscalls(*args, **kwargs):
+        raise AssertionError('filesystem accessed on cached lookup')
+
+    monkeypatch.setattr(utils.os, 'stat', no_syscalls)
+    monkeypatch.setattr(utils.os, 'chmod', no_syscalls)
+
+    assert utils.get_binary_path('gateway') == binaries_dir
+    assert utils.find_available_binary('gateway') == binaries_dir
+
+
+def test_get_binary_path_missing(binaries_dir):
+    """Test a missing binary still raises FileNotFoundError"""
+    with pytest.raises(FileNotFoundError):
+        utils.get_binary_path('gatewayd')
+
+
+def test_disk_cache_keyed_by_version_and_mtime(binaries_dir, monkeypatch):
+    """Test the on-disk cache is reused only while version and mtime match"""
+    monkeypatch.setenv('TOKLIGENCE_BINARY_CACHE', '1')
+    utils.get_binary_path('gateway')
+    assert utils._read_disk_cache('gateway') == binaries_dir
+
+    # A new process starts with an empty in-memory cache
+    utils.clear_binary_cache()
+    monkeypatch.setattr(utils, 'BINARIES_DIR', binaries_dir.parent / 'elsewhere')
+    assert utils.get_binary_path('gateway') == binaries_dir
+
+    st = os.stat(binaries_dir)
+    os.utime(binaries_dir, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert utils._read_disk_cache('gateway') is None
+
+    utils.get_binary_path('gateway')
+    monkeypatch.setattr('tokligence.__version__', '0.0.0-other')
+    assert utils._read_disk_cache('gateway') is None
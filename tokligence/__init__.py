@@ -4,12 +4,42 @@ Tokligence - Multi-platform LLM gateway with unified OpenAI-compatible API
 Python wrapper for the Tokligence Gateway.
 """
 
+from typing import TYPE_CHECKING, Any
+
 __version__ = "0.4.0"
 __author__ = "Tokligence Team"
 __email__ = "cs@tokligence.ai"
 
-from .gateway import Gateway
-from .daemon import Daemon
-from .config import Config, load_config
+# Public names are imported on first access (PEP 562) so that `import tokligence`
+# and the `tgw` CLI do not pay for subprocess, asyncio or yaml until needed.
+_LAZY_IMPORTS = {
+    "Gateway": ".gateway",
+    "AsyncGateway": ".async_gateway",
+    "Daemon": ".daemon",
+    "Config": ".config",
+    "load_config": ".config",
+}
+
+if TYPE_CHECKING:
+    from .gateway import Gateway
+    from .async_gateway import AsyncGateway
+    from .daemon import Daemon
+    from .config import Config, load_config
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    import importlib
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
+
 
-__all__ = ["Gateway", "Daemon", "Config", "load_config"]
\ No newline at end of file
+__all__ = ["Gateway", "AsyncGateway", "Daemon", "Config", "load_config"]
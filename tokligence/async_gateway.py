@@ -0,0 +1,260 @@
+"""
+Asyncio wrapper for the Tokligence Gateway CLI
+"""
+
+import asyncio
+import json
+import subprocess
+from pathlib import Path
+from typing import List, Optional, Dict, Any, Iterable, Union
+from .bulk import AsyncBulkRun
+from .utils import find_available_binary
+
+
+class AsyncGateway:
+    """
+    Asyncio-native counterpart of Gateway.
+
+    Every command runs through ``asyncio.create_subprocess_exec``, so many admin
+    operations can be awaited concurrently without blocking the event loop.
+    """
+
+    def __init__(
+        self,
+        config_path: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        binary_path: Optional[str] = None,
+    ):
+        """
+        Initialize the AsyncGateway wrapper.
+
+        Args:
+            config_path: Optional path to configuration file
+            max_concurrency: Optional cap on concurrently running gateway processes
+            binary_path: Optional explicit path to the gateway binary
+        """
+        self.binary_path = Path(binary_path) if binary_path else find_available_binary('gateway')
+        if not self.binary_path:
+            raise RuntimeError(
+                "Gateway binary not found. Please ensure it's installed correctly."
+            )
+        self.config_path = config_path
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _base_command(self) -> List[str]:
+        """Build the binary invocation shared by every command."""
+        cmd = [str(self.binary_path)]
+
+        # Add config file if specified
+        if self.config_path:
+            cmd.extend(['--config', self.config_path])
+
+        return cmd
+
+    async def run(self, args: List[str],
+                  capture_output: bool = False) -> subprocess.CompletedProcess:
+        """
+        Run a gateway command.
+
+        Args:
+            args: Command arguments
+            capture_output: Whether to capture output
+
+        Returns:
+            CompletedProcess instance
+        """
+        # Created lazily so the semaphore binds to the running event loop
+        if self.max_concurrency and self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        if self._semaphore is not None:
+            async with self._semaphore:
+                return await self._exec(args, capture_output)
+        return await self._exec(args, capture_output)
+
+    async def _exec(self, args: List[str], capture_output: bool) -> subprocess.CompletedProcess:
+        """Start the binary and wait for it to finish."""
+        cmd = self._base_command() + list(args)
+        pipe = asyncio.subprocess.PIPE if capture_output else None
+
+        process = await asyncio.create_subprocess_exec(*cmd, stdout=pipe, stderr=pipe)
+        try:
+            stdout, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+
+        if capture_output:
+            return subprocess.CompletedProcess(
+                cmd, process.returncode,
+                stdout.decode(errors='replace'), stderr.decode(errors='replace')
+            )
+        return subprocess.CompletedProcess(cmd, process.returncode)
+
+    async def init(self, force: bool = False) -> bool:
+        """
+        Initialize gateway configuration.
+
+        Args:
+            force: Force overwrite existing configuration
+
+        Returns:
+            True if successful
+        """
+        args = ['init']
+        if force:
+            args.append('--force')
+
+        result = await self.run(args)
+        return result.returncode == 0
+
+    async def create_user(self, username: str, email: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Create a new user.
+
+        Args:
+            username: Username
+            email: Optional email address
+
+        Returns:
+            User information dict
+        """
+        args = ['user', 'create', username]
+        if email:
+            args.extend(['--email', email])
+
+        result = await self.run(args, capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Failed to create user: {result.stderr}")
+
+        try:
+            return json.loads(result.stdout)
+        except json.JSONDecodeError:
+            return {"message": result.stdout.strip()}
+
+    async def list_users(self) -> List[Dict[str, Any]]:
+        """
+        List all users.
+
+        Returns:
+            List of user dictionaries
+        """
+        result = await self.run(['user', 'list', '--json'], capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Failed to list users: {result.stderr}")
+
+        try:
+            return json.loads(result.stdout)
+        except json.JSONDecodeError:
+            return []
+
+    async def create_api_key(self, user_id: str, name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Create an API key for a user.
+
+        Args:
+            user_id: User ID
+            name: Optional key name
+
+        Returns:
+            API key information
+        """
+        args = ['apikey', 'create', user_id]
+        if name:
+            args.extend(['--name', name])
+
+        result = await self.run(args, capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Failed to create API key: {result.stderr}")
+
+        try:
+            return json.loads(result.stdout)
+        except json.JSONDecodeError:
+            return {"message": result.stdout.strip()}
+
+    def create_users_bulk(
+        self,
+        users: Iterable[Union[str, Dict[str, Any]]],
+        max_workers: int = 8,
+    ) -> AsyncBulkRun:
+        """
+        Create many users concurrently.
+
+        Args:
+            users: Usernames, or dicts with ``username`` and optional ``email``
+            max_workers: Maximum number of concurrent gateway calls
+
+        Returns:
+            AsyncBulkRun to ``async for`` over per-row results
+        """
+        async def create(row: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+            if isinstance(row, str):
+                return await self.create_user(row)
+            return await self.create_user(row['username'], row.get('email') or None)
+
+        return AsyncBulkRun(create, users, max_workers=max_workers)
+
+    def create_api_keys_bulk(
+        self,
+        keys: Iterable[Union[str, Dict[str, Any]]],
+        max_workers: int = 8,
+    ) -> AsyncBulkRun:
+        """
+        Create many API keys concurrently.
+
+        Args:
+            keys: User IDs, or dicts with ``user_id`` and optional ``name``
+            max_workers: Maximum number of concurrent gateway calls
+
+        Returns:
+            AsyncBulkRun to ``async for`` over per-row results
+        """
+        async def create(row: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+            if isinstance(row, str):
+                return await self.create_api_key(row)
+            return await self.create_api_key(str(row['user_id']), row.get('name') or None)
+
+        return AsyncBulkRun(create, keys, max_workers=max_workers)
+
+    async def list_providers(self) -> List[Dict[str, Any]]:
+        """
+        List available providers.
+
+        Returns:
+            List of provider dictionaries
+        """
+        result = await self.run(['provider', 'list', '--json'], capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Failed to list providers: {result.stderr}")
+
+        try:
+            return json.loads(result.stdout)
+        except json.JSONDecodeError:
+            return []
+
+    async def get_usage(self, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get usage statistics.
+
+        Args:
+            user_id: Optional user ID for filtering
+
+        Returns:
+            Usage statistics dictionary
+        """
+        args = ['usage']
+        if user_id:
+            args.extend(['--user', user_id])
+        args.append('--json')
+
+        result = await self.run(args, capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Failed to get usage: {result.stderr}")
+
+        try:
+            return json.loads(result.stdout)
+        except json.JSONDecodeError:
+            return {}
@@ -0,0 +1,194 @@
+"""
+Bulk execution helpers for provisioning many users or API keys
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, Optional, Set
+)
+
+
+@dataclass
+class BulkResult:
+    """Outcome of one row in a bulk operation."""
+    index: int
+    item: Any
+    ok: bool
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+
+class _BulkStats:
+    """Counters and throughput shared by the sync and async bulk runners."""
+
+    def __init__(self, items: Iterable[Any], max_workers: int):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+
+        self.items = items
+        self.max_workers = max_workers
+        self.total = 0
+        self.succeeded = 0
+        self.failed = 0
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+
+    def _record(self, result: BulkResult):
+        """Count a completed row."""
+        if result.ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds spent so far (or in total once finished)."""
+        if self._started is None:
+            return 0.0
+        end = self._finished if self._finished is not None else time.perf_counter()
+        return end - self._started
+
+    @property
+    def throughput(self) -> float:
+        """Completed items per second."""
+        elapsed = self.elapsed
+        done = self.succeeded + self.failed
+        return done / elapsed if elapsed > 0 else 0.0
+
+
+class BulkRun(_BulkStats):
+    """
+    Run a function over many items through a bounded thread pool.
+
+    Iterating yields a BulkResult per item as soon as it completes, so results
+    arrive out of input order. A failing item never stops the batch. Counters
+    and throughput are available while and after iterating.
+    """
+
+    def __init__(self, func: Callable[[Any], Dict[str, Any]], items: Iterable[Any],
+                 max_workers: int = 8):
+        """
+        Initialize the bulk run.
+
+        Args:
+            func: Function applied to each item
+            items: Items to process (consumed lazily)
+            max_workers: Maximum number of concurrent calls
+        """
+        super().__init__(items, max_workers)
+        self.func = func
+
+    def _call(self, index: int, item: Any) -> BulkResult:
+        """Run func for one item, capturing any error."""
+        start = time.perf_counter()
+        try:
+            result = self.func(item)
+            return BulkResult(index, item, True, result=result,
+                              elapsed=time.perf_counter() - start)
+        except Exception as e:
+            return BulkResult(index, item, False, error=str(e),
+                              elapsed=time.perf_counter() - start)
+
+    def __iter__(self) -> Iterator[BulkResult]:
+        self._started = time.perf_counter()
+        # Keep a bounded number of futures in flight so huge inputs (e.g. a
+        # large CSV) are not materialized up front.
+        max_pending = self.max_workers * 2
+        pending: Set[Future] = set()
+        items = enumerate(self.items)
+        exhausted = False
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                while not exhausted and len(pending) < max_pending:
+                    try:
+                        index, item = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending.add(executor.submit(self._call, index, item))
+                    self.total += 1
+
+                if not pending:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    self._record(result)
+                    yield result
+
+        self._finished = time.perf_counter()
+
+
+class AsyncBulkRun(_BulkStats):
+    """
+    Asyncio counterpart of BulkRun.
+
+    ``async for`` yields a BulkResult per item as it completes, with at most
+    ``max_workers`` coroutines in flight.
+    """
+
+    def __init__(self, func: Callable[[Any], Awaitable[Dict[str, Any]]], items: Iterable[Any],
+                 max_workers: int = 8):
+        """
+        Initialize the bulk run.
+
+        Args:
+            func: Coroutine function applied to each item
+            items: Items to process (consumed lazily)
+            max_workers: Maximum number of concurrent calls
+        """
+        super().__init__(items, max_workers)
+        self.func = func
+
+    async def _call(self, index: int, item: Any) -> BulkResult:
+        """Await func for one item, capturing any error."""
+        start = time.perf_counter()
+        try:
+            result = await self.func(item)
+            return BulkResult(index, item, True, result=result,
+                              elapsed=time.perf_counter() - start)
+        except Exception as e:
+            return BulkResult(index, item, False, error=str(e),
+                              elapsed=time.perf_counter() - start)
+
+    def __aiter__(self) -> AsyncIterator[BulkResult]:
+        return self._run()
+
+    async def _run(self) -> AsyncIterator[BulkResult]:
+        # Imported here so the synchronous Gateway does not pay for asyncio
+        import asyncio
+
+        self._started = time.perf_counter()
+        pending: Set["asyncio.Task"] = set()
+        items = enumerate(self.items)
+        exhausted = False
+
+        try:
+            while True:
+                while not exhausted and len(pending) < self.max_workers:
+                    try:
+                        index, item = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending.add(asyncio.ensure_future(self._call(index, item)))
+                    self.total += 1
+
+                if not pending:
+                    break
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    self._record(result)
+                    yield result
+        finally:
+            for task in pending:
+                task.cancel()
+
+        self._finished = time.perf_counter()
@@ -8,14 +8,19 @@ import asyncio
 from .session import start_chat as async_start_chat
 
 
-def start_chat(model=None):
+def start_chat(model=None, rescan=False, measure=False, hedge_delay=None, context_budget=None):
     """
     Synchronous wrapper for start_chat
 
     Args:
         model: Optional preferred model name
+        rescan: Probe local LLM servers even if cached results are fresh
+        measure: Sample endpoint latency (including time to first token) first
+        hedge_delay: Seconds before a slow request is also sent to the next best endpoint
+        context_budget: Estimated prompt tokens to compact the history to (0 for no limit)
     """
-    asyncio.run(async_start_chat(model=model))
+    asyncio.run(async_start_chat(model=model, rescan=rescan, measure=measure,
+                                 hedge_delay=hedge_delay, context_budget=context_budget))
 
 
 __all__ = ['start_chat']
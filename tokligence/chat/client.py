@@ -4,9 +4,15 @@ LLM Client Factory
 Creates appropriate clients for different LLM providers
 """
 
-from typing import Any, Optional, Dict, List, AsyncIterator
+import asyncio
+import json
+import time
+from typing import Any, Optional, Dict, List, AsyncIterator, NamedTuple, Tuple, Union
 from .detector import Endpoint
 
+# Seconds to wait for the first chunk before a hedged request is sent
+HEDGE_DELAY = 1.5
+
 
 def create_client(endpoint: Endpoint) -> Any:
     """
@@ -28,8 +34,9 @@ def create_client(endpoint: Endpoint) -> Any:
 
             # For remote OpenAI, use API key
             api_key = os.getenv('TOKLIGENCE_OPENAI_API_KEY') or os.getenv('OPENAI_API_KEY')
-            # For local endpoints (vLLM, LM Studio), API key is not required
-            if not api_key and not endpoint.local:
+            # For local endpoints (vLLM, LM Studio) and servers that answered
+            # the detection probe without credentials, API key is not required
+            if not api_key and not endpoint.local and not endpoint.probed_unauthenticated:
                 raise ValueError("OpenAI API key not found")
 
             return AsyncOpenAI(
@@ -218,3 +225,277 @@ async def create_streaming_chat(
 
     else:
         raise ValueError(f"Unsupported endpoint type: {endpoint.type}")
+
+
+class TextDelta(NamedTuple):
+    """A piece of assistant text"""
+    text: str
+
+
+class ToolCallDelta(NamedTuple):
+    """A piece of a tool call; fields that did not change are None"""
+    index: int
+    id: Optional[str] = None
+    name: Optional[str] = None
+    arguments: Optional[str] = None
+
+
+class Finish(NamedTuple):
+    """End of the response: 'stop', 'tool_calls' or a provider-specific reason"""
+    reason: str
+
+
+StreamEvent = Union[TextDelta, ToolCallDelta, Finish]
+
+
+async def stream_events(endpoint: Endpoint, stream: AsyncIterator) -> AsyncIterator[StreamEvent]:
+    """
+    Normalize a provider stream from create_streaming_chat() into events
+
+    Args:
+        endpoint: Endpoint the stream came from (decides the format)
+        stream: Streaming response
+
+    Yields:
+        TextDelta, ToolCallDelta and finally one Finish event
+    """
+    if endpoint.type == 'openai' or endpoint.type == 'ollama':
+        finished = False
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            delta = choice.delta
+            if delta and delta.content:
+                yield TextDelta(delta.content)
+            if delta and delta.tool_calls:
+                for call in delta.tool_calls:
+                    function = call.function
+                    yield ToolCallDelta(
+                        call.index,
+                        call.id or None,
+                        function.name if function else None,
+                        function.arguments if function else None,
+                    )
+            if choice.finish_reason and not finished:
+                finished = True
+                yield Finish(choice.finish_reason)
+        if not finished:
+            yield Finish('stop')
+
+    elif endpoint.type == 'anthropic':
+        tool_index: Dict[int, int] = {}  # content block index -> tool call index
+        stop_reason = None
+        async for event in stream:
+            if event.type == 'content_block_start':
+                if event.content_block.type == 'tool_use':
+                    index = tool_index[event.index] = len(tool_index)
+                    yield ToolCallDelta(index, event.content_block.id, event.content_block.name)
+            elif event.type == 'content_block_delta':
+                if event.delta.type == 'text_delta':
+                    yield TextDelta(event.delta.text)
+                elif event.delta.type == 'input_json_delta' and event.index in tool_index:
+                    yield ToolCallDelta(tool_index[event.index], arguments=event.delta.partial_json)
+            elif event.type == 'message_delta':
+                stop_reason = getattr(event.delta, 'stop_reason', None) or stop_reason
+        if stop_reason == 'tool_use' or (stop_reason is None and tool_index):
+            yield Finish('tool_calls')
+        else:
+            yield Finish(stop_reason or 'stop')
+
+    elif endpoint.type == 'google':
+        calls = 0
+        async for chunk in stream:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks holding only a function call have no text
+                text = None
+            if text:
+                yield TextDelta(text)
+            for fc in getattr(chunk, 'function_calls', None) or ():
+                yield ToolCallDelta(calls, f'google_{calls}', fc.name, json.dumps(dict(fc.args)))
+                calls += 1
+        yield Finish('tool_calls' if calls else 'stop')
+
+    else:
+        raise ValueError(f"Unsupported endpoint type: {endpoint.type}")
+
+
+class MessageAccumulator:
+    """
+    Build an assistant message from stream events
+
+    Text and tool-call arguments are collected as lists of pieces and joined
+    once, so long responses do not re-copy the text on every delta.
+    """
+
+    def __init__(self):
+        self._text: List[str] = []
+        self._tools: Dict[int, Dict[str, Any]] = {}
+        self.finish_reason: Optional[str] = None
+
+    def add(self, event: StreamEvent):
+        """Add one event"""
+        if isinstance(event, TextDelta):
+            self._text.append(event.text)
+        elif isinstance(event, ToolCallDelta):
+            call = self._tools.get(event.index)
+            if call is None:
+                call = self._tools[event.index] = {'id': '', 'name': [], 'arguments': []}
+            if event.id:
+                call['id'] = event.id
+            if event.name:
+                call['name'].append(event.name)
+            if event.arguments:
+                call['arguments'].append(event.arguments)
+        else:
+            self.finish_reason = event.reason
+
+    @property
+    def text(self) -> str:
+        """Assistant text so far"""
+        return ''.join(self._text)
+
+    @property
+    def tool_calls(self) -> List[Dict[str, Any]]:
+        """Tool calls in OpenAI message format, by index"""
+        return [
+            {
+                'id': call['id'],
+                'type': 'function',
+                'function': {
+                    'name': ''.join(call['name']),
+                    'arguments': ''.join(call['arguments']),
+                },
+            }
+            for _, call in sorted(self._tools.items())
+        ]
+
+    def message(self) -> Dict[str, Any]:
+        """The assistant message for the chat history"""
+        message: Dict[str, Any] = {'role': 'assistant', 'content': self.text or None}
+        if self._tools:
+            message['tool_calls'] = self.tool_calls
+        return message
+
+
+async def _first_chunk(client: Any, endpoint: Endpoint, model: str,
+                       messages: List[Dict[str, Any]], options: Optional[Dict[str, Any]]):
+    """Start a streaming request and wait for its first chunk."""
+    started = time.perf_counter()
+    stream = await create_streaming_chat(client, endpoint, model, messages, options)
+    iterator = stream.__aiter__()
+    try:
+        first = await iterator.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except BaseException:
+        await _close_stream(stream)
+        raise
+    return stream, iterator, first, (time.perf_counter() - started) * 1000
+
+
+async def _close_stream(stream: Any):
+    """Close a streaming response, releasing its connection (best effort)."""
+    for name in ('aclose', 'close'):
+        close = getattr(stream, name, None)
+        if close is None:
+            continue
+        try:
+            result = close()
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception:
+            pass
+        return
+
+
+async def _resume(first: Any, iterator: AsyncIterator) -> AsyncIterator:
+    """Yield the already received first chunk, then the rest of the stream."""
+    if first is not None:
+        yield first
+    async for chunk in iterator:
+        yield chunk
+
+
+async def create_hedged_streaming_chat(
+    candidates: List[Tuple[Endpoint, Any, str]],
+    messages: List[Dict[str, Any]],
+    options: Optional[Dict[str, Any]] = None,
+    hedge_delay: float = HEDGE_DELAY,
+) -> Tuple[Endpoint, Any, str, AsyncIterator]:
+    """
+    Create a streaming chat completion, hedged across two endpoints
+
+    The request goes to the first candidate. If it has not produced its first
+    chunk within hedge_delay seconds (or fails earlier), the same request is
+    sent to the second candidate. Whichever streams first is used; the other
+    request is cancelled and its stream closed. The winner's time to first
+    chunk is recorded on its Endpoint.
+
+    Args:
+        candidates: (endpoint, client, model) for the primary and the backup
+            (only the first two are used)
+        messages: Chat messages
+        options: Optional parameters, as for create_streaming_chat()
+        hedge_delay: Seconds to wait for the primary before hedging
+
+    Returns:
+        (endpoint, client, model, stream) of the request that won
+
+    Raises:
+        Exception: The last error if every request failed
+    """
+    candidates = candidates[:2]
+    tasks: Dict[asyncio.Task, Tuple[Endpoint, Any, str]] = {}
+
+    def launch(candidate):
+        endpoint, client, model = candidate
+        task = asyncio.ensure_future(_first_chunk(client, endpoint, model, messages, options))
+        tasks[task] = candidate
+
+    launch(candidates[0])
+    backups = candidates[1:]
+    pending = set(tasks)
+    error: Optional[BaseException] = None
+    winner = None
+
+    try:
+        while pending:
+            timeout = hedge_delay if backups else None
+            done, pending = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                elif winner is None:
+                    winner = task
+            if winner is not None:
+                break
+            if backups and (not done or not pending):
+                # Primary is slow (or already failed): hedge
+                launch(backups.pop(0))
+                pending = {t for t in tasks if not t.done()}
+    finally:
+        # Cancel the losers and close any stream they already opened
+        for task in tasks:
+            if task is winner:
+                continue
+            if not task.done():
+                task.cancel()
+                try:
+                    await task
+                except BaseException:
+                    pass
+            elif not task.cancelled() and task.exception() is None:
+                await _close_stream(task.result()[0])
+
+    if winner is None:
+        raise error if error is not None else RuntimeError("No endpoint produced a response")
+
+    endpoint, client, model = tasks[winner]
+    _, iterator, first, ttft_ms = winner.result()
+    endpoint.record_ttft(ttft_ms)
+    return endpoint, client, model, _resume(first, iterator)
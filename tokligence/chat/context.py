@@ -0,0 +1,186 @@
+"""
+Conversation Context Budget
+
+Keeps the history a chat session sends with every request within a token
+budget. Tokens are estimated from text length (about four characters per
+token), which is close enough for budgeting without a tokenizer.
+
+When the history is over budget, the oldest turns are compacted first:
+their tool results (often whole documents from get_doc) are truncated, then
+whole turns are dropped and replaced by a one-line summary each, appended to
+the system prompt. The most recent turns are kept verbatim; their tool
+results are truncated only if that is still not enough.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+# Default prompt budget in estimated tokens
+CONTEXT_BUDGET = 12000
+
+# Most recent turns (including the current one) kept verbatim if possible
+KEEP_TURNS = 2
+
+# Characters kept of a truncated tool result
+TOOL_RESULT_CHARS = 1000
+
+# Characters of each question/answer kept in a turn summary, and summary lines kept
+SUMMARY_CHARS = 160
+SUMMARY_LINES = 20
+
+CHARS_PER_TOKEN = 4
+
+# Tokens for the role and framing of each message
+MESSAGE_OVERHEAD = 4
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Estimate the tokens of a text"""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    """Estimate the tokens of a chat message, tool calls included"""
+    tokens = MESSAGE_OVERHEAD + estimate_tokens(message.get('content'))
+    for tool_call in message.get('tool_calls') or ():
+        function = tool_call.get('function', {})
+        tokens += estimate_tokens(function.get('name')) + estimate_tokens(function.get('arguments'))
+    return tokens
+
+
+def _clip(text: Optional[str], limit: int) -> str:
+    """Collapse whitespace and cut a text to `limit` characters"""
+    text = ' '.join((text or '').split())
+    return text if len(text) <= limit else text[:limit - 1] + '…'
+
+
+class ContextBudget:
+    """Compact chat history to a token budget and report the prompt size"""
+
+    def __init__(self, max_tokens: Optional[int] = CONTEXT_BUDGET, keep_turns: int = KEEP_TURNS,
+                 tool_result_chars: int = TOOL_RESULT_CHARS):
+        """
+        Initialize the budget.
+
+        Args:
+            max_tokens: Estimated prompt tokens to stay under (None or 0: no limit,
+                sizes are still reported)
+            keep_turns: Most recent turns kept verbatim while older ones can go
+            tool_result_chars: Characters kept of a truncated tool result
+        """
+        self.max_tokens = max_tokens or None
+        self.keep_turns = max(1, keep_turns)
+        self.tool_result_chars = tool_result_chars
+        self.summary: List[str] = []
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._system_prompt: Optional[str] = None
+
+    def count(self, messages: List[Dict[str, Any]]) -> int:
+        """Estimated prompt tokens of a message list"""
+        return sum(message_tokens(m) for m in messages)
+
+    def compact(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Fit a history into the budget.
+
+        Args:
+            messages: Chat history, system prompt first (not modified)
+
+        Returns:
+            The history to send and keep (the same list if it already fits);
+            the result is described by last_report
+        """
+        tokens = self.count(messages)
+        report = {'tokens': tokens, 'messages': len(messages), 'budget': self.max_tokens,
+                  'truncated': 0, 'summarized': 0}
+        if self.max_tokens is None or tokens <= self.max_tokens:
+            self.last_report = report
+            return messages
+
+        has_system = bool(messages) and messages[0].get('role') == 'system'
+        if has_system and self._system_prompt is None:
+            self._system_prompt = messages[0]['content']
+        turns = self._split_turns(messages[1:] if has_system else messages)
+        head = messages[:1] if has_system else []
+
+        def total() -> int:
+            return self.count(head) + sum(self.count(turn) for turn in turns)
+
+        # 1. Truncate tool results of older turns
+        older = max(0, len(turns) - self.keep_turns)
+        for i in range(older):
+            turns[i], truncated = self._truncate_tool_results(turns[i])
+            report['truncated'] += truncated
+
+        # 2. Replace the oldest turns by summary lines
+        while total() > self.max_tokens and len(turns) > self.keep_turns:
+            self.summary.append(self._summarize(turns.pop(0)))
+            report['summarized'] += 1
+            del self.summary[:-SUMMARY_LINES]
+            if has_system:
+                head = [self._system_message()]
+
+        # 3. Truncate tool results of the recent turns as well
+        for i in range(len(turns)):
+            if total() <= self.max_tokens:
+                break
+            turns[i], truncated = self._truncate_tool_results(turns[i])
+            report['truncated'] += truncated
+
+        compacted = head + [m for turn in turns for m in turn]
+        report['tokens'] = self.count(compacted)
+        report['messages'] = len(compacted)
+        self.last_report = report
+        return compacted
+
+    @staticmethod
+    def _split_turns(messages: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Group messages into turns starting at user messages (tool results stay in their turn)"""
+        turns: List[List[Dict[str, Any]]] = []
+        for message in messages:
+            if message.get('role') == 'user' or not turns:
+                turns.append([])
+            turns[-1].append(message)
+        return turns
+
+    def _truncate_tool_results(
+        self,
+        turn: List[Dict[str, Any]],
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Copy of a turn with long tool results cut down, and how many were cut"""
+        limit = self.tool_result_chars
+        truncated = 0
+        result = []
+        for message in turn:
+            content = message.get('content')
+            if message.get('role') == 'tool' and isinstance(content, str) and len(content) > limit:
+                message = dict(message, content=(
+                    f"{content[:limit]}\n... [truncated {len(content) - limit} characters]"
+                ))
+                truncated += 1
+            result.append(message)
+        return result, truncated
+
+    def _summarize(self, turn: List[Dict[str, Any]]) -> str:
+        """One summary line for a dropped turn"""
+        question = next((m.get('content') for m in turn if m.get('role') == 'user'), '')
+        answers = [m.get('content') for m in turn
+                   if m.get('role') == 'assistant' and m.get('content')]
+        tools = [m.get('name') for m in turn if m.get('role') == 'tool' and m.get('name')]
+
+        line = f"- User: {_clip(question, SUMMARY_CHARS)}"
+        if answers:
+            line += f" | Assistant: {_clip(answers[-1], SUMMARY_CHARS)}"
+        if tools:
+            line += f" (tools: {', '.join(dict.fromkeys(tools))})"
+        return line
+
+    def _system_message(self) -> Dict[str, Any]:
+        """The original system prompt followed by the summary of dropped turns"""
+        summary = '\n'.join(self.summary)
+        return {
+            'role': 'system',
+            'content': (f"{self._system_prompt}\n\n"
+                        f"Earlier in this conversation (summarized):\n{summary}"),
+        }
@@ -2,12 +2,49 @@
 LLM Endpoint Detector
 
 Detects available LLM endpoints (OpenAI, Anthropic, Gemini, Ollama, etc.)
+
+API endpoints are detected from environment variables, which is instant.
+Local servers (and any extra OpenAI-compatible URLs) have to be probed over
+HTTP through one shared connection pool, so their results are cached in
+``~/.config/tokligence/cache/endpoints.json``; while the cache is younger
+than the TTL it is used as-is and re-probed in a background thread.
+
+Endpoints are ranked by measured latency: an exponentially weighted moving
+average of probe round trips, or of time-to-first-token samples once
+measure(ttft=True) has taken some. Latencies within the same
+LATENCY_BUCKET_MS band are ranked by the static priority, and unmeasured
+endpoints come after measured ones. The averages are kept in the cache, so
+they build up across runs.
 """
 
 import os
+import json
+import time
 import asyncio
-from typing import List, Dict, Optional, Any
-from dataclasses import dataclass
+import threading
+from pathlib import Path
+from typing import List, Dict, Optional, Any, Tuple
+from dataclasses import asdict, dataclass, field, fields
+from urllib.parse import urlsplit
+
+# Seconds a cached local probe result is trusted (TOKLIGENCE_DETECT_CACHE_TTL)
+DETECT_CACHE_TTL = 24 * 3600.0
+
+# Bumped whenever the cache layout changes
+_CACHE_FORMAT = 2
+
+# Probe timeouts in seconds: connecting to a local server either succeeds
+# almost at once or not at all, so only the response gets a longer budget
+PROBE_CONNECT_TIMEOUT = 0.25
+PROBE_TIMEOUT = 2.0
+
+# Weight of a new sample in the latency moving averages
+LATENCY_ALPHA = 0.3
+
+# Latencies this close are treated as equal and ranked by priority
+LATENCY_BUCKET_MS = 50.0
+
+_STATS_FIELDS = ('latency_ewma_ms', 'latency_samples', 'ttft_ms', 'ttft_ewma_ms', 'ttft_samples')
 
 
 @dataclass
@@ -20,30 +57,346 @@ class Endpoint:
     local: bool = False
     default_model: Optional[str] = None
     priority: int = 0  # Higher priority = preferred
+    models: List[str] = field(default_factory=list)  # Models reported by a local server
+    probed_unauthenticated: bool = False  # Answered the detection probe without credentials
+    latency_ms: Optional[float] = None  # Round trip of the last probe
+    latency_ewma_ms: Optional[float] = None
+    latency_samples: int = 0
+    ttft_ms: Optional[float] = None  # Last time-to-first-token sample
+    ttft_ewma_ms: Optional[float] = None
+    ttft_samples: int = 0
+
+    def record_latency(self, ms: float, alpha: float = LATENCY_ALPHA):
+        """Record a probe round trip in milliseconds"""
+        self.latency_ms = ms
+        self.latency_ewma_ms = ms if self.latency_ewma_ms is None else (
+            alpha * ms + (1 - alpha) * self.latency_ewma_ms
+        )
+        self.latency_samples += 1
+
+    def record_ttft(self, ms: float, alpha: float = LATENCY_ALPHA):
+        """Record a time-to-first-token sample in milliseconds"""
+        self.ttft_ms = ms
+        self.ttft_ewma_ms = ms if self.ttft_ewma_ms is None else (
+            alpha * ms + (1 - alpha) * self.ttft_ewma_ms
+        )
+        self.ttft_samples += 1
+
+    @property
+    def key(self) -> str:
+        """Identifies the endpoint across detections and runs"""
+        return f'{self.type}|{self.base_url}'
+
+    @property
+    def score_ms(self) -> Optional[float]:
+        """Latency used for ranking: TTFT average if sampled, else probe average"""
+        return self.ttft_ewma_ms if self.ttft_ewma_ms is not None else self.latency_ewma_ms
+
+    def stats(self) -> Dict[str, Any]:
+        """Latency statistics"""
+        return {name: getattr(self, name) for name in ('latency_ms',) + _STATS_FIELDS}
+
+
+def rank_key(endpoint: Endpoint):
+    """Sort key: measured before unmeasured, then latency band, then priority"""
+    score = endpoint.score_ms
+    if score is None:
+        return (1, 0.0, -endpoint.priority)
+    return (0, score // LATENCY_BUCKET_MS, -endpoint.priority)
+
+
+def _detect_cache_file() -> Optional[Path]:
+    """Path of the local probe cache, or None if caching is disabled."""
+    if os.getenv('TOKLIGENCE_DETECT_CACHE', '1') == '0':
+        return None
+    from ..utils import ensure_config_dir
+    try:
+        return ensure_config_dir() / 'cache' / 'endpoints.json'
+    except OSError:
+        return None
+
+
+def _cache_ttl() -> float:
+    """TTL from TOKLIGENCE_DETECT_CACHE_TTL, falling back to DETECT_CACHE_TTL."""
+    try:
+        return float(os.environ['TOKLIGENCE_DETECT_CACHE_TTL'])
+    except (KeyError, ValueError):
+        return DETECT_CACHE_TTL
 
 
 class LLMDetector:
     """Detects and manages available LLM endpoints"""
 
-    def __init__(self):
+    def __init__(self, cache_ttl: Optional[float] = None,
+                 extra_targets: Optional[List[str]] = None,
+                 probe_timeout: float = PROBE_TIMEOUT):
+        """
+        Initialize the detector.
+
+        Args:
+            cache_ttl: Seconds cached local probe results are used for
+                (default: TOKLIGENCE_DETECT_CACHE_TTL or 24 hours; 0 disables the cache)
+            extra_targets: Base URLs of additional OpenAI-compatible servers to
+                probe, e.g. 'http://gpu-box:8000/v1' (default: the comma-separated
+                TOKLIGENCE_CHAT_ENDPOINTS variable)
+            probe_timeout: Seconds all probes together may take
+        """
         self.endpoints: List[Endpoint] = []
-
-    async def detect_all(self):
-        """Detect all available LLM endpoints"""
-        detection_tasks = [
+        self.cache_ttl = _cache_ttl() if cache_ttl is None else cache_ttl
+        if extra_targets is None:
+            extra_targets = os.getenv('TOKLIGENCE_CHAT_ENDPOINTS', '').split(',')
+        self.extra_targets = [url.strip().rstrip('/') for url in extra_targets if url.strip()]
+        self.probe_timeout = probe_timeout
+        self.from_cache = False
+        self.refresh_thread: Optional[threading.Thread] = None
+        self._client = None
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._probed: List[Endpoint] = []  # Endpoints found by probing (the cached part)
+
+    async def detect_all(self, use_cache: bool = True):
+        """
+        Detect all available LLM endpoints.
+
+        Args:
+            use_cache: Use cached local probe results when they are fresh
+                (and refresh them in the background)
+        """
+        # API endpoints only need environment variables
+        await asyncio.gather(
             self._detect_openai(),
             self._detect_anthropic(),
             self._detect_google(),
-            self._detect_ollama(),
-            self._detect_vllm(),
-            self._detect_lm_studio(),
-        ]
+            return_exceptions=True,
+        )
+
+        entry = self._read_cache()
+        self._stats = entry['stats'] if entry else {}
+        for endpoint in self.endpoints:
+            self._restore_stats(endpoint)
+
+        fresh = (use_cache and entry is not None
+                 and 0 <= time.time() - entry['checked_at'] < self.cache_ttl)
+        if fresh and not entry['endpoints'] and not self.get_available_endpoints():
+            # Nothing to chat with: a server may have started since, so re-probe now
+            fresh = False
+        self.from_cache = fresh
+        if fresh:
+            self._probed = entry['endpoints']
+        else:
+            self._probed = await self._probe_local()
+        self.endpoints.extend(self._probed)
+        self.rank()
+
+        if fresh:
+            self._start_refresh()
+        else:
+            self._write_cache()
+
+    def rank(self):
+        """Sort endpoints by measured latency, then priority (best first)."""
+        self.endpoints = sorted(self.endpoints, key=rank_key)
+
+    def _restore_stats(self, endpoint: Endpoint):
+        """Carry latency averages from earlier runs over to a freshly detected endpoint."""
+        for name, value in self._stats.get(endpoint.key, {}).items():
+            if name in _STATS_FIELDS:
+                setattr(endpoint, name, value)
+
+    async def measure(self, endpoints: Optional[List[Endpoint]] = None, ttft: bool = False):
+        """
+        Sample the latency of endpoints and re-rank them.
+
+        Every endpoint gets a round trip sample (an unauthenticated GET of its
+        base URL; any HTTP response counts). With ttft, a one-token streamed
+        completion is also timed to its first chunk; this uses the endpoint's
+        credentials, may cost a token and can make a local server load its model.
+
+        Args:
+            endpoints: Endpoints to measure (default: all available ones)
+            ttft: Also sample time to first token
+        """
+        if endpoints is None:
+            endpoints = self.get_available_endpoints()
+        await self._sample(endpoints, ttft)
+        self.rank()
+        self._write_cache()
+
+    async def _sample(self, endpoints: List[Endpoint], ttft: bool = False):
+        """Record round trip (and optionally TTFT) samples for endpoints."""
+        async def sample(client, endpoint: Endpoint):
+            started = time.perf_counter()
+            await client.get(endpoint.base_url)
+            endpoint.record_latency((time.perf_counter() - started) * 1000)
+            if ttft:
+                endpoint.record_ttft(await _sample_ttft(endpoint))
+
+        async with self._http_client() as client:
+            await asyncio.gather(*(sample(client, e) for e in endpoints), return_exceptions=True)
+
+    def _local_targets(self) -> List[List[str]]:
+        """Probed servers and their base URLs; the cache is only valid for these."""
+        return [
+            ['ollama', os.getenv('OLLAMA_BASE_URL') or 'http://localhost:11434'],
+            ['vllm', os.getenv('VLLM_BASE_URL') or 'http://localhost:8000'],
+            ['lm_studio', os.getenv('LM_STUDIO_BASE_URL') or 'http://localhost:1234'],
+        ] + [['openai_compatible', url] for url in self.extra_targets]
+
+    def _http_client(self):
+        """Create the pooled client shared by all probes."""
+        import httpx
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(self.probe_timeout, connect=PROBE_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=len(self._local_targets()) + 4),
+        )
+
+    async def _get_json(self, url: str) -> Tuple[Optional[Any], float]:
+        """
+        GET a probe URL through the shared client (or a one-off client).
+
+        Args:
+            url: URL to fetch
+
+        Returns:
+            (decoded JSON, or None if the status was not 200; round trip in ms)
+        """
+        if self._client is None:
+            async with self._http_client() as client:
+                self._client = client
+                try:
+                    return await self._get_json(url)
+                finally:
+                    self._client = None
+
+        started = time.perf_counter()
+        response = await self._client.get(url)
+        latency_ms = (time.perf_counter() - started) * 1000
+        if response.status_code != 200:
+            return None, latency_ms
+        return response.json(), latency_ms
+
+    async def _probe_local(self) -> List[Endpoint]:
+        """
+        Probe the local servers and extra targets concurrently.
+
+        All probes share one connection pool and run to completion: a server
+        that answers slowly (e.g. on a cold start) is still found. Only probes
+        still running when probe_timeout has passed are cancelled, so a hung
+        server cannot hold up startup for longer than that.
+
+        Returns:
+            Endpoints that answered
+        """
+        scratch = LLMDetector(cache_ttl=0, extra_targets=self.extra_targets,
+                              probe_timeout=self.probe_timeout)
+        async with self._http_client() as client:
+            scratch._client = client
+            probes = [scratch._detect_ollama(), scratch._detect_vllm(), scratch._detect_lm_studio()]
+            probes += [scratch._detect_openai_compatible(url, i)
+                       for i, url in enumerate(self.extra_targets)]
+            tasks = [asyncio.ensure_future(probe) for probe in probes]
+            _, pending = await asyncio.wait(tasks, timeout=self.probe_timeout)
+
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+
+        for endpoint in scratch.endpoints:
+            self._restore_stats(endpoint)
+            endpoint.record_latency(endpoint.latency_ms)
+        return scratch.endpoints
+
+    def _read_cache(self) -> Optional[Dict[str, Any]]:
+        """
+        Read the cache if it was written for the current probe targets.
+
+        Returns:
+            {'checked_at', 'endpoints' (list of Endpoint), 'stats'}, or None
+        """
+        cache_file = _detect_cache_file()
+        if cache_file is None or self.cache_ttl <= 0:
+            return None
+        try:
+            entry = json.loads(cache_file.read_text())
+            if entry['format'] != _CACHE_FORMAT or entry['targets'] != self._local_targets():
+                return None
+            names = {f.name for f in fields(Endpoint)}
+            entry['endpoints'] = [Endpoint(**{k: v for k, v in e.items() if k in names})
+                                  for e in entry['endpoints']]
+            if (not isinstance(entry['checked_at'], (int, float))
+                    or not isinstance(entry['stats'], dict)):
+                return None
+            return entry
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_cache(self):
+        """Store probe results and the latency averages of all endpoints (best effort)."""
+        for endpoint in self.endpoints + self._probed:
+            if endpoint.latency_samples or endpoint.ttft_samples:
+                self._stats[endpoint.key] = {
+                    name: getattr(endpoint, name) for name in _STATS_FIELDS
+                }
+
+        cache_file = _detect_cache_file()
+        if cache_file is None or self.cache_ttl <= 0:
+            return
+        entry = {
+            'format': _CACHE_FORMAT,
+            'targets': self._local_targets(),
+            'checked_at': time.time(),
+            'endpoints': [asdict(e) for e in self._probed],
+            'stats': self._stats,
+        }
+        try:
+            cache_file.parent.mkdir(exist_ok=True)
+            tmp = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+            tmp.write_text(json.dumps(entry))
+            os.replace(tmp, cache_file)
+        except OSError:
+            pass
 
-        # Run all detections concurrently
-        await asyncio.gather(*detection_tasks, return_exceptions=True)
+    def _start_refresh(self):
+        """
+        Re-probe local servers and sample the other endpoints' round trips in
+        a background thread, then replace the cached endpoints.
+        """
+        async def probe():
+            local = await self._probe_local()
+            others = [e for e in self.endpoints if not any(e is p for p in self._probed)]
+            await self._sample(others)
+            return others, local
+
+        def refresh():
+            # A thread with its own loop keeps refreshing while the chat loop
+            # blocks on terminal input
+            try:
+                others, local = asyncio.run(probe())
+            except Exception:
+                return
+            self._probed = local
+            self.endpoints = sorted(others + local, key=rank_key)
+            self._write_cache()
+
+        self.refresh_thread = threading.Thread(
+            target=refresh, name='tokligence-endpoint-refresh', daemon=True
+        )
+        self.refresh_thread.start()
+
+    def wait_refresh(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a background refresh started by detect_all().
+
+        Args:
+            timeout: Maximum seconds to wait
 
-        # Sort by priority (highest first)
-        self.endpoints.sort(key=lambda e: e.priority, reverse=True)
+        Returns:
+            True if no refresh is running any more
+        """
+        if self.refresh_thread is not None:
+            self.refresh_thread.join(timeout)
+            return not self.refresh_thread.is_alive()
+        return True
 
     async def _detect_openai(self):
         """Detect OpenAI API endpoint"""
@@ -97,23 +450,22 @@ class LLMDetector:
         base_url = os.getenv('OLLAMA_BASE_URL') or 'http://localhost:11434'
 
         try:
-            import httpx
-            async with httpx.AsyncClient(timeout=2.0) as client:
-                response = await client.get(f'{base_url}/api/tags')
-                if response.status_code == 200:
-                    data = response.json()
-                    models = data.get('models', [])
-                    default_model = models[0]['name'] if models else 'llama3.2'
-
-                    self.endpoints.append(Endpoint(
-                        name='Ollama (Local)',
-                        type='ollama',
-                        base_url=base_url,
-                        available=True,
-                        local=True,
-                        default_model=default_model,
-                        priority=80
-                    ))
+            data, latency_ms = await self._get_json(f'{base_url}/api/tags')
+            if data is not None:
+                models = [m['name'] for m in data.get('models', [])]
+                default_model = models[0] if models else 'llama3.2'
+
+                self.endpoints.append(Endpoint(
+                    name='Ollama (Local)',
+                    type='ollama',
+                    base_url=base_url,
+                    available=True,
+                    local=True,
+                    default_model=default_model,
+                    priority=80,
+                    models=models,
+                    latency_ms=latency_ms
+                ))
         except Exception:
             # Ollama not available
             pass
@@ -123,23 +475,22 @@ class LLMDetector:
         base_url = os.getenv('VLLM_BASE_URL') or 'http://localhost:8000'
 
         try:
-            import httpx
-            async with httpx.AsyncClient(timeout=2.0) as client:
-                response = await client.get(f'{base_url}/v1/models')
-                if response.status_code == 200:
-                    data = response.json()
-                    models = data.get('data', [])
-                    default_model = models[0]['id'] if models else 'default'
-
-                    self.endpoints.append(Endpoint(
-                        name='vLLM (Local)',
-                        type='openai',  # vLLM uses OpenAI-compatible API
-                        base_url=f'{base_url}/v1',
-                        available=True,
-                        local=True,
-                        default_model=default_model,
-                        priority=70
-                    ))
+            data, latency_ms = await self._get_json(f'{base_url}/v1/models')
+            if data is not None:
+                models = [m['id'] for m in data.get('data', [])]
+                default_model = models[0] if models else 'default'
+
+                self.endpoints.append(Endpoint(
+                    name='vLLM (Local)',
+                    type='openai',  # vLLM uses OpenAI-compatible API
+                    base_url=f'{base_url}/v1',
+                    available=True,
+                    local=True,
+                    default_model=default_model,
+                    priority=70,
+                    models=models,
+                    latency_ms=latency_ms
+                ))
         except Exception:
             # vLLM not available
             pass
@@ -149,27 +500,51 @@ class LLMDetector:
         base_url = os.getenv('LM_STUDIO_BASE_URL') or 'http://localhost:1234'
 
         try:
-            import httpx
-            async with httpx.AsyncClient(timeout=2.0) as client:
-                response = await client.get(f'{base_url}/v1/models')
-                if response.status_code == 200:
-                    data = response.json()
-                    models = data.get('data', [])
-                    default_model = models[0]['id'] if models else 'local-model'
-
-                    self.endpoints.append(Endpoint(
-                        name='LM Studio (Local)',
-                        type='openai',  # LM Studio uses OpenAI-compatible API
-                        base_url=f'{base_url}/v1',
-                        available=True,
-                        local=True,
-                        default_model=default_model,
-                        priority=60
-                    ))
+            data, latency_ms = await self._get_json(f'{base_url}/v1/models')
+            if data is not None:
+                models = [m['id'] for m in data.get('data', [])]
+                default_model = models[0] if models else 'local-model'
+
+                self.endpoints.append(Endpoint(
+                    name='LM Studio (Local)',
+                    type='openai',  # LM Studio uses OpenAI-compatible API
+                    base_url=f'{base_url}/v1',
+                    available=True,
+                    local=True,
+                    default_model=default_model,
+                    priority=60,
+                    models=models,
+                    latency_ms=latency_ms
+                ))
         except Exception:
             # LM Studio not available
             pass
 
+    async def _detect_openai_compatible(self, base_url: str, index: int = 0):
+        """Detect an extra OpenAI-compatible endpoint from extra_targets"""
+        try:
+            data, latency_ms = await self._get_json(f'{base_url}/models')
+            if data is not None:
+                models = [m['id'] for m in data.get('data', [])]
+                host = urlsplit(base_url).hostname or base_url
+
+                self.endpoints.append(Endpoint(
+                    name=f'OpenAI-compatible ({host})',
+                    type='openai',
+                    base_url=base_url,
+                    available=True,
+                    local=host in ('localhost', '127.0.0.1', '::1'),
+                    default_model=models[0] if models else 'default',
+                    # Explicitly configured servers rank above auto-detected local ones
+                    priority=85 - index,
+                    models=models,
+                    probed_unauthenticated=True,
+                    latency_ms=latency_ms
+                ))
+        except Exception:
+            # Server not available
+            pass
+
     def get_available_endpoints(self) -> List[Endpoint]:
         """Get list of available endpoints"""
         return [e for e in self.endpoints if e.available]
@@ -187,6 +562,21 @@ class LLMDetector:
         return available[0] if available else None
 
 
+async def _sample_ttft(endpoint: Endpoint) -> float:
+    """Time a one-token streamed completion to its first chunk, in milliseconds"""
+    from .client import create_client, create_streaming_chat, get_model
+
+    client = create_client(endpoint)
+    started = time.perf_counter()
+    stream = await create_streaming_chat(
+        client, endpoint, get_model(endpoint),
+        [{'role': 'user', 'content': 'Hi'}], {'maxTokens': 1}
+    )
+    async for _ in stream:
+        break
+    return (time.perf_counter() - started) * 1000
+
+
 async def select_endpoint(detector: LLMDetector, preference: Optional[str] = None) -> Endpoint:
     """
     Select the best endpoint based on preference
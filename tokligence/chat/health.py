@@ -0,0 +1,178 @@
+"""
+Endpoint Health Monitor
+
+Keeps probing the endpoints found by LLMDetector so a chat session can move
+to a healthy endpoint when the one it uses goes down.
+
+Probes run in a daemon thread with its own event loop (the chat loop blocks
+on terminal input) and reuse one pooled HTTP client. Any HTTP response below
+500 counts as healthy, since API endpoints answer unauthenticated requests
+with 401/404; 5xx responses, connection errors and timeouts count as
+failures.
+
+An endpoint whose request failed (report_failure) stays down until it has
+passed failure_threshold consecutive probes, so one lucky probe cannot send
+the session straight back to it.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .detector import PROBE_CONNECT_TIMEOUT, Endpoint, LLMDetector
+
+# Seconds between probe rounds
+HEALTH_INTERVAL = 15.0
+
+# Consecutive failed probes before an endpoint is considered down
+FAILURE_THRESHOLD = 2
+
+
+class HealthMonitor:
+    """Background health checks for the available endpoints of a detector"""
+
+    def __init__(self, detector: LLMDetector, interval: float = HEALTH_INTERVAL,
+                 failure_threshold: int = FAILURE_THRESHOLD, timeout: float = 5.0):
+        """
+        Initialize the monitor.
+
+        Args:
+            detector: Detector whose available endpoints are watched (re-read
+                every round, so a background detection refresh is picked up)
+            interval: Seconds between probe rounds
+            failure_threshold: Consecutive failures before an endpoint is down
+            timeout: Seconds a probe may take
+        """
+        self.detector = detector
+        self.interval = interval
+        self.failure_threshold = failure_threshold
+        self.timeout = timeout
+        self.failures: Dict[str, int] = {}
+        # Consecutive probe successes still needed by endpoints whose request failed
+        self.probation: Dict[str, int] = {}
+        self.last_checked: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def is_healthy(self, endpoint: Endpoint) -> bool:
+        """Whether the endpoint is below the failure threshold"""
+        with self._lock:
+            return self.failures.get(endpoint.key, 0) < self.failure_threshold
+
+    def report_failure(self, endpoint: Endpoint):
+        """Mark an endpoint down at once (e.g. after a failed request)"""
+        with self._lock:
+            self.failures[endpoint.key] = max(
+                self.failures.get(endpoint.key, 0) + 1, self.failure_threshold
+            )
+            self.probation[endpoint.key] = self.failure_threshold
+
+    def report_success(self, endpoint: Endpoint):
+        """Mark an endpoint healthy (e.g. after a successful request)"""
+        with self._lock:
+            self.failures[endpoint.key] = 0
+            self.probation.pop(endpoint.key, None)
+
+    def _probe_succeeded(self, endpoint: Endpoint):
+        """Count a passed probe; an endpoint on probation needs several in a row"""
+        with self._lock:
+            remaining = self.probation.get(endpoint.key, 0) - 1
+            if remaining > 0:
+                self.probation[endpoint.key] = remaining
+                return
+            self.probation.pop(endpoint.key, None)
+            self.failures[endpoint.key] = 0
+
+    def _probe_failed(self, endpoint: Endpoint):
+        """Count a failed probe, restarting the probation of an endpoint on it"""
+        with self._lock:
+            self.failures[endpoint.key] = self.failures.get(endpoint.key, 0) + 1
+            if endpoint.key in self.probation:
+                self.probation[endpoint.key] = self.failure_threshold
+
+    def healthy_endpoints(self, exclude: Optional[Endpoint] = None) -> List[Endpoint]:
+        """
+        Get healthy endpoints, best first.
+
+        Args:
+            exclude: Endpoint to leave out (usually the one that just failed)
+
+        Returns:
+            Available, healthy endpoints in the detector's ranking order
+        """
+        return [
+            e for e in self.detector.get_available_endpoints()
+            if (exclude is None or e.key != exclude.key) and self.is_healthy(e)
+        ]
+
+    async def check(self, client=None):
+        """
+        Probe every available endpoint once.
+
+        Args:
+            client: httpx.AsyncClient to use (a temporary one if not given)
+        """
+        if client is None:
+            async with self._http_client() as client:
+                return await self.check(client)
+
+        async def probe(endpoint: Endpoint):
+            started = time.perf_counter()
+            try:
+                response = await client.get(endpoint.base_url)
+            except Exception:
+                self._probe_failed(endpoint)
+                return
+            if response.status_code >= 500:
+                self._probe_failed(endpoint)
+                return
+            endpoint.record_latency((time.perf_counter() - started) * 1000)
+            self._probe_succeeded(endpoint)
+
+        await asyncio.gather(*(probe(e) for e in self.detector.get_available_endpoints()))
+        self.last_checked = time.time()
+
+    def _http_client(self):
+        """Create the pooled client reused by every probe round."""
+        import httpx
+        return httpx.AsyncClient(timeout=httpx.Timeout(self.timeout, connect=PROBE_CONNECT_TIMEOUT))
+
+    def start(self) -> 'HealthMonitor':
+        """Start probing in a background thread."""
+        if self._thread is not None:
+            return self
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='tokligence-health-monitor',
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        """Probe rounds until stopped, on a private event loop and client."""
+        loop = asyncio.new_event_loop()
+        try:
+            client = self._http_client()
+            try:
+                while not self._stop_event.wait(self.interval):
+                    try:
+                        loop.run_until_complete(self.check(client))
+                    except Exception:
+                        pass
+            finally:
+                loop.run_until_complete(client.aclose())
+        finally:
+            loop.close()
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop the background thread.
+
+        Args:
+            timeout: Maximum seconds to wait for a probe round in progress
+        """
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
@@ -0,0 +1,89 @@
+"""
+Streamed Text Rendering
+
+Writes model output to the terminal in frames instead of once per token.
+Deltas are buffered and written as raw text (no rich markup or highlighting,
+which also keeps model text like "[bold]" from being interpreted) when a
+newline arrives or when the frame timer fires.
+"""
+
+import asyncio
+import time
+from typing import Any, List, Optional
+
+# Frames per second for buffered output
+RENDER_FPS = 60.0
+
+
+class StreamRenderer:
+    """Coalesce streamed text deltas and flush them at most once per frame"""
+
+    def __init__(self, file: Any, fps: float = RENDER_FPS):
+        """
+        Initialize the renderer.
+
+        Args:
+            file: Text stream to write to (e.g. ``console.file``)
+            fps: Maximum flushes per second, apart from newline flushes
+        """
+        self.file = file
+        self.interval = 1.0 / fps
+        self.chunks = 0
+        self.chars = 0
+        self.flushes = 0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._parts: List[str] = []
+        self._last_flush = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def write(self, text: str):
+        """Buffer a delta; flush on newline, or schedule a flush for the end of the frame"""
+        if not text:
+            return
+        now = time.perf_counter()
+        if self.started is None:
+            self.started = now
+        self.chunks += 1
+        self.chars += len(text)
+        self._parts.append(text)
+
+        if '\n' in text or now - self._last_flush >= self.interval:
+            self.flush()
+        elif self._timer is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return  # No loop: flushed by the next write or close()
+            self._timer = loop.call_later(self.interval, self.flush)
+
+    def flush(self):
+        """Write buffered text"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._parts:
+            return
+        self.file.write(''.join(self._parts))
+        self.file.flush()
+        self._parts.clear()
+        self.flushes += 1
+        self._last_flush = time.perf_counter()
+
+    def close(self):
+        """Flush what is left and stop the clock for stats()"""
+        self.flush()
+        if self.started is not None:
+            self.finished = time.perf_counter()
+
+    def stats(self) -> dict:
+        """Chunks, characters, flushes and chunks per second rendered"""
+        elapsed = None
+        if self.started is not None:
+            elapsed = (self.finished or time.perf_counter()) - self.started
+        return {
+            'chunks': self.chunks,
+            'chars': self.chars,
+            'flushes': self.flushes,
+            'chunks_per_second': self.chunks / elapsed if elapsed else None,
+        }
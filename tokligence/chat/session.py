@@ -9,23 +9,57 @@ import sys
 from typing import Optional, Dict, Any, List
 from rich.console import Console
 from rich.panel import Panel
+from .context import CONTEXT_BUDGET, ContextBudget
 from .detector import LLMDetector, select_endpoint
+from .health import HealthMonitor
 from .knowledge import load_knowledge
-from .client import create_client, get_model, create_streaming_chat
+from .render import StreamRenderer
+from .client import (
+    MessageAccumulator,
+    TextDelta,
+    create_client,
+    create_hedged_streaming_chat,
+    create_streaming_chat,
+    get_model,
+    stream_events,
+)
 from .tools import TOOLS, parse_tool_calls, execute_tool_calls, get_platform_info
 
 console = Console()
 
 
 class ChatSession:
-    """Interactive chat session"""
+    """
+    Interactive chat session
+
+    With a detector, a request that fails on the current endpoint is retried
+    on the next healthy one (best first) with the same message history; with
+    a HealthMonitor, endpoints it has marked down are also left before the
+    next request is sent.
 
-    def __init__(self, endpoint, client, model, knowledge):
+    With hedge_delay (and a detector), a request that has not streamed within
+    that many seconds is also sent to the next best endpoint; the first one
+    to stream answers the turn and the other is cancelled.
+
+    Before every request the history is compacted to context_budget estimated
+    tokens (see ContextBudget; 0 for no limit), and the prompt size of the
+    turn is shown after the reply.
+    """
+
+    def __init__(self, endpoint, client, model, knowledge, detector=None, monitor=None,
+                 model_preference: Optional[str] = None, hedge_delay: Optional[float] = None,
+                 context_budget: Optional[int] = None):
         self.endpoint = endpoint
         self.client = client
         self.model = model
         self.knowledge = knowledge
+        self.detector = detector
+        self.monitor = monitor
+        self.model_preference = model_preference
+        self.hedge_delay = hedge_delay
+        self.context = ContextBudget(CONTEXT_BUDGET if context_budget is None else context_budget)
         self.messages: List[Dict[str, Any]] = []
+        self._clients: Dict[str, Any] = {endpoint.key: client}
 
         # Initialize system prompt
         system_prompt = knowledge.build_system_prompt()
@@ -88,11 +122,82 @@ class ChatSession:
         except Exception as e:
             console.print(f"\n[red]❌ Unexpected error: {e}[/red]\n")
 
+    def _candidates(self) -> List[Any]:
+        """Endpoints to switch or hedge to, best first."""
+        if self.detector is None:
+            return []
+        if self.monitor is not None:
+            return self.monitor.healthy_endpoints()
+        return self.detector.get_available_endpoints()
+
+    def _client_for(self, endpoint) -> Any:
+        """Create (once per session) the client for an endpoint."""
+        client = self._clients.get(endpoint.key)
+        if client is None:
+            client = self._clients[endpoint.key] = create_client(endpoint)
+        return client
+
+    def _model_for(self, endpoint) -> str:
+        """The preferred model if the endpoint offers it, else its default."""
+        if self.model_preference and self.model_preference in endpoint.models:
+            return self.model_preference
+        return get_model(endpoint)
+
+    def failover(self, tried: set, reason: Optional[Exception] = None, failed=None) -> bool:
+        """
+        Switch to the best healthy endpoint not tried yet, keeping the history.
+
+        Args:
+            tried: Keys of endpoints that already failed (not retried)
+            reason: Error that caused the switch, for the notice
+            failed: Endpoint that failed (default: the current one)
+
+        Returns:
+            True if the session now uses another endpoint
+        """
+        if self.detector is None:
+            return False
+        failed = failed or self.endpoint
+        if self.monitor is not None:
+            self.monitor.report_failure(failed)
+
+        for endpoint in self._candidates():
+            if endpoint.key in tried:
+                continue
+            try:
+                client = self._client_for(endpoint)
+            except Exception:
+                tried.add(endpoint.key)
+                continue
+
+            self.endpoint = endpoint
+            self.client = client
+            self.model = self._model_for(endpoint)
+            detail = f": {reason}" if reason is not None else ""
+            console.print(f"\n[yellow]⚠️  {failed.name} is unavailable{detail}[/yellow]")
+            console.print(f"[yellow]↪ Switched to {endpoint.name} ({self.model})[/yellow]")
+            return True
+        return False
+
+    def _hedge_backup(self, tried: set):
+        """(endpoint, client, model) to hedge the current request with, or None."""
+        if self.hedge_delay is None:
+            return None
+        for endpoint in self._candidates():
+            if endpoint.key == self.endpoint.key or endpoint.key in tried:
+                continue
+            try:
+                return endpoint, self._client_for(endpoint), self._model_for(endpoint)
+            except Exception:
+                continue
+        return None
+
     async def get_response(self):
         """Get AI response with tool calling support"""
         should_continue = True
         iteration_count = 0
         max_iterations = 5  # Prevent infinite loops
+        tried = set()  # Endpoints that failed during this response
 
         while should_continue and iteration_count < max_iterations:
             iteration_count += 1
@@ -101,130 +206,70 @@ class ChatSession:
             if iteration_count > 1:
                 console.print(f"[dim]Processing (step {iteration_count})...[/dim]")
 
-            # Create streaming chat completion
-            stream = await create_streaming_chat(
-                self.client,
-                self.endpoint,
-                self.model,
-                self.messages,
-                {
-                    'tools': TOOLS,
-                    'temperature': 0.7,
-                    'maxTokens': 2048
-                }
-            )
+            # Move off an endpoint the health monitor has marked down
+            if self.monitor is not None and not self.monitor.is_healthy(self.endpoint):
+                tried.add(self.endpoint.key)
+                self.failover(tried)
 
-            # Show Assistant label when response starts
-            if iteration_count == 1:
-                console.print("[cyan]Assistant:[/cyan] ", end='')
-
-            assistant_message = ''
-            tool_calls = []
-
-            # Process stream based on endpoint type
-            if self.endpoint.type == 'openai' or self.endpoint.type == 'ollama':
-                # OpenAI-compatible API
-                async for chunk in stream:
-                    delta = chunk.choices[0].delta if chunk.choices else None
-
-                    if delta and delta.content:
-                        # Stream text content to user
-                        console.print(delta.content, end='')
-                        assistant_message += delta.content
-
-                    # Handle tool calls
-                    if delta and delta.tool_calls:
-                        for tool_call_delta in delta.tool_calls:
-                            index = tool_call_delta.index
-
-                            if index >= len(tool_calls):
-                                tool_calls.append({
-                                    'id': tool_call_delta.id or '',
-                                    'type': 'function',
-                                    'function': {
-                                        'name': '',
-                                        'arguments': ''
-                                    }
-                                })
-
-                            if tool_call_delta.id:
-                                tool_calls[index]['id'] = tool_call_delta.id
-
-                            if tool_call_delta.function and tool_call_delta.function.name:
-                                tool_calls[index]['function']['name'] += tool_call_delta.function.name
-
-                            if tool_call_delta.function and tool_call_delta.function.arguments:
-                                tool_calls[index]['function']['arguments'] += tool_call_delta.function.arguments
-
-                    # Check if done
-                    finish_reason = chunk.choices[0].finish_reason if chunk.choices else None
-                    if finish_reason == 'stop':
-                        should_continue = False
-                    elif finish_reason == 'tool_calls':
-                        should_continue = True
-
-            elif self.endpoint.type == 'anthropic':
-                # Anthropic streaming format
-                async for event in stream:
-                    if event.type == 'content_block_delta':
-                        if event.delta.type == 'text_delta':
-                            console.print(event.delta.text, end='')
-                            assistant_message += event.delta.text
-                    elif event.type == 'content_block_start':
-                        if event.content_block.type == 'tool_use':
-                            tool_calls.append({
-                                'id': event.content_block.id,
-                                'type': 'function',
-                                'function': {
-                                    'name': event.content_block.name,
-                                    'arguments': ''
-                                }
-                            })
-                    elif event.type == 'content_block_delta' and event.delta.type == 'input_json_delta':
-                        # Accumulate tool arguments
-                        if tool_calls:
-                            tool_calls[-1]['function']['arguments'] += event.delta.partial_json
-                    elif event.type == 'message_stop':
-                        should_continue = len(tool_calls) > 0
-
-            elif self.endpoint.type == 'google':
-                # Google Gemini streaming format
-                async for chunk in stream:
-                    chunk_text = chunk.text
-                    if chunk_text:
-                        console.print(chunk_text, end='')
-                        assistant_message += chunk_text
-
-                    # Handle function calls
-                    if hasattr(chunk, 'function_calls') and chunk.function_calls:
-                        for fc in chunk.function_calls:
-                            import json
-                            tool_calls.append({
-                                'id': f'google_{len(tool_calls)}',
-                                'type': 'function',
-                                'function': {
-                                    'name': fc.name,
-                                    'arguments': json.dumps(dict(fc.args))
-                                }
-                            })
-
-                should_continue = len(tool_calls) > 0
-
-            console.print()  # New line after streaming
+            # Keep the history within the context budget
+            self.messages = self.context.compact(self.messages)
 
-            # Build assistant message object
-            message_obj = {
-                'role': 'assistant',
-                'content': assistant_message or None
+            options = {
+                'tools': TOOLS,
+                'temperature': 0.7,
+                'maxTokens': 2048
             }
+            stream_endpoint = self.endpoint
+            try:
+                backup = self._hedge_backup(tried)
+                if backup is not None:
+                    # Also ask the next best endpoint if this one is slow to start
+                    stream_endpoint, _, _, stream = await create_hedged_streaming_chat(
+                        [(self.endpoint, self.client, self.model), backup],
+                        self.messages,
+                        options,
+                        hedge_delay=self.hedge_delay
+                    )
+                else:
+                    # Create streaming chat completion
+                    stream = await create_streaming_chat(
+                        self.client,
+                        self.endpoint,
+                        self.model,
+                        self.messages,
+                        options
+                    )
+
+                # Show Assistant label when response starts
+                if iteration_count == 1:
+                    console.print("[cyan]Assistant:[/cyan] ", end='')
+
+                reply = MessageAccumulator()
+                # Stream text content to user, one terminal write per frame
+                renderer = StreamRenderer(console.file)
+                try:
+                    async for event in stream_events(stream_endpoint, stream):
+                        reply.add(event)
+                        if type(event) is TextDelta:
+                            renderer.write(event.text)
+                finally:
+                    renderer.close()
+
+                console.print()  # New line after streaming
+            except Exception as e:
+                tried.add(stream_endpoint.key)
+                if not self.failover(tried, reason=e, failed=stream_endpoint):
+                    raise
+                # Retry this step on the new endpoint with the same history
+                iteration_count -= 1
+                continue
 
-            if tool_calls:
-                message_obj['tool_calls'] = tool_calls
-
+            # Build assistant message object
+            message_obj = reply.message()
             self.messages.append(message_obj)
 
             # Execute tool calls if present
-            if tool_calls:
+            if 'tool_calls' in message_obj:
                 parsed_tool_calls = parse_tool_calls(message_obj)
                 tool_results = await execute_tool_calls(parsed_tool_calls)
 
@@ -240,13 +285,38 @@ class ChatSession:
         if iteration_count >= max_iterations:
             console.print("[yellow]⚠️  Maximum iterations reached. Please start a new query.[/yellow]")
 
-
-async def start_chat(model: Optional[str] = None):
+        self._report_prompt_size()
+
+    def _report_prompt_size(self):
+        """Show the estimated prompt size of the last request."""
+        report = self.context.last_report
+        if report is None:
+            return
+        budget = f" of {report['budget']:,}" if report['budget'] else ""
+        compacted = []
+        if report['summarized']:
+            compacted.append(f"{report['summarized']} earlier turn(s) summarized")
+        if report['truncated']:
+            compacted.append(f"{report['truncated']} tool result(s) truncated")
+        detail = f"; {', '.join(compacted)}" if compacted else ""
+        console.print(f"[dim]Prompt: ~{report['tokens']:,}{budget} tokens, "
+                      f"{report['messages']} messages{detail}[/dim]")
+
+
+async def start_chat(model: Optional[str] = None, rescan: bool = False, measure: bool = False,
+                     hedge_delay: Optional[float] = None, context_budget: Optional[int] = None):
     """
     Start interactive chat session
 
     Args:
         model: Optional preferred model name
+        rescan: Probe local LLM servers even if cached results are fresh
+        measure: Sample round trip and time to first token of every endpoint
+            before choosing one
+        hedge_delay: Send a request that has not started streaming after this
+            many seconds to the next best endpoint as well
+        context_budget: Estimated prompt tokens the history is compacted to
+            (default CONTEXT_BUDGET; 0 for no limit)
 
     Raises:
         RuntimeError: If no LLM endpoints are available
@@ -257,7 +327,10 @@ async def start_chat(model: Optional[str] = None):
         # Step 1: Detect available LLM endpoints
         console.print("🔍 Detecting available LLM endpoints...")
         detector = LLMDetector()
-        await detector.detect_all()
+        await detector.detect_all(use_cache=not rescan)
+        if measure:
+            console.print("⏱️  Measuring endpoint latency...")
+            await detector.measure(ttft=True)
 
         available = detector.get_available_endpoints()
         if not available:
@@ -266,12 +339,16 @@ async def start_chat(model: Optional[str] = None):
                 "  - OpenAI: export TOKLIGENCE_OPENAI_API_KEY=sk-...\n"
                 "  - Anthropic: export TOKLIGENCE_ANTHROPIC_API_KEY=sk-ant-...\n"
                 "  - Google Gemini: export TOKLIGENCE_GOOGLE_API_KEY=...\n"
-                "  - Or run a local LLM (Ollama, vLLM, LM Studio)"
+                "  - Or run a local LLM (Ollama, vLLM, LM Studio)\n"
+                "Started a local server just now? Run 'tgw chat --rescan' to probe again."
             )
 
-        console.print(f"   Found {len(available)} endpoint(s):")
+        cached = (" [dim](cached local results; rescanning in the background)[/dim]"
+                  if detector.from_cache else "")
+        console.print(f"   Found {len(available)} endpoint(s):{cached}")
         for ep in available:
-            console.print(f"   • {ep.name} ({'local' if ep.local else 'remote'})")
+            latency = f", ~{ep.score_ms:.0f} ms" if ep.score_ms is not None else ""
+            console.print(f"   • {ep.name} ({'local' if ep.local else 'remote'}{latency})")
 
         # Step 2: Select the best endpoint
         endpoint = await select_endpoint(detector)
@@ -287,9 +364,15 @@ async def start_chat(model: Optional[str] = None):
         knowledge = load_knowledge()
         console.print(f"   Loaded {len(knowledge.get_available_docs())} documents")
 
-        # Step 5: Start chat session
-        session = ChatSession(endpoint, client, model_name, knowledge)
-        await session.start()
+        # Step 5: Start chat session, watching the other endpoints for failover
+        monitor = HealthMonitor(detector).start()
+        try:
+            session = ChatSession(endpoint, client, model_name, knowledge,
+                                  detector=detector, monitor=monitor, model_preference=model,
+                                  hedge_delay=hedge_delay, context_budget=context_budget)
+            await session.start()
+        finally:
+            monitor.stop(timeout=1.0)
 
     except Exception as e:
         console.print(f"\n[red]❌ Failed to start chat: {e}[/red]\n")
@@ -5,13 +5,23 @@ Provides tools for the LLM to execute gateway configuration commands.
 Handles cross-platform differences and sensitive data masking.
 """
 
+import asyncio
+import functools
 import os
 import platform
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
 from ..gateway import Gateway
 from ..daemon import Daemon
 from .knowledge import load_knowledge
 
+# Seconds a single tool call may take (start_gateway waits up to the daemon's
+# ready timeout)
+TOOL_TIMEOUT = 30.0
+
+# Tools without side effects; consecutive calls to these run concurrently,
+# any other tool runs on its own, in the order the model asked for it
+READ_ONLY_TOOLS = frozenset({'get_config', 'get_status', 'search_docs', 'get_doc'})
+
 
 def is_sensitive_config_key(key: str) -> bool:
     """
@@ -221,6 +231,17 @@ Storage:
 ]
 
 
+async def run_blocking(func: Callable, *args, **kwargs):
+    """
+    Run blocking work (Daemon calls, document loading) in the default thread pool
+
+    Objects the work is called on must be created by the caller: Daemon() installs
+    signal handlers, which only works on the main thread.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
 async def execute_tool(tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
     """
     Execute a tool function
@@ -256,6 +277,18 @@ async def execute_tool(tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
             key = args['key']
             value = args['value']
 
+            from ..schema import SETTINGS_SCHEMA, ConfigValidationError
+            try:
+                SETTINGS_SCHEMA.validate_value(key, value)
+            except ConfigValidationError as e:
+                return {
+                    'success': False,
+                    'error': f'Invalid value for {key}',
+                    # Validation messages quote the value; keep secrets out of them
+                    'message': f'{key}: invalid value' if is_sensitive_config_key(key) else str(e),
+                    'key': key,
+                }
+
             # Use gateway's config methods (these need to be implemented in gateway.py)
             # For now, we'll use a placeholder
             sensitive = is_sensitive_config_key(key)
@@ -316,7 +349,7 @@ async def execute_tool(tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
                 }
 
         elif tool_name == 'get_status':
-            status = get_daemon().status()
+            status = await run_blocking(get_daemon().status)
             is_running = status.get('status') == 'running'
             pid = status.get('pid')
 
@@ -332,7 +365,7 @@ async def execute_tool(tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
             daemon_mode = args.get('daemon', True)
 
             # Check if already running
-            status = get_daemon().status()
+            status = await run_blocking(get_daemon().status)
             if status.get('status') == 'running':
                 return {
                     'success': False,
@@ -340,15 +373,12 @@ async def execute_tool(tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
                     'platform': platform_info['platform']
                 }
 
-            # Start daemon
-            get_daemon().start(background=daemon_mode)
-
-            # Wait a bit for startup
-            import asyncio
-            await asyncio.sleep(2)
+            # Start daemon; start() polls until the daemon is ready, so run it
+            # off the event loop instead of sleeping for a fixed time
+            await run_blocking(get_daemon().start, background=daemon_mode)
 
             # Verify it started
-            status = get_daemon().status()
+            status = await run_blocking(get_daemon().status)
             is_running = status.get('status') == 'running'
             pid = status.get('pid')
 
@@ -373,7 +403,7 @@ async def execute_tool(tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
 
         elif tool_name == 'stop_gateway':
             # Check if running
-            status = get_daemon().status()
+            status = await run_blocking(get_daemon().status)
             if status.get('status') != 'running':
                 return {
                     'success': False,
@@ -381,15 +411,11 @@ async def execute_tool(tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
                     'platform': platform_info['platform']
                 }
 
-            # Stop daemon
-            get_daemon().stop()
-
-            # Wait a bit for shutdown
-            import asyncio
-            await asyncio.sleep(1)
+            # Stop daemon; stop() returns as soon as the process has exited
+            await run_blocking(get_daemon().stop)
 
             # Verify it stopped
-            status = get_daemon().status()
+            status = await run_blocking(get_daemon().status)
             is_running = status.get('status') == 'running'
 
             return {
@@ -404,8 +430,8 @@ async def execute_tool(tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
 
         elif tool_name == 'search_docs':
             query = args['query']
-            knowledge = load_knowledge()
-            results = knowledge.search_docs(query)
+            knowledge = await run_blocking(load_knowledge)
+            results = await run_blocking(knowledge.search_docs, query)
 
             return {
                 'success': True,
@@ -422,7 +448,7 @@ async def execute_tool(tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
 
         elif tool_name == 'get_doc':
             name = args['name']
-            knowledge = load_knowledge()
+            knowledge = await run_blocking(load_knowledge)
             content = knowledge.get_doc(name)
 
             if not content:
@@ -479,38 +505,78 @@ def parse_tool_calls(message: Dict[str, Any]) -> List[Dict[str, Any]]:
     ]
 
 
-async def execute_tool_calls(tool_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+async def execute_tool_call(tool_call: Dict[str, Any],
+                            timeout: Optional[float] = TOOL_TIMEOUT) -> Dict[str, Any]:
+    """
+    Execute one parsed tool call with a time limit
+
+    Args:
+        tool_call: Parsed tool call
+        timeout: Seconds the call may take (None for no limit)
+
+    Returns:
+        Tool execution result; a failed result if the call timed out
+    """
+    try:
+        return await asyncio.wait_for(
+            execute_tool(tool_call['name'], tool_call.get('args', {})), timeout
+        )
+    except asyncio.TimeoutError:
+        return {
+            'success': False,
+            'error': f"{tool_call['name']} timed out after {timeout:g}s",
+            'platform': get_platform_info()['platform']
+        }
+
+
+async def execute_tool_calls(tool_calls: List[Dict[str, Any]],
+                             timeout: Optional[float] = TOOL_TIMEOUT) -> List[Dict[str, Any]]:
     """
     Execute all tool calls from a message
 
+    Consecutive read-only calls (see READ_ONLY_TOOLS) run concurrently; calls
+    that change state run alone, after everything requested before them.
+
     Args:
         tool_calls: Parsed tool calls
+        timeout: Seconds each call may take (None for no limit)
 
     Returns:
-        Tool execution results
+        Tool execution results, in the order of tool_calls
     """
     import json
 
+    # Split into batches: runs of read-only calls, and single other calls
+    batches: List[List[Dict[str, Any]]] = []
+    for tool_call in tool_calls:
+        if (tool_call['name'] in READ_ONLY_TOOLS and batches
+                and all(c['name'] in READ_ONLY_TOOLS for c in batches[-1])):
+            batches[-1].append(tool_call)
+        else:
+            batches.append([tool_call])
+
     results = []
 
-    for tool_call in tool_calls:
-        print(f"\n🔧 Executing: {tool_call['name']}", tool_call.get('args', {}))
+    for batch in batches:
+        for tool_call in batch:
+            print(f"\n🔧 Executing: {tool_call['name']}", tool_call.get('args', {}))
 
-        result = await execute_tool(tool_call['name'], tool_call.get('args', {}))
+        outcomes = await asyncio.gather(*(execute_tool_call(c, timeout) for c in batch))
 
-        results.append({
-            'tool_call_id': tool_call['id'],
-            'role': 'tool',
-            'name': tool_call['name'],
-            'content': json.dumps(result)
-        })
+        for tool_call, result in zip(batch, outcomes):
+            results.append({
+                'tool_call_id': tool_call['id'],
+                'role': 'tool',
+                'name': tool_call['name'],
+                'content': json.dumps(result)
+            })
 
-        # Show result to user
-        if result.get('success'):
-            print(f"✓ {result.get('message', 'Success')}")
-        else:
-            print(f"✗ {result.get('message') or result.get('error', 'Failed')}")
-            if result.get('note'):
-                print(f"  Note: {result['note']}")
+            # Show result to user
+            if result.get('success'):
+                print(f"✓ {result.get('message', 'Success')}")
+            else:
+                print(f"✗ {result.get('message') or result.get('error', 'Failed')}")
+                if result.get('note'):
+                    print(f"  Note: {result['note']}")
 
     return results
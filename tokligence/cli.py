@@ -6,15 +6,25 @@ import click
 import sys
 import json
 from pathlib import Path
-from typing import Optional
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from .gateway import Gateway
-from .daemon import Daemon
-from .config import load_config, save_config
+from typing import Any, Optional
 
-console = Console()
+# rich, Gateway and Daemon are imported inside the commands that use them so that
+# quick commands such as `tgw version` start without loading them.
+
+
+class _LazyConsole:
+    """Proxy that creates the rich Console on first use."""
+
+    _console: Any = None
+
+    def __getattr__(self, name: str) -> Any:
+        if self._console is None:
+            from rich.console import Console
+            self._console = Console()
+        return getattr(self._console, name)
+
+
+console = _LazyConsole()
 
 
 @click.group()
@@ -43,6 +53,9 @@ def user(ctx):
 @click.pass_context
 def user_create(ctx, username, email):
     """Create a new user"""
+    from rich.panel import Panel
+    from .gateway import Gateway
+
     gateway = Gateway(config_path=ctx.obj.get('config_path'))
     try:
         result = gateway.create_user(username, email)
@@ -54,11 +67,51 @@ def user_create(ctx, username, email):
         sys.exit(1)
 
 
+@user.command('import')
+@click.argument('csv_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--workers', default=8, show_default=True, help='Concurrent gateway calls')
+@click.pass_context
+def user_import(ctx, csv_file, workers):
+    """Create users from a CSV file with 'username' and optional 'email' columns"""
+    import csv
+    from rich.panel import Panel
+    from .gateway import Gateway
+
+    gateway = Gateway(config_path=ctx.obj.get('config_path'))
+    with open(csv_file, newline='') as f:
+        rows = csv.DictReader(f)
+        if not rows.fieldnames or 'username' not in rows.fieldnames:
+            console.print(Panel("❌ Error: CSV must have a 'username' column", style="red"))
+            sys.exit(1)
+
+        run = gateway.create_users_bulk(rows, max_workers=workers)
+        for result in run:
+            username = result.item.get('username', '')
+            if result.ok:
+                user_id = (result.result or {}).get('id', '')
+                console.print(f"[green]✓[/green] {username} {user_id}")
+            else:
+                console.print(f"[red]✗[/red] {username}: {result.error}")
+
+    style = "green" if run.failed == 0 else "yellow"
+    console.print(Panel(
+        f"Imported {run.succeeded}/{run.total} users in {run.elapsed:.2f}s "
+        f"({run.throughput:.1f} users/s)",
+        style=style
+    ))
+    if run.failed:
+        sys.exit(1)
+
+
 @user.command('list')
 @click.option('--json', 'as_json', is_flag=True, help='Output as JSON')
 @click.pass_context
 def user_list(ctx, as_json):
     """List all users"""
+    from rich.panel import Panel
+    from rich.table import Table
+    from .gateway import Gateway
+
     gateway = Gateway(config_path=ctx.obj.get('config_path'))
     try:
         users = gateway.list_users()
@@ -99,6 +152,9 @@ def apikey(ctx):
 @click.pass_context
 def apikey_create(ctx, user_id, name):
     """Create an API key for a user"""
+    from rich.panel import Panel
+    from .gateway import Gateway
+
     gateway = Gateway(config_path=ctx.obj.get('config_path'))
     try:
         result = gateway.create_api_key(user_id, name)
@@ -115,6 +171,9 @@ def apikey_create(ctx, user_id, name):
 @click.pass_context
 def init(ctx):
     """Initialize gateway configuration"""
+    from rich.panel import Panel
+    from .gateway import Gateway
+
     gateway = Gateway(config_path=ctx.obj.get('config_path'))
     try:
         if gateway.init():
@@ -127,6 +186,58 @@ def init(ctx):
         sys.exit(1)
 
 
+@cli.group('config')
+@click.pass_context
+def config_group(ctx):
+    """Configuration commands"""
+    pass
+
+
+@config_group.command('show')
+@click.option('--sources', is_flag=True, help='Show which layer each value comes from')
+@click.option('--json', 'as_json', is_flag=True, help='Output the merged configuration as JSON')
+@click.option('--set', 'overrides', multiple=True, metavar='KEY=VALUE',
+              help='Override a configuration key, e.g. gateway.port=8080 (repeatable)')
+@click.pass_context
+def config_show(ctx, sources, as_json, overrides):
+    """Show the merged configuration (defaults, file, TOKLIGENCE_* env, --set)"""
+    from rich.panel import Panel
+    from rich.table import Table
+    from .config import load_config
+
+    values = {}
+    for item in overrides:
+        key, sep, value = item.partition('=')
+        if not sep or not key:
+            raise click.BadParameter(f"expected KEY=VALUE, got {item!r}", param_hint='--set')
+        values[key.strip()] = value
+
+    try:
+        snapshot = load_config(ctx.obj.get('config_path'), values).snapshot
+    except ValueError as e:
+        console.print(Panel(f"❌ Error: {e}", style="red"))
+        sys.exit(1)
+
+    if as_json:
+        click.echo(json.dumps(snapshot.to_dict(), indent=2))
+        return
+
+    table = Table(title=str(snapshot.path))
+    table.add_column("Key", style="cyan")
+    table.add_column("Value")
+    if sources:
+        table.add_column("Source", style="yellow")
+    for key in sorted(snapshot.provenance):
+        value = snapshot.get(key)
+        if value and any(p in key.lower() for p in ('api_key', 'secret', 'token', 'password')):
+            value = '***'
+        row = [key, json.dumps(value if not isinstance(value, tuple) else list(value))]
+        if sources:
+            row.append(snapshot.source(key))
+        table.add_row(*row)
+    console.print(table)
+
+
 @cli.group()
 @click.pass_context
 def daemon(ctx):
@@ -137,10 +248,36 @@ def daemon(ctx):
 @daemon.command('start')
 @click.option('--port', default=8081, help='Port to listen on')
 @click.option('--background', is_flag=True, help='Run in background')
+@click.option('--ready-timeout', default=10.0, help='Seconds to wait for the daemon to be ready')
+@click.option('--workers', type=int, help='Run N supervised workers on consecutive ports')
+@click.option('--proxy-port', type=int,
+              help='With --workers, load-balance the workers behind this port')
+@click.option('--watch-config', is_flag=True,
+              help='Restart when the configuration file changes (foreground only)')
 @click.pass_context
-def daemon_start(ctx, port, background):
+def daemon_start(ctx, port, background, ready_timeout, workers, proxy_port, watch_config):
     """Start the gateway daemon"""
-    d = Daemon(config_path=ctx.obj.get('config_path'), port=port)
+    from .daemon import Daemon
+
+    if workers:
+        from .supervisor import Supervisor
+
+        supervisor = Supervisor(workers, base_port=port, config_path=ctx.obj.get('config_path'),
+                                ready_timeout=ready_timeout, proxy_port=proxy_port)
+        last_port = port + workers - 1
+        if background:
+            console.print(f"Starting {workers} workers on ports {port}-{last_port} (background)...")
+            pid = supervisor.spawn_background(['--ready-timeout', str(ready_timeout)])
+            console.print(f"Supervisor PID: {pid}")
+        else:
+            console.print(f"Starting {workers} workers on ports {port}-{last_port}...")
+            console.print("[dim]Press Ctrl+C to stop[/dim]")
+            if proxy_port:
+                console.print(f"Load balancing on port {proxy_port}")
+            supervisor.run()
+        return
+
+    d = Daemon(config_path=ctx.obj.get('config_path'), port=port, ready_timeout=ready_timeout)
 
     if background:
         console.print(f"Starting daemon on port {port} (background)...")
@@ -149,39 +286,89 @@ def daemon_start(ctx, port, background):
         console.print(f"Starting daemon on port {port}...")
         console.print("[dim]Press Ctrl+C to stop[/dim]")
         try:
-            process = d.start()
-            if process:
-                process.wait()
+            d.start()
+            if watch_config:
+                d.watch_config()
+                console.print("[dim]Watching configuration for changes[/dim]")
+            d.wait()
         except KeyboardInterrupt:
             console.print("\n[yellow]Stopping daemon...[/yellow]")
             d.stop()
 
 
 @daemon.command('stop')
+@click.option('--port', default=8081, help='Port of the (first) daemon')
+@click.option('--workers', type=int, help='Stop N supervised workers')
 @click.pass_context
-def daemon_stop(ctx):
+def daemon_stop(ctx, port, workers):
     """Stop the gateway daemon"""
-    d = Daemon(config_path=ctx.obj.get('config_path'))
+    from rich.panel import Panel
+    from .daemon import Daemon
+
+    if workers:
+        from .supervisor import Supervisor
+
+        supervisor = Supervisor(workers, base_port=port, config_path=ctx.obj.get('config_path'))
+        if not supervisor.stop_background():
+            supervisor.stop()
+        console.print(Panel("✅ Workers stopped", style="green"))
+        return
+
+    d = Daemon(config_path=ctx.obj.get('config_path'), port=port)
     d.stop()
     console.print(Panel("✅ Daemon stopped", style="green"))
 
 
 @daemon.command('restart')
 @click.option('--port', default=8081, help='Port to listen on')
+@click.option('--ready-timeout', default=10.0, help='Seconds to wait for the daemon to be ready')
 @click.pass_context
-def daemon_restart(ctx, port):
+def daemon_restart(ctx, port, ready_timeout):
     """Restart the gateway daemon"""
-    d = Daemon(config_path=ctx.obj.get('config_path'), port=port)
+    from rich.panel import Panel
+    from .daemon import Daemon
+
+    d = Daemon(config_path=ctx.obj.get('config_path'), port=port, ready_timeout=ready_timeout)
     console.print("Restarting daemon...")
     d.restart()
     console.print(Panel("✅ Daemon restarted", style="green"))
 
 
 @daemon.command('status')
+@click.option('--port', default=8081, help='Port of the (first) daemon')
+@click.option('--workers', type=int, help='Report status of N supervised workers')
 @click.pass_context
-def daemon_status(ctx):
+def daemon_status(ctx, port, workers):
     """Check daemon status"""
-    d = Daemon(config_path=ctx.obj.get('config_path'))
+    from rich.panel import Panel
+    from .daemon import Daemon
+
+    if workers:
+        from rich.table import Table
+        from .supervisor import Supervisor
+
+        status = Supervisor(workers, base_port=port,
+                            config_path=ctx.obj.get('config_path')).status()
+        table = Table(title=f"Workers: {status['status']} ({status['running']}/{status['total']})")
+        table.add_column("Port", style="cyan")
+        table.add_column("Status", style="green")
+        table.add_column("PID", style="yellow")
+        for worker in status['workers']:
+            table.add_row(str(worker['port']), worker['status'], str(worker.get('pid') or '-'))
+        console.print(table)
+
+        if status.get('proxy'):
+            proxy = Table(title=f"Proxy on port {status['proxy']['port']}")
+            for column in ("Backend", "Active", "Total", "Errors",
+                           "TTFB mean (ms)", "TTFB max (ms)"):
+                proxy.add_column(column)
+            for b in status['proxy']['backends']:
+                proxy.add_row(str(b['port']), str(b['active']), str(b['total']), str(b['errors']),
+                              str(b['latency_mean_ms'] or '-'), str(b['latency_max_ms']))
+            console.print(proxy)
+        return
+
+    d = Daemon(config_path=ctx.obj.get('config_path'), port=port)
     status = d.status()
 
     if status['status'] == 'running':
@@ -200,6 +387,9 @@ def daemon_status(ctx):
 @click.pass_context
 def usage(ctx, user, as_json):
     """Show usage statistics"""
+    from rich.panel import Panel
+    from .gateway import Gateway
+
     gateway = Gateway(config_path=ctx.obj.get('config_path'))
     try:
         stats = gateway.get_usage(user_id=user)
@@ -220,13 +410,22 @@ def usage(ctx, user, as_json):
 def version(ctx):
     """Show version information"""
     from . import __version__
-    console.print(f"Tokligence Gateway version: {__version__}")
+    click.echo(f"Tokligence Gateway version: {__version__}")
 
 
 @cli.command()
 @click.option('--model', help='Preferred LLM model to use (e.g., gpt-4, claude-sonnet-4.5)')
+@click.option('--rescan', is_flag=True, help='Probe local LLM servers instead of using cached results')
+@click.option('--measure', is_flag=True,
+              help='Time a one-token reply from every endpoint and prefer the fastest')
+@click.option('--hedge', 'hedge_delay', type=float, metavar='SECONDS',
+              help='Also send a request to the next best endpoint if no reply has started '
+                   'streaming after SECONDS; the first to stream wins')
+@click.option('--context-budget', type=click.IntRange(min=0), metavar='TOKENS',
+              help='Compact older conversation history to stay under about TOKENS prompt '
+                   'tokens (default 12000; 0 for no limit)')
 @click.pass_context
-def chat(ctx, model):
+def chat(ctx, model, rescan, measure, hedge_delay, context_budget):
     """Interactive AI assistant for Tokligence Gateway configuration and help
 
     The chat assistant helps you configure and troubleshoot Tokligence Gateway
@@ -241,10 +440,13 @@ def chat(ctx, model):
     The assistant requires a local or remote LLM endpoint (OpenAI API, Anthropic API,
     Gemini API, or local LLMs via Ollama/vLLM/LM Studio).
     """
+    from rich.panel import Panel
+
     try:
         # Import chat module (will create it next)
         from .chat import start_chat
-        start_chat(model=model)
+        start_chat(model=model, rescan=rescan, measure=measure, hedge_delay=hedge_delay,
+                   context_budget=context_budget)
     except ImportError:
         console.print(Panel(
             "❌ Chat feature requires additional dependencies.\n"
@@ -2,16 +2,52 @@
 Configuration management for tokligence
 """
 
+import copy
+import hashlib
+import marshal
 import os
-import yaml
 import json
+import tempfile
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any, Optional
-from .utils import get_default_config_path
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
+from .schema import CONFIG_SCHEMA
+from .utils import ensure_config_dir, get_default_config_path
+
+# Marks a key that is absent on one side of a diff
+MISSING = object()
+
+# Bumped whenever the snapshot layout changes
+_SNAPSHOT_FORMAT = 1
+
+# Files modified this recently are not snapshotted: another write within the
+# same mtime tick could otherwise go unnoticed
+_SNAPSHOT_MIN_AGE = 2.0
 
 
 class Config:
-    """Configuration manager for Tokligence Gateway."""
+    """
+    Configuration manager for Tokligence Gateway.
+
+    get() is served from a flattened index of every dotted key, built on first
+    use and rebuilt after set(), update(), reload() or assigning ``data``.
+    Code that mutates nested dictionaries in place must call invalidate().
+
+    set(), update() and save() validate values against ``schema`` (set it to
+    None to disable validation) and raise ConfigValidationError.
+
+    Configs returned by load_config() share the data of a cached ConfigSnapshot
+    until they are modified (or ``data`` or a nested section is accessed), at
+    which point they take a private copy.
+
+    save() replaces the file atomically and is skipped when the file already
+    holds the config; inside transaction() it is deferred so that many set() calls end
+    in a single write.
+    """
+
+    schema = CONFIG_SCHEMA
 
     def __init__(self, config_path: Optional[str] = None):
         """
@@ -21,7 +57,104 @@ class Config:
             config_path: Optional path to configuration file
         """
         self.config_path = Path(config_path) if config_path else get_default_config_path()
+        self._shared = False
+        self.snapshot = None
+        self._file_data: Optional[Dict[str, Any]] = None
+        self._index: Optional[Dict[str, Any]] = None
         self.data = self.load()
+        self._dirty = False
+        self._written: Optional[Tuple[str, int, int]] = None
+        self._transactions = 0
+        self._callbacks: List[Callable[[Dict[str, Tuple[Any, Any]], 'Config'], None]] = []
+
+    @classmethod
+    def from_snapshot(cls, snapshot) -> 'Config':
+        """
+        Create a Config backed by a layered ConfigSnapshot without copying it.
+
+        Args:
+            snapshot: ConfigSnapshot from resolve_config()
+
+        Returns:
+            Config instance
+        """
+        config = cls.__new__(cls)
+        config.config_path = snapshot.path
+        config.snapshot = snapshot
+        config._file_data = None
+        config._dirty = False
+        config._written = None
+        config._transactions = 0
+        config._callbacks = []
+        config._data = snapshot._data
+        config._index = snapshot.index()
+        config._shared = True
+        return config
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """The configuration dictionary."""
+        if self._shared:
+            self._thaw()
+        return self._data
+
+    @data.setter
+    def data(self, value: Dict[str, Any]):
+        self._data = value
+        self._index = None
+        self._shared = False
+        self._dirty = True
+
+    @property
+    def dirty(self) -> bool:
+        """
+        Whether the configuration changed through set(), update(), ``data``
+        assignment or invalidate() since it was loaded or saved.
+
+        In-place edits of ``data`` do not set the flag, but save() still
+        writes them: it compares what it would write with the file.
+        """
+        return self._dirty
+
+    def _thaw(self):
+        """Replace data shared with a snapshot by a private copy."""
+        self._data = copy.deepcopy(self._data)
+        self._index = None
+        self._shared = False
+
+    def _file_layer(self) -> Dict[str, Any]:
+        """The file layer of a layered config, with changes made through set()/update()."""
+        if self._file_data is None:
+            self._file_data = self.snapshot.file_dict()
+        return self._file_data
+
+    def invalidate(self):
+        """Drop the lookup index (and mark the config dirty) after mutating ``data`` in place."""
+        self._index = None
+        self._dirty = True
+
+    @staticmethod
+    def _flatten(data: Any) -> Dict[str, Any]:
+        """Flatten data into {dotted key: value}, matching what a nested walk would return."""
+        index = {}
+        stack = [('', data)] if isinstance(data, dict) else []
+        while stack:
+            prefix, node = stack.pop()
+            for k, v in node.items():
+                # Keys get() cannot address (non-strings, embedded dots) and
+                # None values (get() returns the default for them) are left out
+                if v is None or not isinstance(k, str) or '.' in k:
+                    continue
+                key = prefix + k
+                index[key] = v
+                if isinstance(v, dict):
+                    stack.append((key + '.', v))
+        return index
+
+    def _build_index(self) -> Dict[str, Any]:
+        """Build and store the lookup index for the current data."""
+        self._index = self._flatten(self._data)
+        return self._index
 
     def load(self) -> Dict[str, Any]:
         """
@@ -30,39 +163,161 @@ class Config:
         Returns:
             Configuration dictionary
         """
-        if not self.config_path.exists():
+        if self.snapshot is not None:
+            from .layers import resolve_config
+            self.snapshot = resolve_config(str(self.config_path), self.snapshot.overrides)
+            self._file_data = None
+            return self.snapshot.to_dict()
+        return self._load_file()
+
+    def _load_file(self) -> Dict[str, Any]:
+        """Read the file itself (defaults if it does not exist)."""
+        try:
+            st = os.stat(self.config_path)
+        except FileNotFoundError:
             return self.get_defaults()
+        # ctime catches rewrites that keep size and mtime (e.g. touch -r)
+        signature = (st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+        if self.config_path.suffix == '.json':
+            with open(self.config_path, 'r') as f:
+                return json.load(f)
+
+        data = _read_snapshot(self.config_path, signature)
+        if data is None:
+            data = self._parse()
+            _write_snapshot(self.config_path, signature, data)
+        return data
+
+    def _parse(self) -> Dict[str, Any]:
+        """Parse the file as YAML or JSON."""
+        # yaml is imported on demand; it is slow to import and not every caller needs it
+        import yaml
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
 
         with open(self.config_path, 'r') as f:
             if self.config_path.suffix == '.yaml' or self.config_path.suffix == '.yml':
-                return yaml.safe_load(f) or {}
-            elif self.config_path.suffix == '.json':
-                return json.load(f)
+                return yaml.load(f, Loader=loader) or {}
             else:
                 # Try to auto-detect format
                 content = f.read()
                 try:
                     return json.loads(content)
                 except json.JSONDecodeError:
-                    return yaml.safe_load(content) or {}
+                    return yaml.load(content, Loader=loader) or {}
 
-    def save(self, data: Optional[Dict[str, Any]] = None):
+    def save(self, data: Optional[Dict[str, Any]] = None) -> bool:
         """
         Save configuration to file.
 
+        For a config from load_config(), only the file layer (plus changes
+        made through set()/update()) is written, so defaults and environment
+        values such as API keys are not copied into the file.
+
+        The file is written to a temporary file in the same directory, synced
+        and renamed over the original, so a crash never leaves a truncated
+        config. Without data, nothing is written while a transaction() is
+        open (the write happens when it ends), or if the file already holds
+        the serialized config, so an unchanged config is never rewritten.
+
         Args:
             data: Configuration data to save (uses self.data if not provided)
+
+        Returns:
+            True if the file was written
+
+        Raises:
+            ConfigValidationError: If the data does not match the schema
         """
         if data is None:
-            data = self.data
+            if self._transactions:
+                return False
+            data = self._file_layer() if self.snapshot is not None else self.data
+            clean = True
+        else:
+            clean = False
+        self.validate(data)
+        text = self._serialize(data)
+
+        if clean and self._file_holds(text):
+            self._dirty = False
+            return False
+
+        _atomic_write(self.config_path, text)
+        if clean:
+            self._dirty = False
+            st = self.config_path.stat()
+            self._written = (text, st.st_mtime_ns, st.st_size)
+        return True
+
+    def _serialize(self, data: Dict[str, Any]) -> str:
+        """Text save() writes for data."""
+        if self.config_path.suffix == '.yaml' or self.config_path.suffix == '.yml':
+            import yaml
+            dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+            return yaml.dump(data, Dumper=dumper, default_flow_style=False)
+        return json.dumps(data, indent=2)
+
+    def _file_holds(self, text: str) -> bool:
+        """
+        Whether the file already holds what save() would write as text.
+
+        After a write this compares with the text written, as long as the
+        file has not changed since. Before the first write the file is read
+        back (from the parse cache for YAML) and compared as serialized, so
+        saving an unchanged config leaves the file alone.
+        """
+        try:
+            st = self.config_path.stat()
+        except OSError:
+            return False
+        stamp = (st.st_mtime_ns, st.st_size)
+        if self._written is not None and self._written[1:] == stamp:
+            return self._written[0] == text
+        try:
+            on_disk = self._serialize(self._load_file())
+        except Exception:
+            return False
+        if on_disk != text:
+            return False
+        self._written = (text,) + stamp
+        return True
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group changes into a single validated, atomic write.
 
-        self.config_path.parent.mkdir(parents=True, exist_ok=True)
+        set(), update() and save() calls inside the block only change memory;
+        the file is written once when the block exits, if anything changed.
+        If the block raises, the in-memory changes are rolled back and nothing
+        is written. Nested transactions join the outermost one.
 
-        with open(self.config_path, 'w') as f:
-            if self.config_path.suffix == '.yaml' or self.config_path.suffix == '.yml':
-                yaml.safe_dump(data, f, default_flow_style=False)
-            else:
-                json.dump(data, f, indent=2)
+        Yields:
+            This Config
+        """
+        if self._transactions:
+            self._transactions += 1
+            try:
+                yield self
+            finally:
+                self._transactions -= 1
+            return
+
+        state = (self._data, self._shared, self._file_data, self._dirty)
+        # Shared snapshot data is never mutated, so it needs no copy
+        self._data = self._data if self._shared else copy.deepcopy(self._data)
+        self._file_data = copy.deepcopy(self._file_data)
+        self._index = None
+        self._transactions = 1
+        try:
+            yield self
+        except BaseException:
+            self._data, self._shared, self._file_data, self._dirty = state
+            self._index = None
+            raise
+        finally:
+            self._transactions = 0
+        self.save()
 
     def get(self, key: str, default: Any = None) -> Any:
         """
@@ -75,18 +330,40 @@ class Config:
         Returns:
             Configuration value
         """
-        keys = key.split('.')
-        value = self.data
+        index = self._index
+        if index is None:
+            index = self._build_index()
+        value = index.get(key, default)
+        if self._shared and isinstance(value, (dict, list)) and key in index:
+            # Hand out containers from a private copy so the snapshot stays intact
+            self._thaw()
+            value = self._build_index().get(key, default)
+        return value
 
-        for k in keys:
-            if isinstance(value, dict):
-                value = value.get(k)
-                if value is None:
-                    return default
-            else:
-                return default
+    def view(self, prefix: str) -> 'ConfigView':
+        """
+        Get a read-only view of one section.
 
-        return value
+        Args:
+            prefix: Dotted key of the section (e.g. 'providers.openai')
+
+        Returns:
+            ConfigView whose keys are relative to prefix
+        """
+        return ConfigView(self, prefix)
+
+    def validate(self, data: Optional[Dict[str, Any]] = None):
+        """
+        Validate configuration data against the schema.
+
+        Args:
+            data: Data to validate (uses self.data if not provided)
+
+        Raises:
+            ConfigValidationError: If any value is invalid
+        """
+        if self.schema is not None:
+            self.schema.validate(self.data if data is None else data)
 
     def set(self, key: str, value: Any):
         """
@@ -95,16 +372,26 @@ class Config:
         Args:
             key: Configuration key (supports dot notation)
             value: Value to set
+
+        Raises:
+            ConfigValidationError: If the value does not match the schema
         """
+        if self.schema is not None:
+            self.schema.validate_value(key, value)
         keys = key.split('.')
-        data = self.data
+        targets = [self.data]
+        if self.snapshot is not None:
+            targets.append(self._file_layer())
 
-        for k in keys[:-1]:
-            if k not in data or not isinstance(data[k], dict):
-                data[k] = {}
-            data = data[k]
+        for data in targets:
+            for k in keys[:-1]:
+                if k not in data or not isinstance(data[k], dict):
+                    data[k] = {}
+                data = data[k]
 
-        data[keys[-1]] = value
+            data[keys[-1]] = value
+        self._index = None
+        self._dirty = True
 
     def update(self, updates: Dict[str, Any]):
         """
@@ -112,7 +399,14 @@ class Config:
 
         Args:
             updates: Dictionary of updates
+
+        Raises:
+            ConfigValidationError: If any value does not match the schema
+                (nothing is applied in that case)
         """
+        if self.schema is not None:
+            self.schema.validate(updates)
+
         def deep_update(d, u):
             for k, v in u.items():
                 if isinstance(v, dict):
@@ -122,6 +416,52 @@ class Config:
             return d
 
         self.data = deep_update(self.data, updates)
+        if self.snapshot is not None:
+            deep_update(self._file_layer(), copy.deepcopy(updates))
+
+    def reload(self) -> Dict[str, Tuple[Any, Any]]:
+        """
+        Re-read the file and notify callbacks about what changed.
+
+        Returns:
+            Changed dotted keys mapped to (old, new); MISSING marks an added
+            or removed key
+        """
+        old = self.data
+        self.data = self.load()
+        self._dirty = False
+        changes = diff_config(old, self.data)
+        if changes:
+            for callback in list(self._callbacks):
+                callback(changes, self)
+        return changes
+
+    def on_change(self, callback: Callable[[Dict[str, Tuple[Any, Any]], 'Config'], None]):
+        """
+        Register a callback run after a reload that changed something.
+
+        Args:
+            callback: Called with (changes, config)
+
+        Returns:
+            The callback, so this can be used as a decorator
+        """
+        self._callbacks.append(callback)
+        return callback
+
+    def watch(self, interval: float = 1.0, use_inotify: bool = True):
+        """
+        Reload automatically when the file changes.
+
+        Args:
+            interval: Polling interval in seconds when inotify is not available
+            use_inotify: Use inotify where available
+
+        Returns:
+            The started ConfigWatcher (call stop() to end watching)
+        """
+        from .watch import ConfigWatcher
+        return ConfigWatcher(self, interval=interval, use_inotify=use_inotify).start()
 
     @staticmethod
     def get_defaults() -> Dict[str, Any]:
@@ -198,17 +538,215 @@ class Config:
         return env_vars
 
 
-def load_config(config_path: Optional[str] = None) -> Config:
+class ConfigView(Mapping):
+    """
+    Read-only view of a Config section.
+
+    Lookups go through the parent's index, so a view is cheap to create and
+    always reflects the current configuration.
+    """
+
+    __slots__ = ('_config', '_prefix')
+
+    def __init__(self, config: Config, prefix: str):
+        """
+        Initialize the view.
+
+        Args:
+            config: Parent configuration
+            prefix: Dotted key of the section
+        """
+        self._config = config
+        self._prefix = prefix + '.' if prefix else ''
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Get a value relative to the view's prefix.
+
+        Args:
+            key: Configuration key (supports dot notation)
+            default: Default value if key not found
+
+        Returns:
+            Configuration value
+        """
+        return self._config.get(self._prefix + key, default)
+
+    def view(self, prefix: str) -> 'ConfigView':
+        """Get a view of a subsection."""
+        return ConfigView(self._config, self._prefix + prefix)
+
+    def _section(self) -> Dict[str, Any]:
+        """The section dictionary (empty if the prefix is missing or not a dict)."""
+        section = self._config.get(self._prefix[:-1]) if self._prefix else self._config.data
+        return section if isinstance(section, dict) else {}
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._config.get(self._prefix + key, MISSING)
+        if value is MISSING:
+            # The index leaves out None values; keys that exist still resolve
+            node: Any = self._section()
+            for part in key.split('.'):
+                if not isinstance(node, dict) or part not in node:
+                    raise KeyError(key)
+                node = node[part]
+            value = node
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._section())
+
+    def __len__(self) -> int:
+        return len(self._section())
+
+    def __repr__(self) -> str:
+        return f"ConfigView({self._prefix[:-1]!r})"
+
+
+def _snapshot_file(config_path: Path) -> Optional[Path]:
+    """
+    Get the parsed-config snapshot file for a config path.
+
+    Returns:
+        Path under the config dir's cache/, or None when disabled with
+        TOKLIGENCE_CONFIG_CACHE=0
+    """
+    if os.environ.get('TOKLIGENCE_CONFIG_CACHE', '').lower() in ('0', 'false', 'no'):
+        return None
+    digest = hashlib.sha1(str(config_path.resolve()).encode()).hexdigest()[:16]
+    return ensure_config_dir() / 'cache' / f'config-{digest}.marshal'
+
+
+def _read_snapshot(config_path: Path, signature) -> Optional[Dict[str, Any]]:
+    """
+    Return the cached parse of a config file if it is still valid.
+
+    An entry is valid only for the same path, inode, size, mtime and ctime.
+    """
+    snapshot_file = _snapshot_file(config_path)
+    if snapshot_file is None:
+        return None
+    try:
+        fmt, path, cached_signature, data = marshal.loads(snapshot_file.read_bytes())
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+    if fmt != _SNAPSHOT_FORMAT or path != str(config_path.resolve()):
+        return None
+    if tuple(cached_signature) != tuple(signature):
+        return None
+    return data
+
+
+def _write_snapshot(config_path: Path, signature, data: Dict[str, Any]):
+    """Store the parse of a config file (best effort)."""
+    snapshot_file = _snapshot_file(config_path)
+    if snapshot_file is None or time.time() - signature[2] / 1e9 < _SNAPSHOT_MIN_AGE:
+        return
+    try:
+        # marshal only handles builtin types; YAML timestamps etc. are not cached
+        payload = marshal.dumps((_SNAPSHOT_FORMAT, str(config_path.resolve()), signature, data))
+        snapshot_file.parent.mkdir(exist_ok=True)
+        tmp = snapshot_file.with_suffix(f'.{os.getpid()}.tmp')
+        tmp.write_bytes(payload)
+        os.replace(tmp, snapshot_file)
+    except (OSError, ValueError):
+        pass
+
+
+def _atomic_write(path: Path, text: str):
+    """
+    Replace a file's contents atomically (temporary file, fsync, rename).
+
+    The original file's permission bits are kept.
+
+    Args:
+        path: File to write
+        text: New contents
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = None
+
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if mode is not None:
+            os.chmod(tmp, mode)
+        else:
+            # mkstemp creates 0600 files; use the usual umask-based mode instead
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp, 0o666 & ~umask)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+    if hasattr(os, 'O_DIRECTORY'):
+        # Persist the rename itself
+        try:
+            dir_fd = os.open(str(path.parent), os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            return
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
+
+
+def diff_config(old: Dict[str, Any], new: Dict[str, Any],
+                prefix: str = '') -> Dict[str, Tuple[Any, Any]]:
+    """
+    Compare two configuration dictionaries.
+
+    Args:
+        old: Previous configuration
+        new: Current configuration
+        prefix: Dotted prefix of the dictionaries being compared
+
+    Returns:
+        Changed dotted keys (leaves only) mapped to (old, new); MISSING marks
+        an added or removed key
+    """
+    changes = {}
+    for key in old.keys() | new.keys():
+        path = f'{prefix}{key}'
+        a, b = old.get(key, MISSING), new.get(key, MISSING)
+        if isinstance(a, dict) and isinstance(b, dict):
+            changes.update(diff_config(a, b, path + '.'))
+        elif a != b:
+            changes[path] = (a, b)
+    return changes
+
+
+def load_config(config_path: Optional[str] = None,
+                overrides: Optional[Dict[str, Any]] = None) -> Config:
     """
     Load configuration from file or environment.
 
+    Defaults, the file, TOKLIGENCE_* environment variables and overrides are
+    merged in that order (see tokligence.layers). The merged snapshot is cached,
+    so repeated calls only stat the file until it or the environment changes.
+
     Args:
         config_path: Optional path to configuration file
+        overrides: Optional {dotted key: value} applied last (e.g. CLI --set)
 
     Returns:
-        Config instance
+        Config instance; ``config.snapshot.source(key)`` tells where a value came from
     """
-    return Config(config_path)
+    from .layers import resolve_config
+    return Config.from_snapshot(resolve_config(config_path, overrides))
 
 
 def save_config(config: Config, config_path: Optional[str] = None):
@@ -221,4 +759,5 @@ def save_config(config: Config, config_path: Optional[str] = None):
     """
     if config_path:
         config.config_path = Path(config_path)
+        config.invalidate()
     config.save()
\ No newline at end of file
@@ -5,12 +5,14 @@ Daemon wrapper for the Tokligence Gateway daemon (gatewayd)
 import os
 import subprocess
 import sys
-import time
 import signal
 import atexit
+import threading
 from pathlib import Path
 from typing import Optional, Dict, Any
-from .utils import find_available_binary, ensure_config_dir
+from .utils import (
+    find_available_binary, ensure_config_dir, wait_for, probe_tcp, probe_http, pid_alive
+)
 
 
 class Daemon:
@@ -18,13 +20,36 @@ class Daemon:
     Python wrapper for the Tokligence Gateway daemon (gatewayd).
     """
 
-    def __init__(self, config_path: Optional[str] = None, port: int = 8081):
+    # Configuration sections gatewayd reads at startup; changes elsewhere
+    # (e.g. marketplace) do not need a restart
+    RESTART_KEYS = ('gateway', 'database', 'providers')
+
+    def __init__(
+        self,
+        config_path: Optional[str] = None,
+        port: int = 8081,
+        host: str = '127.0.0.1',
+        health_path: Optional[str] = None,
+        ready_timeout: float = 10.0,
+        stop_timeout: float = 10.0,
+        instance: Optional[str] = None,
+        install_signal_handlers: bool = True,
+    ):
         """
         Initialize the Daemon wrapper.
 
         Args:
             config_path: Optional path to configuration file
             port: Port to run the daemon on (default: 8081)
+            host: Host used to probe the daemon for readiness
+            health_path: Optional HTTP path (e.g. '/health') probed for readiness;
+                a plain TCP connect is used when not set
+            ready_timeout: Seconds to wait for the daemon to become ready on start
+            stop_timeout: Seconds to wait for a graceful shutdown before killing
+            instance: Optional instance name; gives this daemon its own PID and
+                log files (gatewayd-<instance>.pid) when several run side by side
+            install_signal_handlers: Stop the daemon on SIGTERM/SIGINT and at exit
+                (disable when an owner such as Supervisor handles shutdown)
         """
         self.binary_path = find_available_binary('gatewayd')
         if not self.binary_path:
@@ -33,8 +58,28 @@ class Daemon:
             )
         self.config_path = config_path
         self.port = port
+        self.host = host
+        self.health_path = health_path
+        self.ready_timeout = ready_timeout
+        self.stop_timeout = stop_timeout
+        self.instance = instance
         self.process: Optional[subprocess.Popen] = None
-        self._setup_signal_handlers()
+        self.log_pump: Optional[subprocess.Popen] = None
+        self.config_watcher = None
+        self._start_kwargs: Dict[str, Any] = {}
+        self._restart_lock = threading.RLock()
+        if install_signal_handlers:
+            self._setup_signal_handlers()
+
+    @property
+    def file_stem(self) -> str:
+        """Base name of this daemon's PID and log files."""
+        return f'gatewayd-{self.instance}' if self.instance else 'gatewayd'
+
+    @property
+    def pid_file(self) -> Path:
+        """Path of this daemon's PID file."""
+        return ensure_config_dir() / f'{self.file_stem}.pid'
 
     def _setup_signal_handlers(self):
         """Setup signal handlers for graceful shutdown."""
@@ -47,21 +92,63 @@ class Daemon:
         self.stop()
         sys.exit(0)
 
-    def start(self, background: bool = False, **kwargs) -> Optional[subprocess.Popen]:
+    def is_ready(self) -> bool:
+        """
+        Probe the daemon once.
+
+        Returns:
+            True if the daemon accepts connections (or its health endpoint answers 2xx)
+        """
+        if self.health_path:
+            return probe_http(self.host, self.port, self.health_path)
+        return probe_tcp(self.host, self.port)
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Poll the daemon with exponential backoff until it is ready.
+
+        Polling stops early if the managed process exits.
+
+        Args:
+            timeout: Deadline in seconds (default: ready_timeout)
+
+        Returns:
+            True if the daemon became ready before the deadline
+        """
+        timeout = self.ready_timeout if timeout is None else timeout
+
+        def ready_or_exited() -> bool:
+            if self.process is not None and self.process.poll() is not None:
+                return True
+            return self.is_ready()
+
+        wait_for(ready_or_exited, timeout)
+        if self.process is not None and self.process.poll() is not None:
+            return False
+        return self.is_ready()
+
+    def start(self, background: bool = False, wait_ready: bool = True,
+              **kwargs) -> Optional[subprocess.Popen]:
         """
         Start the gateway daemon.
 
         Args:
             background: Run in background (detached)
+            wait_ready: Return only once the daemon answers readiness probes
+                (or ready_timeout passes)
             **kwargs: Additional environment variables
 
         Returns:
             Process instance if running in foreground, None if in background
+
+        Raises:
+            RuntimeError: If the daemon exits while starting up
         """
         if self.process and self.process.poll() is None:
             print("Daemon is already running")
             return self.process
 
+        self._start_kwargs = dict(kwargs, background=background)
         cmd = [str(self.binary_path)]
 
         # Add config file if specified
@@ -80,59 +167,186 @@ class Daemon:
             log_dir = ensure_config_dir() / 'logs'
             log_dir.mkdir(exist_ok=True)
 
-            stdout_log = open(log_dir / 'gatewayd.log', 'a')
-            stderr_log = open(log_dir / 'gatewayd.error.log', 'a')
-
-            self.process = subprocess.Popen(
-                cmd,
-                env=env,
-                stdout=stdout_log,
-                stderr=stderr_log,
-                start_new_session=True
-            )
+            stdout_path = log_dir / f'{self.file_stem}.log'
+            stderr_path = log_dir / f'{self.file_stem}.error.log'
+
+            if os.name == 'posix':
+                self.process = self._start_with_log_pump(cmd, env, stdout_path, stderr_path)
+            else:
+                # No fd passing on Windows: append to plain files (without rotation)
+                with open(stdout_path, 'ab') as stdout_log, open(stderr_path, 'ab') as stderr_log:
+                    self.process = subprocess.Popen(
+                        cmd,
+                        env=env,
+                        stdout=stdout_log,
+                        stderr=stderr_log,
+                        start_new_session=True
+                    )
 
             # Save PID for later reference
-            pid_file = ensure_config_dir() / 'gatewayd.pid'
-            pid_file.write_text(str(self.process.pid))
+            self.pid_file.write_text(str(self.process.pid))
 
+            if wait_ready:
+                self._wait_started()
             print(f"Daemon started in background (PID: {self.process.pid})")
             return None
         else:
             # Run in foreground
             self.process = subprocess.Popen(cmd, env=env)
+            if wait_ready:
+                self._wait_started()
             return self.process
 
+    def _start_with_log_pump(self, cmd, env, stdout_path: Path,
+                             stderr_path: Path) -> subprocess.Popen:
+        """
+        Launch gatewayd with stdout/stderr piped into a detached log pump process.
+
+        The pump rotates and compresses the logs (gateway.logging.max_size /
+        max_days) and keeps running if this Python process exits. Only the
+        child processes keep the pipe ends open, so nothing leaks here.
+        """
+        from .logs import pump_command
+
+        max_bytes, max_days = self._log_limits()
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        try:
+            self.log_pump = subprocess.Popen(
+                pump_command([(out_r, stdout_path), (err_r, stderr_path)], max_bytes, max_days),
+                pass_fds=(out_r, err_r),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+            return subprocess.Popen(
+                cmd,
+                env=env,
+                stdout=out_w,
+                stderr=err_w,
+                start_new_session=True
+            )
+        finally:
+            for fd in (out_r, out_w, err_r, err_w):
+                os.close(fd)
+
+    def _log_limits(self):
+        """Return (max_bytes, max_days) for log rotation from the configuration."""
+        from .config import Config
+        from .logs import parse_size
+
+        defaults = Config.get_defaults()['gateway']['logging']
+        try:
+            logging = Config(self.config_path).get('gateway.logging') or {}
+        except Exception:
+            logging = {}  # gatewayd reports configuration errors itself
+
+        max_size = logging.get('max_size', defaults['max_size'])
+        try:
+            max_bytes = parse_size(max_size)
+        except ValueError:
+            print(f"Warning: invalid gateway.logging.max_size {max_size!r}, "
+                  f"using {defaults['max_size']}")
+            max_bytes = parse_size(defaults['max_size'])
+        return max_bytes, logging.get('max_days', defaults['max_days'])
+
+    def _wait_started(self):
+        """Wait for readiness after launching, failing fast if the process died."""
+        if self.wait_until_ready():
+            return
+
+        code = self.process.poll() if self.process else None
+        if code is not None:
+            self.process = None
+            raise RuntimeError(f"Daemon exited during startup (exit code {code})")
+        print(f"Warning: daemon not ready on port {self.port} after {self.ready_timeout:g}s")
+
     def stop(self):
         """Stop the gateway daemon."""
         if self.process and self.process.poll() is None:
             print("Stopping daemon...")
             self.process.terminate()
 
-            # Wait up to 10 seconds for graceful shutdown
-            for _ in range(10):
-                if self.process.poll() is not None:
-                    break
-                time.sleep(1)
-
-            # Force kill if still running
-            if self.process.poll() is None:
+            # Returns as soon as the process exits, up to stop_timeout
+            try:
+                self.process.wait(timeout=self.stop_timeout)
+            except subprocess.TimeoutExpired:
                 print("Force killing daemon...")
                 self.process.kill()
+                self.process.wait()
 
             self.process = None
             print("Daemon stopped")
 
+        if self.log_pump is not None:
+            # The pump exits once it has written the daemon's last output
+            try:
+                self.log_pump.wait(timeout=self.stop_timeout)
+            except subprocess.TimeoutExpired:
+                pass
+            self.log_pump = None
+
         # Clean up PID file
-        pid_file = ensure_config_dir() / 'gatewayd.pid'
+        pid_file = self.pid_file
         if pid_file.exists():
             pid_file.unlink()
 
     def restart(self, **kwargs):
-        """Restart the gateway daemon."""
+        """
+        Restart the gateway daemon.
+
+        stop() returns once the old process has exited and start() returns once
+        the new one is ready, so no fixed delay is needed in between.
+        """
         self.stop()
-        time.sleep(2)  # Wait a bit before restarting
         return self.start(**kwargs)
 
+    def watch_config(self, restart_keys=None, interval: float = 1.0):
+        """
+        Restart the daemon when relevant parts of its configuration file change.
+
+        Args:
+            restart_keys: Dotted key prefixes whose changes need a restart
+                (default: RESTART_KEYS)
+            interval: Polling interval in seconds when inotify is not available
+
+        Returns:
+            The started ConfigWatcher
+        """
+        from .config import Config
+        from .watch import matches_prefix
+
+        prefixes = self.RESTART_KEYS if restart_keys is None else tuple(restart_keys)
+        config = Config(self.config_path)
+
+        def on_change(changes, config):
+            relevant = sorted(k for k in changes if matches_prefix(k, prefixes))
+            if relevant:
+                print(f"Configuration changed ({', '.join(relevant)}), restarting daemon")
+                self._restart_running()
+
+        config.on_change(on_change)
+        self.unwatch_config()
+        self.config_watcher = config.watch(interval=interval)
+        return self.config_watcher
+
+    def unwatch_config(self):
+        """Stop watching the configuration file."""
+        if self.config_watcher is not None:
+            self.config_watcher.stop()
+            self.config_watcher = None
+
+    def _restart_running(self):
+        """Gracefully restart with the original start options, if still running."""
+        with self._restart_lock:
+            if self.process is None or self.process.poll() is not None:
+                return
+            try:
+                self.restart(**self._start_kwargs)
+            except RuntimeError as e:
+                print(f"Restart after configuration change failed: {e}")
+
     def status(self) -> Dict[str, Any]:
         """
         Get daemon status.
@@ -148,28 +362,30 @@ class Daemon:
             }
         else:
             # Check for PID file
-            pid_file = ensure_config_dir() / 'gatewayd.pid'
+            pid_file = self.pid_file
             if pid_file.exists():
                 pid = int(pid_file.read_text())
                 # Check if process is actually running
-                try:
-                    import psutil
-                    if psutil.pid_exists(pid):
-                        return {
-                            "status": "running",
-                            "pid": pid,
-                            "port": self.port,
-                            "note": "Running in background"
-                        }
-                except ImportError:
-                    pass
+                if pid_alive(pid):
+                    return {
+                        "status": "running",
+                        "pid": pid,
+                        "port": self.port,
+                        "note": "Running in background"
+                    }
 
             return {"status": "stopped"}
 
     def wait(self):
-        """Wait for the daemon to exit."""
-        if self.process:
-            self.process.wait()
+        """Wait for the daemon to exit, following restarts made by watch_config()."""
+        while True:
+            process = self.process
+            if process is None:
+                return
+            process.wait()
+            with self._restart_lock:
+                if self.process is None or self.process is process:
+                    return
 
 
 def main():
@@ -181,24 +397,46 @@ def main():
     parser.add_argument('--config', help='Configuration file path')
     parser.add_argument('--port', type=int, default=8081, help='Port to listen on')
     parser.add_argument('--background', action='store_true', help='Run in background')
+    parser.add_argument('--ready-timeout', type=float, default=10.0,
+                        help='Seconds to wait for the daemon to become ready')
+    parser.add_argument('--health-path',
+                        help='HTTP path probed for readiness (default: TCP connect)')
+    parser.add_argument('--workers', type=int,
+                        help='Run N supervised gatewayd workers on consecutive ports')
+    parser.add_argument('--proxy-port', type=int,
+                        help='With --workers, load-balance the workers behind this port')
+    parser.add_argument('--zero-downtime', action='store_true',
+                        help='Serve through a local forwarder so restarts are blue/green')
+    parser.add_argument('--watch-config', action='store_true',
+                        help='Restart (foreground) when the configuration file changes')
     parser.add_argument('command', nargs='?', default='start',
                         choices=['start', 'stop', 'restart', 'status'],
                         help='Daemon command')
 
     args = parser.parse_args()
 
-    daemon = Daemon(config_path=args.config, port=args.port)
+    if args.workers:
+        run_supervisor(args)
+        return
+
+    if args.zero_downtime:
+        run_blue_green(args)
+        return
+
+    daemon = Daemon(config_path=args.config, port=args.port, health_path=args.health_path,
+                    ready_timeout=args.ready_timeout)
 
     if args.command == 'start':
         if args.background:
             daemon.start(background=True)
         else:
-            process = daemon.start()
-            if process:
-                try:
-                    process.wait()
-                except KeyboardInterrupt:
-                    daemon.stop()
+            daemon.start()
+            if args.watch_config:
+                daemon.watch_config()
+            try:
+                daemon.wait()
+            except KeyboardInterrupt:
+                daemon.stop()
     elif args.command == 'stop':
         daemon.stop()
     elif args.command == 'restart':
@@ -212,5 +450,71 @@ def main():
             print(f"Port: {status['port']}")
 
 
+def run_supervisor(args):
+    """Handle daemon commands in multi-worker (--workers N) mode."""
+    from .supervisor import Supervisor
+
+    supervisor = Supervisor(
+        workers=args.workers,
+        base_port=args.port,
+        config_path=args.config,
+        health_path=args.health_path,
+        ready_timeout=args.ready_timeout,
+        proxy_port=args.proxy_port,
+    )
+    forwarded = ['--ready-timeout', str(args.ready_timeout)]
+    if args.health_path:
+        forwarded.extend(['--health-path', args.health_path])
+
+    if args.command in ('stop', 'restart'):
+        if not supervisor.stop_background():
+            supervisor.stop()
+        if args.command == 'stop':
+            print("Workers stopped")
+            return
+
+    if args.command in ('start', 'restart'):
+        if args.background:
+            pid = supervisor.spawn_background(forwarded)
+            print(f"Supervisor started in background (PID: {pid})")
+        else:
+            supervisor.run()
+    elif args.command == 'status':
+        status = supervisor.status()
+        print(f"Status: {status['status']} ({status['running']}/{status['total']} workers)")
+        for worker in status['workers']:
+            pid = worker.get('pid') or '-'
+            print(f"  port {worker['port']}: {worker['status']} (PID: {pid})")
+        if status.get('proxy'):
+            print(f"Proxy on port {status['proxy']['port']}:")
+            for backend in status['proxy']['backends']:
+                print(f"  -> {backend['port']}: {backend['active']} active, "
+                      f"{backend['total']} total, {backend['errors']} errors, "
+                      f"ttfb mean {backend['latency_mean_ms']} ms, "
+                      f"max {backend['latency_max_ms']} ms")
+
+
+def run_blue_green(args):
+    """Handle daemon commands in zero-downtime (--zero-downtime) mode."""
+    from .rolling import BlueGreenDaemon, request_rolling_restart
+
+    if args.command == 'start':
+        if args.background:
+            print("--zero-downtime runs in the foreground; use a process manager to detach it")
+            sys.exit(1)
+        BlueGreenDaemon(config_path=args.config, port=args.port, health_path=args.health_path,
+                        ready_timeout=args.ready_timeout).run(watch_config=args.watch_config)
+    elif args.command == 'restart':
+        if request_rolling_restart():
+            print("Rolling restart requested")
+        else:
+            print("No zero-downtime daemon is running")
+            sys.exit(1)
+    else:
+        print(f"'{args.command}' is not supported with --zero-downtime; "
+              f"signal the foreground process instead")
+        sys.exit(1)
+
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
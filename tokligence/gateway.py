@@ -6,8 +6,10 @@ import subprocess
 import sys
 import json
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Union
+from .bulk import BulkRun
 from .utils import find_available_binary
+from .worker import GatewayWorker, WorkerUnavailable
 
 
 class Gateway:
@@ -15,24 +17,62 @@ class Gateway:
     Python wrapper for the Tokligence Gateway CLI tool.
     """
 
-    def __init__(self, config_path: Optional[str] = None):
+    def __init__(
+        self,
+        config_path: Optional[str] = None,
+        persistent: bool = False,
+        worker_command: Optional[List[str]] = None,
+        binary_path: Optional[str] = None,
+    ):
         """
         Initialize the Gateway wrapper.
 
         Args:
             config_path: Optional path to configuration file
+            persistent: Reuse one long-lived worker process for captured commands
+                instead of starting the binary for every call
+            worker_command: Command that starts the worker (default: ``gateway worker``)
+            binary_path: Optional explicit path to the gateway binary
         """
-        self.binary_path = find_available_binary('gateway')
+        self.binary_path = Path(binary_path) if binary_path else find_available_binary('gateway')
         if not self.binary_path:
             raise RuntimeError(
                 "Gateway binary not found. Please ensure it's installed correctly."
             )
         self.config_path = config_path
+        self.persistent = persistent
+        self.worker_command = worker_command
+        self._worker: Optional[GatewayWorker] = None
+
+    def _base_command(self) -> List[str]:
+        """Build the binary invocation shared by every command."""
+        cmd = [str(self.binary_path)]
+
+        # Add config file if specified
+        if self.config_path:
+            cmd.extend(['--config', self.config_path])
+
+        return cmd
+
+    def _get_worker(self) -> Optional[GatewayWorker]:
+        """Return the persistent worker, creating it on first use."""
+        if not self.persistent:
+            return None
+        if self._worker is None:
+            command = self.worker_command or self._base_command() + ['worker']
+            self._worker = GatewayWorker(command)
+        return self._worker
 
     def run(self, args: List[str], capture_output: bool = False) -> subprocess.CompletedProcess:
         """
         Run a gateway command.
 
+        Captured commands go through the persistent worker when enabled. If the
+        binary does not support worker mode (a new worker fails the handshake),
+        the wrapper falls back to starting one process per command. A worker
+        that fails after a command was sent raises instead, since the command
+        may already have run.
+
         Args:
             args: Command arguments
             capture_output: Whether to capture output
@@ -40,19 +80,33 @@ class Gateway:
         Returns:
             CompletedProcess instance
         """
-        cmd = [str(self.binary_path)]
-
-        # Add config file if specified
-        if self.config_path:
-            cmd.extend(['--config', self.config_path])
-
-        cmd.extend(args)
+        cmd = self._base_command() + list(args)
 
         if capture_output:
+            worker = self._get_worker()
+            if worker is not None:
+                try:
+                    return worker.call(list(args))
+                except WorkerUnavailable:
+                    # Older binaries have no worker mode; stop trying for this instance
+                    self.persistent = False
+                    self._worker = None
             return subprocess.run(cmd, capture_output=True, text=True, check=False)
         else:
             return subprocess.run(cmd, check=False)
 
+    def close(self):
+        """Stop the persistent worker, if one is running."""
+        if self._worker is not None:
+            self._worker.close()
+            self._worker = None
+
+    def __enter__(self) -> "Gateway":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
     def init(self, force: bool = False) -> bool:
         """
         Initialize gateway configuration.
@@ -135,6 +189,54 @@ class Gateway:
         except json.JSONDecodeError:
             return {"message": result.stdout.strip()}
 
+    def create_users_bulk(
+        self,
+        users: Iterable[Union[str, Dict[str, Any]]],
+        max_workers: int = 8,
+    ) -> BulkRun:
+        """
+        Create many users concurrently.
+
+        Results are yielded as each user is created; failed rows are reported
+        and do not stop the batch. With ``persistent=True`` all calls share one
+        worker and are serialized, so use a plain Gateway for parallelism.
+
+        Args:
+            users: Usernames, or dicts with ``username`` and optional ``email``
+            max_workers: Maximum number of concurrent gateway calls
+
+        Returns:
+            BulkRun to iterate for per-row results and throughput
+        """
+        def create(row: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+            if isinstance(row, str):
+                return self.create_user(row)
+            return self.create_user(row['username'], row.get('email') or None)
+
+        return BulkRun(create, users, max_workers=max_workers)
+
+    def create_api_keys_bulk(
+        self,
+        keys: Iterable[Union[str, Dict[str, Any]]],
+        max_workers: int = 8,
+    ) -> BulkRun:
+        """
+        Create many API keys concurrently.
+
+        Args:
+            keys: User IDs, or dicts with ``user_id`` and optional ``name``
+            max_workers: Maximum number of concurrent gateway calls
+
+        Returns:
+            BulkRun to iterate for per-row results and throughput
+        """
+        def create(row: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+            if isinstance(row, str):
+                return self.create_api_key(row)
+            return self.create_api_key(str(row['user_id']), row.get('name') or None)
+
+        return BulkRun(create, keys, max_workers=max_workers)
+
     def list_providers(self) -> List[Dict[str, Any]]:
         """
         List available providers.
@@ -0,0 +1,325 @@
+"""
+Layered configuration: defaults -> file -> TOKLIGENCE_* environment -> CLI overrides
+
+Layers are merged once into an immutable ConfigSnapshot that records which
+layer supplied every key. Snapshots are cached per (file, overrides) and
+reused while the file's stat signature and the relevant environment
+variables are unchanged, so repeated load_config() calls do not re-read or
+re-merge anything.
+"""
+
+import copy
+import json
+import os
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+from .utils import get_default_config_path
+
+ENV_PREFIX = 'TOKLIGENCE_'
+
+# Non-prefixed variables read by Config.get_defaults()
+_DEFAULT_ENV_VARS = ('OPENAI_API_KEY', 'ANTHROPIC_API_KEY')
+
+_TRUE = ('1', 'true', 'yes', 'on')
+_FALSE = ('0', 'false', 'no', 'off', '')
+
+_cache: Dict[Tuple[str, str], Tuple[Any, 'ConfigSnapshot']] = {}
+_cache_lock = threading.Lock()
+
+
+def _leaves(data: Mapping, prefix: str = '') -> Iterator[Tuple[str, Any]]:
+    """Yield (dotted key, value) for every non-dict value (and empty dict)."""
+    for key, value in data.items():
+        path = f'{prefix}{key}'
+        if isinstance(value, dict) and value:
+            yield from _leaves(value, path + '.')
+        else:
+            yield path, value
+
+
+def _set_path(data: Dict[str, Any], key: str, value: Any):
+    """Set a dotted key, replacing non-dict intermediate values."""
+    keys = key.split('.')
+    for k in keys[:-1]:
+        if not isinstance(data.get(k), dict):
+            data[k] = {}
+        data = data[k]
+    data[keys[-1]] = value
+
+
+def _merge(base: Dict[str, Any], layer: Mapping) -> Dict[str, Any]:
+    """Deep-merge layer into base in place (layer values win)."""
+    for key, value in layer.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], value)
+        else:
+            base[key] = copy.deepcopy(value)
+    return base
+
+
+def env_var_name(key: str) -> str:
+    """
+    Get the environment variable that overrides a dotted key.
+
+    Args:
+        key: Dotted configuration key (e.g. 'gateway.logging.max_size')
+
+    Returns:
+        Variable name (e.g. 'TOKLIGENCE_GATEWAY_LOGGING_MAX_SIZE'), matching
+        Config.to_env_vars()
+    """
+    return ENV_PREFIX + '_'.join(part.upper() for part in key.split('.'))
+
+
+def coerce(raw: str, current: Any, name: str = 'value') -> Any:
+    """
+    Convert a string from the environment or command line to the type of the value it replaces.
+
+    Args:
+        raw: String value
+        current: Value being overridden (decides the type)
+        name: Name used in error messages
+
+    Returns:
+        Converted value
+
+    Raises:
+        ValueError: If raw cannot be converted
+    """
+    if isinstance(current, bool):
+        lowered = raw.strip().lower()
+        if lowered in _TRUE:
+            return True
+        if lowered in _FALSE:
+            return False
+        raise ValueError(f"{name}: expected a boolean, got {raw!r}")
+    if isinstance(current, int):
+        try:
+            return int(raw)
+        except ValueError:
+            raise ValueError(f"{name}: expected an integer, got {raw!r}") from None
+    if isinstance(current, float):
+        try:
+            return float(raw)
+        except ValueError:
+            raise ValueError(f"{name}: expected a number, got {raw!r}") from None
+    if isinstance(current, list):
+        parsed = _parse_json(raw)
+        if isinstance(parsed, list):
+            return parsed
+        return [item.strip() for item in raw.split(',') if item.strip()]
+    if isinstance(current, dict):
+        parsed = _parse_json(raw)
+        if not isinstance(parsed, dict):
+            raise ValueError(f"{name}: expected a JSON object, got {raw!r}")
+        return parsed
+    if current is None:
+        # Unset or new key: accept JSON scalars (numbers, true/false), else a string
+        parsed = _parse_json(raw)
+        return raw if parsed is None or isinstance(parsed, (list, dict)) else parsed
+    return raw
+
+
+def _parse_json(raw: str) -> Any:
+    """Parse JSON, returning None if raw is not valid JSON."""
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None
+
+
+def _freeze(value: Any) -> Any:
+    """Return a read-only version of a nested value."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class ConfigSnapshot:
+    """
+    Immutable result of merging the configuration layers.
+
+    ``provenance`` maps every leaf key to the layer that supplied it:
+    ``'default'``, ``'file'``, ``'env:<VARIABLE>'`` or ``'cli'``.
+    """
+
+    __slots__ = ('path', 'overrides', 'provenance', '_data', '_file_data', '_index', '_frozen')
+
+    def __init__(self, path: Path, data: Dict[str, Any], file_data: Dict[str, Any],
+                 provenance: Dict[str, str], overrides: Dict[str, Any]):
+        """
+        Initialize the snapshot (use resolve_config() to build one).
+
+        Args:
+            path: Configuration file path
+            data: Merged configuration (owned by the snapshot from now on)
+            file_data: The file layer on its own
+            provenance: Source of every leaf key
+            overrides: CLI overrides that were applied
+        """
+        set_ = object.__setattr__
+        set_(self, 'path', path)
+        set_(self, 'overrides', MappingProxyType(dict(overrides)))
+        set_(self, 'provenance', MappingProxyType(provenance))
+        set_(self, '_data', data)
+        set_(self, '_file_data', file_data)
+        set_(self, '_index', None)
+        set_(self, '_frozen', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ConfigSnapshot is immutable")
+
+    @property
+    def data(self) -> Mapping[str, Any]:
+        """Read-only view of the merged configuration."""
+        if self._frozen is None:
+            object.__setattr__(self, '_frozen', _freeze(self._data))
+        return self._frozen
+
+    def index(self) -> Dict[str, Any]:
+        """Flattened {dotted key: value} index shared by Configs built from this snapshot."""
+        if self._index is None:
+            from .config import Config
+            object.__setattr__(self, '_index', Config._flatten(self._data))
+        return self._index
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Get a value by dotted key (containers are returned read-only).
+
+        Args:
+            key: Configuration key (supports dot notation)
+            default: Default value if key not found
+
+        Returns:
+            Configuration value
+        """
+        return _freeze(self.index().get(key, default))
+
+    def source(self, key: str) -> Optional[str]:
+        """
+        Get the layer that supplied a leaf key.
+
+        Args:
+            key: Dotted configuration key
+
+        Returns:
+            'default', 'file', 'env:<VARIABLE>', 'cli', or None if unknown
+        """
+        return self.provenance.get(key)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a mutable deep copy of the merged configuration."""
+        return copy.deepcopy(self._data)
+
+    def file_dict(self) -> Dict[str, Any]:
+        """Return a mutable deep copy of the file layer alone."""
+        return copy.deepcopy(self._file_data)
+
+
+def _env_state() -> Tuple[Tuple[str, str], ...]:
+    """Environment variables that can affect the merged configuration."""
+    return tuple(sorted(
+        (k, v) for k, v in os.environ.items()
+        if k.startswith(ENV_PREFIX) or k in _DEFAULT_ENV_VARS
+    ))
+
+
+def _build(path: Path, overrides: Dict[str, Any], env: Mapping[str, str]) -> ConfigSnapshot:
+    """Merge all layers from scratch."""
+    from .config import Config
+
+    defaults = Config.get_defaults()
+    file_data = Config(str(path)).data if path.exists() else {}
+    if not isinstance(file_data, dict):
+        file_data = {}
+    data = _merge(copy.deepcopy(defaults), file_data)
+
+    layers = [('default', dict(_leaves(defaults))), ('file', dict(_leaves(file_data)))]
+
+    env_layer = {}
+    for key, value in list(_leaves(data)):
+        name = env_var_name(key)
+        if name in env:
+            _set_path(data, key, coerce(env[name], value, name))
+            env_layer[key] = f'env:{name}'
+    layers.append(('env', env_layer))
+
+    current = dict(_leaves(data))
+    applied = {}
+    for key, value in overrides.items():
+        if isinstance(value, str):
+            value = coerce(value, current.get(key), key)
+        _set_path(data, key, value)
+        applied[key] = value
+    layers.append(('cli', dict(_leaves(_nest(applied)))))
+
+    provenance = {}
+    for key, _ in _leaves(data):
+        # A layer also supplies keys nested under a value it set (e.g. a dict)
+        candidates = [key]
+        while '.' in candidates[-1]:
+            candidates.append(candidates[-1].rsplit('.', 1)[0])
+        for name, layer in reversed(layers):
+            found = next((c for c in candidates if c in layer), None)
+            if found is not None:
+                provenance[key] = layer[found] if name == 'env' else name
+                break
+    return ConfigSnapshot(path, data, file_data, provenance, overrides)
+
+
+def _nest(flat: Mapping[str, Any]) -> Dict[str, Any]:
+    """Turn {dotted key: value} into nested dictionaries."""
+    nested: Dict[str, Any] = {}
+    for key, value in flat.items():
+        _set_path(nested, key, value)
+    return nested
+
+
+def resolve_config(config_path: Optional[str] = None,
+                   overrides: Optional[Mapping[str, Any]] = None) -> ConfigSnapshot:
+    """
+    Merge defaults, the configuration file, TOKLIGENCE_* variables and overrides.
+
+    Environment variables override existing keys only, using the names
+    produced by Config.to_env_vars() (e.g. TOKLIGENCE_GATEWAY_PORT), and are
+    converted to the type of the value they replace. Overrides are dotted keys
+    (strings are converted the same way).
+
+    Args:
+        config_path: Optional path to configuration file
+        overrides: {dotted key: value} applied last (e.g. from --set on the CLI)
+
+    Returns:
+        Cached ConfigSnapshot; rebuilt only when the file or the relevant
+        environment variables changed
+
+    Raises:
+        ValueError: If an environment variable or override has the wrong type
+    """
+    from .watch import file_signature
+
+    path = Path(config_path) if config_path else get_default_config_path()
+    overrides = dict(overrides or {})
+    cache_key = (str(path), json.dumps(overrides, sort_keys=True, default=str))
+    state = (file_signature(path), _env_state())
+
+    cached = _cache.get(cache_key)
+    if cached is not None and cached[0] == state:
+        return cached[1]
+
+    snapshot = _build(path, overrides, os.environ)
+    with _cache_lock:
+        _cache[cache_key] = (state, snapshot)
+    return snapshot
+
+
+def clear_config_cache():
+    """Forget all cached snapshots."""
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,274 @@
+"""
+Log capture with size-based rotation for background daemons
+
+gatewayd's stdout/stderr are connected to pipes read by a small detached pump
+process (``python -m tokligence.logs``). The pump outlives the Python process
+that started the daemon, rotates each log when it reaches ``max_size``,
+gzips rotated files in the background and deletes them after ``max_days``.
+Reading is decoupled from writing through a bounded in-memory buffer, so a
+slow disk never blocks the daemon; if the buffer fills up, the oldest output
+is dropped and a marker line records how much was lost.
+"""
+
+import gzip
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+_SIZE_UNITS = {'': 1, 'B': 1, 'K': 1024, 'KB': 1024, 'M': 1024 ** 2, 'MB': 1024 ** 2,
+               'G': 1024 ** 3, 'GB': 1024 ** 3}
+
+
+def parse_size(value: Union[str, int, None]) -> Optional[int]:
+    """
+    Parse a size such as ``'100MB'`` into bytes.
+
+    Args:
+        value: Size as an int (bytes) or a string with an optional B/KB/MB/GB unit
+
+    Returns:
+        Size in bytes, or None if value is empty or zero (meaning no limit)
+
+    Raises:
+        ValueError: If the string cannot be parsed
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return int(value) or None
+
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMG]?B?)\s*', str(value).upper())
+    if not match:
+        raise ValueError(f"Invalid size: {value!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)]) or None
+
+
+class RotatingLogWriter:
+    """
+    Append to a log file, rotating it once it reaches max_bytes.
+
+    Rotated files are named ``<name>.<YYYYmmdd-HHMMSS>`` and gzipped by a
+    background thread; files older than max_days are deleted on rotation.
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: Optional[int] = None,
+                 max_days: Optional[float] = None, compress: bool = True):
+        """
+        Initialize the writer.
+
+        Args:
+            path: Log file path
+            max_bytes: Rotate once the file reaches this size (None: never)
+            max_days: Delete rotated files older than this many days (None: keep)
+            compress: Gzip rotated files
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_days = max_days
+        self.compress = compress
+        self._compressors: List[threading.Thread] = []
+        self._file = open(self.path, 'ab')
+        self._size = self._file.tell()
+        self.prune()
+
+    def write(self, data: bytes):
+        """Write data, rotating first if it would take the file past max_bytes."""
+        if self.max_bytes and self._size and self._size + len(data) > self.max_bytes:
+            self.rotate()
+        self._file.write(data)
+        self._size += len(data)
+
+    def flush(self):
+        """Flush buffered data to the file."""
+        self._file.flush()
+
+    def rotate(self):
+        """Move the current file aside and start a new one."""
+        self._file.close()
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        rotated = self.path.with_name(f'{self.path.name}.{stamp}')
+        n = 1
+        while rotated.exists() or rotated.with_name(rotated.name + '.gz').exists():
+            rotated = self.path.with_name(f'{self.path.name}.{stamp}-{n}')
+            n += 1
+        os.replace(self.path, rotated)
+        self._file = open(self.path, 'ab')
+        self._size = 0
+
+        if self.compress:
+            thread = threading.Thread(target=_gzip_file, args=(rotated,), daemon=True)
+            thread.start()
+            self._compressors = [t for t in self._compressors if t.is_alive()] + [thread]
+        self.prune()
+
+    def rotated_files(self) -> List[Path]:
+        """Return rotated files of this log, oldest first."""
+        prefix = self.path.name + '.'
+        files = [p for p in self.path.parent.iterdir() if p.name.startswith(prefix)]
+        return sorted(files, key=lambda p: p.name)
+
+    def prune(self):
+        """Delete rotated files older than max_days."""
+        if not self.max_days:
+            return
+        cutoff = time.time() - self.max_days * 86400
+        for path in self.rotated_files():
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except FileNotFoundError:
+                pass  # Being compressed or already removed
+
+    def close(self):
+        """Close the file and wait for pending compression."""
+        self._file.close()
+        for thread in self._compressors:
+            thread.join()
+
+
+def _gzip_file(path: Path):
+    """Compress a rotated log to <path>.gz and remove the original."""
+    target = path.with_name(path.name + '.gz')
+    with open(path, 'rb') as src, gzip.open(target, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.utime(target, (path.stat().st_atime, path.stat().st_mtime))
+    path.unlink()
+
+
+class LogPump:
+    """
+    Copy file descriptors into rotating logs without blocking the writer side.
+
+    One reader thread per descriptor drains the pipe into a bounded buffer;
+    one writer thread moves buffered chunks to the files.
+    """
+
+    def __init__(self, streams: List[Tuple[int, RotatingLogWriter]],
+                 max_buffer: int = 8 * 1024 * 1024, read_size: int = 64 * 1024):
+        """
+        Initialize the pump.
+
+        Args:
+            streams: (file descriptor, writer) pairs
+            max_buffer: Bytes buffered per stream before old output is dropped
+            read_size: Maximum bytes read per call
+        """
+        self.streams = streams
+        self.max_buffer = max_buffer
+        self.read_size = read_size
+        self.dropped = [0] * len(streams)
+        self._buffers = [deque() for _ in streams]
+        self._buffered = [0] * len(streams)
+        self._open = len(streams)
+        self._cond = threading.Condition()
+
+    def _read(self, index: int):
+        """Reader thread: drain one descriptor until EOF."""
+        fd = self.streams[index][0]
+        buffer = self._buffers[index]
+        while True:
+            try:
+                data = os.read(fd, self.read_size)
+            except OSError:
+                data = b''
+            with self._cond:
+                if not data:
+                    self._open -= 1
+                    self._cond.notify()
+                    return
+                buffer.append(data)
+                self._buffered[index] += len(data)
+                while self._buffered[index] > self.max_buffer:
+                    dropped = buffer.popleft()
+                    self._buffered[index] -= len(dropped)
+                    self.dropped[index] += len(dropped)
+                self._cond.notify()
+
+    def _take(self) -> Optional[List[List[bytes]]]:
+        """Wait for buffered output; return None once all readers hit EOF and all is written."""
+        with self._cond:
+            while self._open and not any(self._buffers):
+                self._cond.wait()
+            if not self._open and not any(self._buffers):
+                return None
+            chunks = []
+            for i, buffer in enumerate(self._buffers):
+                chunks.append(list(buffer))
+                buffer.clear()
+                self._buffered[i] = 0
+            return chunks
+
+    def run(self):
+        """Pump until every descriptor reaches EOF, then close the writers."""
+        readers = [threading.Thread(target=self._read, args=(i,), daemon=True)
+                   for i in range(len(self.streams))]
+        for thread in readers:
+            thread.start()
+
+        reported = [0] * len(self.streams)
+        while True:
+            chunks = self._take()
+            if chunks is None:
+                break
+            for i, (_, writer) in enumerate(self.streams):
+                if self.dropped[i] > reported[i]:
+                    lost = self.dropped[i] - reported[i]
+                    reported[i] = self.dropped[i]
+                    writer.write(f'[tokligence] log pump dropped {lost} bytes\n'.encode())
+                for data in chunks[i]:
+                    writer.write(data)
+                writer.flush()
+
+        for _, writer in self.streams:
+            writer.close()
+
+
+def pump_command(targets: List[Tuple[int, Path]], max_bytes: Optional[int],
+                 max_days: Optional[float]) -> List[str]:
+    """
+    Build the command line of a pump process.
+
+    Args:
+        targets: (inherited file descriptor, log path) pairs
+        max_bytes: Rotation size in bytes
+        max_days: Retention of rotated files in days
+
+    Returns:
+        Command line list
+    """
+    cmd = [sys.executable, '-m', 'tokligence.logs']
+    for fd, path in targets:
+        cmd.extend(['--fd', f'{fd}:{path}'])
+    if max_bytes:
+        cmd.extend(['--max-bytes', str(max_bytes)])
+    if max_days:
+        cmd.extend(['--max-days', str(max_days)])
+    return cmd
+
+
+def main(argv: Optional[List[str]] = None):
+    """Entry point of the pump process."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Tokligence daemon log pump')
+    parser.add_argument('--fd', action='append', default=[], metavar='FD:PATH',
+                        help='Copy file descriptor FD into the log at PATH')
+    parser.add_argument('--max-bytes', type=int, help='Rotate logs at this size')
+    parser.add_argument('--max-days', type=float, help='Delete rotated logs after this many days')
+    args = parser.parse_args(argv)
+
+    streams = []
+    for spec in args.fd:
+        fd, path = spec.split(':', 1)
+        streams.append((int(fd), RotatingLogWriter(path, args.max_bytes, args.max_days)))
+    LogPump(streams).run()
+
+
+if __name__ == '__main__':
+    main()
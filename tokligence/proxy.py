@@ -0,0 +1,369 @@
+"""
+Local asyncio TCP proxies placed in front of gatewayd
+
+TCPForwarder owns the public port and relays every connection byte for byte
+to a backend gatewayd. Switching the backend only affects new connections, so
+in-flight requests (including streaming responses) finish on the old process.
+LoadBalancer spreads connections over several gatewayd workers.
+"""
+
+import asyncio
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+from .utils import wait_for
+
+
+@dataclass
+class Backend:
+    """A gatewayd process the proxy can relay to."""
+    host: str
+    port: int
+    active: int = 0
+    total: int = 0
+    errors: int = 0
+    latency_samples: int = 0
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+    latency_ewma: Optional[float] = None
+    down_until: float = field(default=0.0, repr=False)
+
+    def record_latency(self, seconds: float, alpha: float = 0.2):
+        """
+        Record the time to first byte of one connection.
+
+        Args:
+            seconds: Time from the first request byte to the first response byte
+            alpha: Weight of the new sample in the moving average
+        """
+        self.latency_samples += 1
+        self.latency_total += seconds
+        self.latency_max = max(self.latency_max, seconds)
+        if self.latency_ewma is None:
+            self.latency_ewma = seconds
+        else:
+            self.latency_ewma = alpha * seconds + (1 - alpha) * self.latency_ewma
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get this backend's counters.
+
+        Returns:
+            Dictionary of connection and latency counters (latencies in ms)
+        """
+        mean = self.latency_total / self.latency_samples if self.latency_samples else None
+        return {
+            'port': self.port,
+            'active': self.active,
+            'total': self.total,
+            'errors': self.errors,
+            'latency_samples': self.latency_samples,
+            'latency_mean_ms': round(mean * 1000, 3) if mean is not None else None,
+            'latency_ewma_ms': (round(self.latency_ewma * 1000, 3)
+                                if self.latency_ewma is not None else None),
+            'latency_max_ms': round(self.latency_max * 1000, 3),
+        }
+
+
+class TCPForwarder:
+    """
+    Relay connections from a listen port to the current backend.
+
+    The event loop runs in a background thread, so the forwarder can be driven
+    from synchronous code such as Daemon management.
+    """
+
+    def __init__(
+        self,
+        listen_port: int,
+        backend_port: Optional[int] = None,
+        listen_host: str = '127.0.0.1',
+        backend_host: str = '127.0.0.1',
+        buffer_size: int = 64 * 1024,
+    ):
+        """
+        Initialize the forwarder.
+
+        Args:
+            listen_port: Public port to accept connections on
+            backend_port: Initial backend port (can be set later with set_backend)
+            listen_host: Interface to listen on
+            backend_host: Host of the backends
+            buffer_size: Maximum bytes read per chunk
+        """
+        self.listen_host = listen_host
+        self.listen_port = listen_port
+        self.backend_host = backend_host
+        self.buffer_size = buffer_size
+        self.backends: Dict[int, Backend] = {}
+        self.current: Optional[Backend] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._connections: set = set()
+        if backend_port is not None:
+            self.set_backend(backend_port)
+
+    def set_backend(self, port: int) -> Backend:
+        """
+        Send new connections to the backend on the given port.
+
+        Args:
+            port: Backend port
+
+        Returns:
+            The Backend record (kept so its counters survive switching back)
+        """
+        backend = self.backends.get(port)
+        if backend is None:
+            backend = self.backends[port] = Backend(self.backend_host, port)
+        self.current = backend
+        return backend
+
+    def _select_backend(self, exclude: List[Backend]) -> Optional[Backend]:
+        """Pick the backend for a new connection, skipping ones that failed to connect."""
+        if self.current is None or self.current in exclude:
+            return None
+        return self.current
+
+    async def _connect(self):
+        """Open an upstream connection, trying other backends if one refuses."""
+        tried: List[Backend] = []
+        while True:
+            backend = self._select_backend(tried)
+            if backend is None:
+                return None, None, None
+            try:
+                reader, writer = await asyncio.open_connection(backend.host, backend.port)
+                return backend, reader, writer
+            except OSError:
+                backend.errors += 1
+                backend.down_until = time.monotonic() + 1.0
+                tried.append(backend)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Relay one client connection to a backend."""
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            backend, upstream_reader, upstream_writer = await self._connect()
+            if backend is None:
+                writer.close()
+                return
+            await self._relay(backend, reader, writer, upstream_reader, upstream_writer)
+        finally:
+            self._connections.discard(task)
+
+    async def _relay(self, backend: Backend, reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter, upstream_reader: asyncio.StreamReader,
+                     upstream_writer: asyncio.StreamWriter):
+        """Copy both directions between a client and its backend, keeping counters."""
+        backend.active += 1
+        backend.total += 1
+        _set_nodelay(writer)
+        _set_nodelay(upstream_writer)
+
+        request_started: List[float] = []
+
+        def on_request(_: bytes):
+            request_started.append(time.perf_counter())
+
+        def on_response(_: bytes):
+            if request_started:
+                backend.record_latency(time.perf_counter() - request_started[0])
+
+        try:
+            await asyncio.gather(
+                self._pipe(reader, upstream_writer, on_request),
+                self._pipe(upstream_reader, writer, on_response),
+            )
+        finally:
+            backend.active -= 1
+            for w in (writer, upstream_writer):
+                w.close()
+
+    async def _pipe(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                    on_first: Optional[Callable[[bytes], None]] = None):
+        """
+        Copy bytes until EOF, then half-close the other side.
+
+        Each chunk is written as soon as it is read, so streamed (SSE) responses
+        are passed through without buffering.
+        """
+        try:
+            while True:
+                data = await reader.read(self.buffer_size)
+                if not data:
+                    break
+                if on_first is not None:
+                    on_first(data)
+                    on_first = None
+                writer.write(data)
+                await writer.drain()
+            if writer.can_write_eof():
+                writer.write_eof()
+        except (ConnectionError, OSError):
+            writer.close()
+
+    async def serve(self):
+        """Start listening on the current event loop."""
+        self._server = await asyncio.start_server(
+            self._handle, self.listen_host, self.listen_port, reuse_address=True
+        )
+
+    async def close(self):
+        """Stop listening and drop open connections."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for task in list(self._connections):
+            task.cancel()
+        if self._connections:
+            await asyncio.gather(*self._connections, return_exceptions=True)
+        # Let closed transports run their callbacks before the loop goes away
+        await asyncio.sleep(0)
+
+    def start(self):
+        """Run the forwarder in a background thread."""
+        if self._thread is not None:
+            return
+
+        self._loop = asyncio.new_event_loop()
+        started = threading.Event()
+        errors = []
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._loop.run_until_complete(self.serve())
+            except Exception as e:
+                errors.append(e)
+                started.set()
+                return
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name='tokligence-forwarder', daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            self._thread.join()
+            self._thread = None
+            self._loop.close()
+            self._loop = None
+            raise errors[0]
+
+    def stop(self):
+        """Stop the background forwarder."""
+        if self._thread is None or self._loop is None:
+            return
+
+        asyncio.run_coroutine_threadsafe(self.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._thread = None
+        self._loop = None
+
+    def wait_drained(self, port: int, timeout: float) -> bool:
+        """
+        Wait until a backend has no open connections.
+
+        Args:
+            port: Backend port
+            timeout: Seconds to wait
+
+        Returns:
+            True if the backend drained before the deadline
+        """
+        backend = self.backends.get(port)
+        if backend is None:
+            return True
+        return wait_for(lambda: backend.active == 0, timeout, max_delay=0.1)
+
+
+class LoadBalancer(TCPForwarder):
+    """
+    Spread connections over several local gatewayd workers.
+
+    Each new connection goes to the backend with the fewest open connections
+    (ties broken by the lower latency average, then round robin). Backends
+    that refuse a connection are skipped for a second and the connection is
+    retried on another one, which covers workers being restarted.
+    """
+
+    def __init__(self, listen_port: int, backend_ports: Optional[List[int]] = None, **kwargs: Any):
+        """
+        Initialize the load balancer.
+
+        Args:
+            listen_port: Public port to accept connections on
+            backend_ports: Ports of the gatewayd workers
+            **kwargs: Further TCPForwarder arguments (listen_host, backend_host, buffer_size)
+        """
+        super().__init__(listen_port, **kwargs)
+        self._next = 0
+        for port in backend_ports or []:
+            self.add_backend(port)
+
+    def add_backend(self, port: int) -> Backend:
+        """
+        Add a worker to the pool.
+
+        Args:
+            port: Worker port
+
+        Returns:
+            The Backend record
+        """
+        backend = self.backends.get(port)
+        if backend is None:
+            backend = self.backends[port] = Backend(self.backend_host, port)
+        return backend
+
+    def remove_backend(self, port: int):
+        """
+        Stop sending new connections to a worker (open ones are not touched).
+
+        Args:
+            port: Worker port
+        """
+        self.backends.pop(port, None)
+
+    def _select_backend(self, exclude: List[Backend]) -> Optional[Backend]:
+        """Pick the least-loaded backend that is not excluded or marked down."""
+        now = time.monotonic()
+        candidates = [b for b in self.backends.values() if b not in exclude]
+        healthy = [b for b in candidates if b.down_until <= now]
+        pool = healthy or candidates
+        if not pool:
+            return None
+
+        # Rotate the starting point so equal candidates share the load
+        self._next = (self._next + 1) % len(pool)
+        pool = pool[self._next:] + pool[:self._next]
+        return min(pool, key=lambda b: (
+            b.active, b.latency_ewma if b.latency_ewma is not None else 0.0
+        ))
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        Get per-backend connection and latency counters.
+
+        Returns:
+            One stats dictionary per backend, ordered by port
+        """
+        return [self.backends[port].stats() for port in sorted(self.backends)]
+
+
+def _set_nodelay(writer: asyncio.StreamWriter):
+    """Disable Nagle's algorithm so small streamed events are sent immediately."""
+    sock = writer.get_extra_info('socket')
+    if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            pass
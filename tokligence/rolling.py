@@ -0,0 +1,206 @@
+"""
+Zero-downtime (blue/green) restarts for the gateway daemon
+"""
+
+import os
+import signal
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from .daemon import Daemon
+from .proxy import TCPForwarder
+from .utils import ensure_config_dir
+
+
+class BlueGreenDaemon:
+    """
+    Run gatewayd behind a local TCP forwarder so restarts never refuse connections.
+
+    The forwarder owns the public ``port``; gatewayd alternates between two
+    backend ports. ``rolling_restart()`` starts the new process on the idle
+    port, waits for it to be ready, switches new connections over, waits for
+    the old process to drain and only then stops it.
+    """
+
+    def __init__(
+        self,
+        config_path: Optional[str] = None,
+        port: int = 8081,
+        backend_ports: Optional[Tuple[int, int]] = None,
+        drain_timeout: float = 30.0,
+        **daemon_kwargs: Any,
+    ):
+        """
+        Initialize the blue/green daemon.
+
+        Args:
+            config_path: Optional path to configuration file
+            port: Public port served by the forwarder
+            backend_ports: The two ports gatewayd alternates between
+                (default: port + 10000 and port + 10001)
+            drain_timeout: Seconds to let the old process finish open connections
+            **daemon_kwargs: Extra keyword arguments for each Daemon
+        """
+        backend_ports = backend_ports or (port + 10000, port + 10001)
+        self.port = port
+        self.drain_timeout = drain_timeout
+        self.slots: List[Daemon] = [
+            Daemon(
+                config_path=config_path,
+                port=backend_port,
+                instance=str(backend_port),
+                install_signal_handlers=False,
+                **daemon_kwargs,
+            )
+            for backend_port in backend_ports
+        ]
+        self.config_path = config_path
+        self.active = 0
+        self.forwarder = TCPForwarder(listen_port=port)
+
+    @property
+    def pid_file(self):
+        """PID file of the process owning the forwarder."""
+        return ensure_config_dir() / 'gatewayd-bluegreen.pid'
+
+    @property
+    def daemon(self) -> Daemon:
+        """The daemon currently receiving new connections."""
+        return self.slots[self.active]
+
+    def start(self, **kwargs: Any):
+        """
+        Start gatewayd on the active backend port and the forwarder on the public port.
+
+        Args:
+            **kwargs: Additional environment variables for gatewayd
+        """
+        self.daemon.start(background=True, **kwargs)
+        self.forwarder.set_backend(self.daemon.port)
+        self.forwarder.start()
+        self.pid_file.write_text(str(os.getpid()))
+
+    def rolling_restart(self, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Replace the running gatewayd without dropping connections.
+
+        If the new process fails to become ready, it is stopped and the old
+        one keeps serving.
+
+        Args:
+            **kwargs: Additional environment variables for the new gatewayd
+
+        Returns:
+            Dictionary with the old and new backend ports and whether the old
+            process drained before being stopped
+        """
+        old = self.daemon
+        new_index = 1 - self.active
+        new = self.slots[new_index]
+
+        new.start(background=True, **kwargs)
+        if not new.is_ready():
+            new.stop()
+            raise RuntimeError(f"New daemon on port {new.port} did not become ready")
+
+        self.forwarder.set_backend(new.port)
+        self.active = new_index
+
+        drained = self.forwarder.wait_drained(old.port, self.drain_timeout)
+        old.stop()
+        return {'old_port': old.port, 'new_port': new.port, 'drained': drained}
+
+    def stop(self):
+        """Stop the forwarder and both backends."""
+        self.forwarder.stop()
+        for daemon in self.slots:
+            daemon.stop()
+        if self.pid_file.exists():
+            self.pid_file.unlink()
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Get status of the forwarder and the active backend.
+
+        Returns:
+            Status dictionary
+        """
+        status = self.daemon.status()
+        status['port'] = self.port
+        status['backend_port'] = self.daemon.port
+        status['connections'] = {
+            port: backend.active for port, backend in self.forwarder.backends.items()
+        }
+        return status
+
+    def run(self, watch_config: bool = False):
+        """
+        Serve in the foreground until SIGTERM/SIGINT.
+
+        On Unix-like systems SIGHUP triggers a rolling restart, which is how
+        ``tokligence-daemon restart --zero-downtime`` reaches this process.
+
+        Args:
+            watch_config: Also roll over when a section gatewayd reads
+                (Daemon.RESTART_KEYS) changes in the configuration file
+        """
+        stop_event = threading.Event()
+        restart_event = threading.Event()
+        watcher = None
+        if watch_config:
+            from .config import Config
+            from .watch import matches_prefix
+
+            def on_change(changes, config):
+                if any(matches_prefix(k, Daemon.RESTART_KEYS) for k in changes):
+                    restart_event.set()
+
+            config = Config(self.config_path)
+            config.on_change(on_change)
+            watcher = config.watch()
+
+        def handle_stop(signum, frame):
+            stop_event.set()
+
+        def handle_restart(signum, frame):
+            restart_event.set()
+
+        signals = [signal.SIGTERM, signal.SIGINT]
+        previous = {sig: signal.signal(sig, handle_stop) for sig in signals}
+        if hasattr(signal, 'SIGHUP'):
+            previous[signal.SIGHUP] = signal.signal(signal.SIGHUP, handle_restart)
+
+        try:
+            self.start()
+            print(f"Serving on port {self.port} (backend port {self.daemon.port})")
+            while not stop_event.wait(0.2):
+                if restart_event.is_set():
+                    restart_event.clear()
+                    try:
+                        result = self.rolling_restart()
+                        print(f"Switched backend {result['old_port']} -> {result['new_port']}")
+                    except RuntimeError as e:
+                        print(f"Rolling restart failed, still serving old backend: {e}")
+        finally:
+            if watcher is not None:
+                watcher.stop()
+            self.stop()
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+
+
+def request_rolling_restart() -> bool:
+    """
+    Ask a running BlueGreenDaemon (started by another process) to restart.
+
+    Returns:
+        True if a blue/green daemon was found and signalled
+    """
+    pid_file = ensure_config_dir() / 'gatewayd-bluegreen.pid'
+    if not pid_file.exists() or not hasattr(signal, 'SIGHUP'):
+        return False
+
+    try:
+        os.kill(int(pid_file.read_text()), signal.SIGHUP)
+    except (ProcessLookupError, ValueError):
+        return False
+    return True
@@ -0,0 +1,288 @@
+"""
+Configuration schema with precompiled validators
+
+Each key maps to a small check function built once at import time; a check
+returns None for a valid value or an error message. Lookups are cached per
+key, so validating a full configuration is one dict lookup and one call per
+key. Keys without a schema entry are accepted, since gatewayd understands
+more settings than are listed here.
+"""
+
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+Check = Callable[[Any], Optional[str]]
+
+
+class ConfigValidationError(ValueError):
+    """Raised when configuration values do not match the schema."""
+
+    def __init__(self, errors: List[Tuple[str, str]]):
+        self.errors = errors
+        super().__init__('; '.join(f'{key}: {message}' for key, message in errors))
+
+
+def _str(nullable: bool = False) -> Check:
+    def check(value):
+        if isinstance(value, str) or (nullable and value is None):
+            return None
+        return f'expected a string, got {type(value).__name__}'
+    return check
+
+
+def _bool(strings: bool = False) -> Check:
+    def check(value):
+        if value is True or value is False:
+            return None
+        if strings and isinstance(value, str) and value.lower() in ('true', 'false'):
+            return None
+        return f'expected true or false, got {value!r}'
+    return check
+
+
+def _int(minimum: Optional[int] = None, maximum: Optional[int] = None) -> Check:
+    def check(value):
+        if not isinstance(value, int) or isinstance(value, bool):
+            return f'expected an integer, got {value!r}'
+        if minimum is not None and value < minimum:
+            return f'must be at least {minimum}'
+        if maximum is not None and value > maximum:
+            return f'must be at most {maximum}'
+        return None
+    return check
+
+
+def _enum(*choices: str) -> Check:
+    allowed = frozenset(choices)
+    listing = ', '.join(choices)
+
+    def check(value):
+        if value in allowed:
+            return None
+        return f'expected one of {listing}, got {value!r}'
+    return check
+
+
+_URL = re.compile(r'https?://[^\s/]+(/\S*)?$')
+_HOST_OR_URL = re.compile(r'(https?://)?[^\s/]+(/\S*)?$')
+
+
+def _url(scheme_optional: bool = False) -> Check:
+    pattern = _HOST_OR_URL if scheme_optional else _URL
+
+    def check(value):
+        if isinstance(value, str) and pattern.match(value):
+            return None
+        return f'expected an http(s) URL, got {value!r}'
+    return check
+
+
+_SIZE = re.compile(r'\s*\d+(\.\d+)?\s*([KMG]?B?)\s*$', re.IGNORECASE)
+
+
+def _size() -> Check:
+    def check(value):
+        if isinstance(value, int) and not isinstance(value, bool) and value >= 0:
+            return None
+        if isinstance(value, str) and _SIZE.match(value):
+            return None
+        return f"expected a size such as '100MB', got {value!r}"
+    return check
+
+
+def _list_of(item: Check) -> Check:
+    def check(value):
+        if not isinstance(value, list):
+            return f'expected a list, got {type(value).__name__}'
+        for i, element in enumerate(value):
+            error = item(element)
+            if error:
+                return f'item {i}: {error}'
+        return None
+    return check
+
+
+def _section() -> Check:
+    def check(value):
+        if isinstance(value, dict):
+            return None
+        return f'expected a mapping, got {type(value).__name__}'
+    return check
+
+
+_EMAIL = re.compile(r'[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+
+def _email() -> Check:
+    def check(value):
+        if isinstance(value, str) and _EMAIL.match(value):
+            return None
+        return f'expected an email address, got {value!r}'
+    return check
+
+
+def _walk(data: Dict[str, Any], prefix: str = '') -> Iterator[Tuple[str, Any]]:
+    """Yield (dotted key, value) for every addressable key, sections included."""
+    for key, value in data.items():
+        if not isinstance(key, str):
+            continue
+        path = prefix + key
+        yield path, value
+        if isinstance(value, dict):
+            yield from _walk(value, path + '.')
+
+
+class Schema:
+    """A set of dotted-key checks; a ``*`` segment matches any single key."""
+
+    def __init__(self, checks: Dict[str, Check]):
+        """
+        Compile the schema.
+
+        Args:
+            checks: {dotted key pattern: check function}
+        """
+        self._exact = {k: v for k, v in checks.items() if '*' not in k}
+        self._wildcards: Dict[int, Dict[str, Check]] = {}
+        for pattern, check in checks.items():
+            if '*' in pattern:
+                position = pattern.split('.').index('*')
+                self._wildcards.setdefault(position, {})[pattern] = check
+        self._resolved: Dict[str, Optional[Check]] = {}
+
+    def keys(self) -> List[str]:
+        """Return every key pattern in the schema."""
+        return list(self._exact) + [p for table in self._wildcards.values() for p in table]
+
+    def check_for(self, key: str) -> Optional[Check]:
+        """
+        Get the check for a concrete key.
+
+        Args:
+            key: Dotted configuration key
+
+        Returns:
+            The check function, or None if the key is not in the schema
+        """
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+
+        check = self._exact.get(key)
+        if check is None and self._wildcards:
+            parts = key.split('.')
+            for position, table in self._wildcards.items():
+                if position < len(parts):
+                    pattern = '.'.join(parts[:position] + ['*'] + parts[position + 1:])
+                    check = table.get(pattern)
+                    if check is not None:
+                        break
+        self._resolved[key] = check
+        return check
+
+    def errors(self, data: Dict[str, Any], prefix: str = '') -> List[Tuple[str, str]]:
+        """
+        Validate a (partial) configuration.
+
+        Args:
+            data: Configuration dictionary
+            prefix: Dotted key at which data sits (for partial updates)
+
+        Returns:
+            (key, message) pairs; empty if everything is valid
+        """
+        errors = []
+        check_for = self.check_for
+        for key, value in _walk(data, prefix + '.' if prefix else ''):
+            check = check_for(key)
+            if check is not None:
+                message = check(value)
+                if message:
+                    errors.append((key, message))
+        return errors
+
+    def validate(self, data: Dict[str, Any], prefix: str = ''):
+        """
+        Validate a (partial) configuration.
+
+        Args:
+            data: Configuration dictionary
+            prefix: Dotted key at which data sits
+
+        Raises:
+            ConfigValidationError: If any value is invalid
+        """
+        errors = self.errors(data, prefix)
+        if errors:
+            raise ConfigValidationError(errors)
+
+    def validate_value(self, key: str, value: Any):
+        """
+        Validate one value (and everything under it, if it is a mapping).
+
+        Args:
+            key: Dotted configuration key
+            value: New value
+
+        Raises:
+            ConfigValidationError: If the value is invalid
+        """
+        check = self.check_for(key)
+        message = check(value) if check is not None else None
+        errors = [(key, message)] if message else []
+        if isinstance(value, dict):
+            errors.extend(self.errors(value, key))
+        if errors:
+            raise ConfigValidationError(errors)
+
+
+# Keys of Config.get_defaults()
+CONFIG_SCHEMA = Schema({
+    'gateway': _section(),
+    'gateway.host': _str(),
+    'gateway.port': _int(1, 65535),
+    'gateway.auth': _section(),
+    'gateway.auth.enabled': _bool(),
+    'gateway.auth.type': _str(),
+    'gateway.logging': _section(),
+    'gateway.logging.level': _enum('debug', 'info', 'warn', 'warning', 'error'),
+    'gateway.logging.file': _str(nullable=True),
+    'gateway.logging.max_size': _size(),
+    'gateway.logging.max_days': _int(0),
+    'database': _section(),
+    'database.type': _enum('sqlite', 'postgres', 'postgresql'),
+    'database.path': _str(),
+    'providers': _section(),
+    'providers.*': _section(),
+    'providers.*.enabled': _bool(),
+    'providers.*.api_key': _str(nullable=True),
+    'providers.*.base_url': _url(),
+    'providers.*.models': _list_of(_str()),
+    'marketplace': _section(),
+    'marketplace.enabled': _bool(),
+    'marketplace.api_url': _url(),
+    'marketplace.update_check': _bool(),
+})
+
+# Flat gateway settings accepted by the chat assistant's set_config tool
+# (values arrive as strings)
+SETTINGS_SCHEMA = Schema({
+    'email': _email(),
+    'display_name': _str(),
+    'base_url': _url(scheme_optional=True),
+    'marketplace_enabled': _bool(strings=True),
+    'telemetry_enabled': _bool(strings=True),
+    'auth_secret': _str(),
+    'auth_disabled': _bool(strings=True),
+    'openai_api_key': _str(),
+    'openai_base_url': _url(),
+    'anthropic_api_key': _str(),
+    'anthropic_base_url': _url(),
+    'google_api_key': _str(),
+    'work_mode': _enum('auto', 'passthrough', 'translation'),
+    'model_provider_routes': _str(),
+    'log_level': _enum('debug', 'info', 'warn', 'error'),
+    'ledger_path': _str(),
+    'identity_path': _str(),
+})
@@ -0,0 +1,320 @@
+"""
+Supervisor running several gatewayd workers on a range of ports
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from .daemon import Daemon
+from .proxy import LoadBalancer
+from .utils import ensure_config_dir, pid_alive, wait_for
+
+
+def _read_pid(pid_file: Path) -> Optional[int]:
+    """PID stored in a PID file, or None if there is no readable one."""
+    try:
+        return int(pid_file.read_text().strip())
+    except (OSError, ValueError):
+        return None
+
+
+class Supervisor:
+    """
+    Spawn and monitor N gatewayd workers.
+
+    Worker ``i`` listens on ``base_port + i`` and has its own PID and log files
+    (``gatewayd-<port>.pid``). A monitor thread restarts workers that exit,
+    backing off exponentially when a worker keeps crashing.
+
+    With ``proxy_port`` set, a LoadBalancer on that port spreads client
+    connections over the workers (least outstanding connections first).
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        base_port: int = 8081,
+        config_path: Optional[str] = None,
+        check_interval: float = 0.5,
+        restart_delay: float = 0.5,
+        max_restart_delay: float = 30.0,
+        stable_after: float = 30.0,
+        proxy_port: Optional[int] = None,
+        **daemon_kwargs: Any,
+    ):
+        """
+        Initialize the supervisor.
+
+        Args:
+            workers: Number of gatewayd processes to run
+            base_port: Port of the first worker; the others use consecutive ports
+            config_path: Optional path to configuration file
+            check_interval: Seconds between liveness checks
+            restart_delay: Delay before the first restart of a crashed worker
+            max_restart_delay: Upper bound for the restart backoff
+            stable_after: Seconds a worker must stay up to reset its backoff
+            proxy_port: Optional public port for a load-balancing front proxy
+            **daemon_kwargs: Extra keyword arguments for each Daemon
+                (e.g. health_path, ready_timeout)
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+
+        self.config_path = config_path
+        self.check_interval = check_interval
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.stable_after = stable_after
+        self.daemons: List[Daemon] = [
+            Daemon(
+                config_path=config_path,
+                port=base_port + i,
+                instance=str(base_port + i),
+                install_signal_handlers=False,
+                **daemon_kwargs,
+            )
+            for i in range(workers)
+        ]
+        self.restarts = [0] * workers
+        self._failures = [0] * workers
+        self._started_at = [0.0] * workers
+        self._next_restart = [0.0] * workers
+        self._stop_event = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.proxy: Optional[LoadBalancer] = None
+        if proxy_port is not None:
+            self.proxy = LoadBalancer(proxy_port, [d.port for d in self.daemons])
+
+    @property
+    def pid_file(self) -> Path:
+        """PID file of a supervisor running in the background."""
+        return ensure_config_dir() / 'gatewayd-supervisor.pid'
+
+    @property
+    def stats_file(self) -> Path:
+        """File where a running supervisor publishes its proxy counters."""
+        return ensure_config_dir() / 'gatewayd-proxy-stats.json'
+
+    def start(self):
+        """Start all workers and the monitor thread."""
+        # Launch everything first, then wait, so startup takes one ready_timeout
+        # rather than one per worker.
+        for i, daemon in enumerate(self.daemons):
+            daemon.start(background=True, wait_ready=False)
+            self._started_at[i] = time.monotonic()
+
+        for daemon in self.daemons:
+            daemon._wait_started()
+
+        if self.proxy is not None:
+            self.proxy.start()
+
+        self._stop_event.clear()
+        self._monitor = threading.Thread(target=self._monitor_loop, name='gatewayd-supervisor',
+                                         daemon=True)
+        self._monitor.start()
+
+    def _monitor_loop(self):
+        """Restart workers that exited until stop() is called."""
+        while not self._stop_event.wait(self.check_interval):
+            self.check_workers()
+            if self.proxy is not None:
+                self._write_proxy_stats()
+
+    def _write_proxy_stats(self):
+        """Publish proxy counters so `status` works from another process."""
+        data = {'port': self.proxy.listen_port, 'backends': self.proxy.stats()}
+        tmp = self.stats_file.with_suffix('.tmp')
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, self.stats_file)
+
+    def check_workers(self):
+        """Restart any worker whose process has exited (respecting backoff)."""
+        now = time.monotonic()
+        with self._lock:
+            for i, daemon in enumerate(self.daemons):
+                if self._stop_event.is_set():
+                    return
+                process = daemon.process
+                if process is not None and process.poll() is None:
+                    if now - self._started_at[i] >= self.stable_after:
+                        self._failures[i] = 0
+                    continue
+
+                if now < self._next_restart[i]:
+                    continue
+
+                self._failures[i] += 1
+                self.restarts[i] += 1
+                delay = min(self.restart_delay * 2 ** (self._failures[i] - 1),
+                            self.max_restart_delay)
+                self._next_restart[i] = now + delay
+
+                try:
+                    daemon.start(background=True)
+                    self._started_at[i] = time.monotonic()
+                except RuntimeError as e:
+                    print(f"Worker on port {daemon.port} failed to restart: {e}")
+
+    def stop(self):
+        """
+        Stop the monitor and all workers.
+
+        Workers this Supervisor did not start (e.g. when called from a new
+        process after the background supervisor is gone) are found through
+        their PID files and stopped with SIGTERM, then SIGKILL.
+        """
+        self._stop_event.set()
+        if self._monitor is not None and self._monitor is not threading.current_thread():
+            self._monitor.join()
+        self._monitor = None
+
+        if self.proxy is not None:
+            self.proxy.stop()
+            if self.stats_file.exists():
+                self.stats_file.unlink()
+
+        with self._lock:
+            # Signal every worker first so they shut down in parallel
+            orphans = []
+            for daemon in self.daemons:
+                if daemon.process and daemon.process.poll() is None:
+                    daemon.process.terminate()
+                else:
+                    pid = _read_pid(daemon.pid_file)
+                    if pid is not None and pid_alive(pid):
+                        os.kill(pid, signal.SIGTERM)
+                        orphans.append((daemon, pid))
+
+            for daemon, pid in orphans:
+                if not wait_for(lambda: not pid_alive(pid), daemon.stop_timeout):
+                    os.kill(pid, getattr(signal, 'SIGKILL', signal.SIGTERM))
+                    wait_for(lambda: not pid_alive(pid), daemon.stop_timeout)
+
+            # Reaps handled workers and removes every PID file
+            for daemon in self.daemons:
+                daemon.stop()
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Get aggregated worker status.
+
+        Returns:
+            Status dictionary with one entry per worker
+        """
+        workers = []
+        for i, daemon in enumerate(self.daemons):
+            worker = daemon.status()
+            worker['port'] = daemon.port
+            worker['restarts'] = self.restarts[i]
+            workers.append(worker)
+
+        running = sum(1 for w in workers if w['status'] == 'running')
+        if running == len(workers):
+            status = 'running'
+        elif running:
+            status = 'degraded'
+        else:
+            status = 'stopped'
+
+        result = {
+            'status': status,
+            'running': running,
+            'workers': workers,
+            'total': len(workers),
+        }
+        if self.proxy is not None and self.proxy._thread is not None:
+            result['proxy'] = {'port': self.proxy.listen_port, 'backends': self.proxy.stats()}
+        elif self.stats_file.exists():
+            try:
+                result['proxy'] = json.loads(self.stats_file.read_text())
+            except (OSError, ValueError):
+                pass
+        return result
+
+    def run(self):
+        """Start the workers and supervise them in the foreground until signalled."""
+        def handle_signal(signum, frame):
+            self._stop_event.set()
+
+        previous = {sig: signal.signal(sig, handle_signal)
+                    for sig in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            self.pid_file.write_text(str(os.getpid()))
+            self.start()
+            print(f"Supervising {len(self.daemons)} workers on ports "
+                  f"{self.daemons[0].port}-{self.daemons[-1].port}")
+            if self.proxy is not None:
+                print(f"Load balancing on port {self.proxy.listen_port}")
+            while not self._stop_event.wait(1.0):
+                pass
+        finally:
+            self.stop()
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+            if self.pid_file.exists():
+                self.pid_file.unlink()
+
+    def spawn_background(self, extra_args: Optional[List[str]] = None) -> int:
+        """
+        Run the supervisor as a detached `tokligence-daemon` process.
+
+        Args:
+            extra_args: Additional command line arguments for the child
+
+        Returns:
+            PID of the background supervisor
+        """
+        cmd = [
+            sys.executable, '-m', 'tokligence.daemon', 'start',
+            '--workers', str(len(self.daemons)),
+            '--port', str(self.daemons[0].port),
+        ]
+        if self.config_path:
+            cmd.extend(['--config', self.config_path])
+        if self.proxy is not None:
+            cmd.extend(['--proxy-port', str(self.proxy.listen_port)])
+        cmd.extend(extra_args or [])
+
+        log_dir = ensure_config_dir() / 'logs'
+        log_dir.mkdir(exist_ok=True)
+        with open(log_dir / 'gatewayd-supervisor.log', 'a') as log:
+            process = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT,
+                                       start_new_session=True)
+
+        # Ready once every worker answers its probe
+        wait_for(lambda: process.poll() is not None
+                 or all(d.is_ready() for d in self.daemons),
+                 self.daemons[0].ready_timeout)
+        if process.poll() is not None:
+            raise RuntimeError(f"Supervisor exited during startup (exit code {process.returncode})")
+        return process.pid
+
+    def stop_background(self, timeout: float = 30.0) -> bool:
+        """
+        Stop a supervisor running in the background (it stops its workers).
+
+        Args:
+            timeout: Seconds to wait for the supervisor to exit
+
+        Returns:
+            True if a background supervisor was found and has exited
+        """
+        pid_file = self.pid_file
+        if not pid_file.exists():
+            return False
+
+        pid = int(pid_file.read_text())
+        if not pid_alive(pid):
+            pid_file.unlink()
+            return False
+
+        os.kill(pid, signal.SIGTERM)
+        return wait_for(lambda: not pid_alive(pid), timeout)
@@ -4,17 +4,30 @@ Utility functions for tokligence
 
 import os
 import sys
+import json
 import platform
 import shutil
+import socket
 import stat
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Callable, Dict, Optional, Tuple
 
+# Directory holding the bundled gateway/gatewayd binaries
+BINARIES_DIR = Path(__file__).parent / 'binaries'
 
+# Process-wide cache of resolved binary paths, keyed by binary name
+_binary_cache: Dict[str, Path] = {}
+
+
+@lru_cache(maxsize=None)
 def get_platform_info() -> Tuple[str, str]:
     """
     Get the current platform and architecture.
 
+    The result is cached for the lifetime of the process.
+
     Returns:
         Tuple of (os_name, arch) e.g., ('linux', 'amd64')
     """
@@ -42,16 +55,107 @@ def get_platform_info() -> Tuple[str, str]:
     return os_name, arch
 
 
+def _binary_cache_file() -> Optional[Path]:
+    """
+    Get the on-disk binary cache file, if enabled via TOKLIGENCE_BINARY_CACHE.
+
+    Returns:
+        Path to the cache file, or None when the on-disk cache is disabled
+    """
+    if os.environ.get('TOKLIGENCE_BINARY_CACHE', '').lower() not in ('1', 'true', 'yes'):
+        return None
+    return ensure_config_dir() / 'binary_cache.json'
+
+
+def _read_disk_cache(binary_name: str) -> Optional[Path]:
+    """
+    Look up a binary in the on-disk cache.
+
+    An entry is valid only for the same package version and binary mtime.
+
+    Args:
+        binary_name: Name of the binary
+
+    Returns:
+        Cached path if the entry is still valid, None otherwise
+    """
+    cache_file = _binary_cache_file()
+    if cache_file is None:
+        return None
+
+    try:
+        entry = json.loads(cache_file.read_text()).get(binary_name)
+        if not entry:
+            return None
+
+        from . import __version__
+        binary_path = Path(entry['path'])
+        if entry.get('version') != __version__:
+            return None
+        if os.stat(binary_path).st_mtime_ns != entry.get('mtime_ns'):
+            return None
+        return binary_path
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_disk_cache(binary_name: str, binary_path: Path, mtime_ns: int):
+    """
+    Record a resolved binary in the on-disk cache (best effort).
+
+    Args:
+        binary_name: Name of the binary
+        binary_path: Resolved path
+        mtime_ns: Modification time of the binary when it was validated
+    """
+    cache_file = _binary_cache_file()
+    if cache_file is None:
+        return
+
+    from . import __version__
+    try:
+        try:
+            entries = json.loads(cache_file.read_text())
+        except (OSError, ValueError):
+            entries = {}
+        entries[binary_name] = {
+            'path': str(binary_path),
+            'version': __version__,
+            'mtime_ns': mtime_ns,
+        }
+        cache_file.write_text(json.dumps(entries))
+    except OSError:
+        pass
+
+
+def clear_binary_cache():
+    """Forget all resolved binary paths cached in this process."""
+    _binary_cache.clear()
+
+
 def get_binary_path(binary_name: str) -> Path:
     """
     Get the path to the bundled binary.
 
+    The first call validates the binary with a single stat (and a chmod only
+    if the executable bit is missing); later calls return the cached path
+    without touching the filesystem.
+
     Args:
         binary_name: Name of the binary ('gateway' or 'gatewayd')
 
     Returns:
         Path to the binary executable
     """
+    cached = _binary_cache.get(binary_name)
+    if cached is not None:
+        return cached
+
+    cached = _read_disk_cache(binary_name)
+    if cached is not None:
+        _binary_cache[binary_name] = cached
+        return cached
+
     os_name, arch = get_platform_info()
 
     # Add .exe extension for Windows
@@ -59,13 +163,12 @@ def get_binary_path(binary_name: str) -> Path:
 
     # Construct binary filename
     binary_file = f"{binary_name}-{os_name}-{arch}{suffix}"
-
-    # Get the package directory
-    package_dir = Path(__file__).parent
-    binary_path = package_dir / 'binaries' / binary_file
+    binary_path = BINARIES_DIR / binary_file
 
     # Check if binary exists
-    if not binary_path.exists():
+    try:
+        st = os.stat(binary_path)
+    except FileNotFoundError:
         raise FileNotFoundError(
             f"Binary not found: {binary_path}\n"
             f"Platform: {os_name}/{arch}\n"
@@ -75,10 +178,11 @@ def get_binary_path(binary_name: str) -> Path:
         )
 
     # Ensure binary is executable (Unix-like systems)
-    if os_name != 'windows':
-        st = os.stat(binary_path)
+    if os_name != 'windows' and not st.st_mode & stat.S_IEXEC:
         os.chmod(binary_path, st.st_mode | stat.S_IEXEC)
 
+    _binary_cache[binary_name] = binary_path
+    _write_disk_cache(binary_name, binary_path, st.st_mtime_ns)
     return binary_path
 
 
@@ -92,6 +196,11 @@ def find_available_binary(binary_name: str) -> Optional[Path]:
     Returns:
         Path to the binary if found, None otherwise
     """
+    # A PATH lookup is only cached after the bundled binary was found missing
+    cache_key = f'path:{binary_name}'
+    if cache_key in _binary_cache:
+        return _binary_cache[cache_key]
+
     # First, try to get the bundled binary
     try:
         return get_binary_path(binary_name)
@@ -101,7 +210,8 @@ def find_available_binary(binary_name: str) -> Optional[Path]:
     # Fall back to system PATH
     system_binary = shutil.which(binary_name)
     if system_binary:
-        return Path(system_binary)
+        _binary_cache[cache_key] = Path(system_binary)
+        return _binary_cache[cache_key]
 
     return None
 
@@ -131,4 +241,111 @@ def get_default_config_path() -> Path:
     Returns:
         Path to the default config file
     """
-    return ensure_config_dir() / 'config.yaml'
\ No newline at end of file
+    return ensure_config_dir() / 'config.yaml'
+
+
+def wait_for(
+    predicate: Callable[[], bool],
+    timeout: float,
+    initial_delay: float = 0.005,
+    max_delay: float = 0.25,
+) -> bool:
+    """
+    Poll a predicate with exponential backoff until it is true or the deadline passes.
+
+    Args:
+        predicate: Callable returning True once the awaited condition holds
+        timeout: Deadline in seconds
+        initial_delay: First sleep between polls, doubled after every miss
+        max_delay: Upper bound for the sleep between polls
+
+    Returns:
+        True if the predicate became true before the deadline
+    """
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+
+    while True:
+        if predicate():
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
+
+
+def probe_tcp(host: str, port: int, timeout: float = 0.25) -> bool:
+    """
+    Check whether something accepts TCP connections on host:port.
+
+    Args:
+        host: Host to connect to
+        port: Port to connect to
+        timeout: Connect timeout in seconds
+
+    Returns:
+        True if the connection succeeded
+    """
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def probe_http(host: str, port: int, path: str, timeout: float = 0.5) -> bool:
+    """
+    Check whether an HTTP endpoint on host:port answers with a 2xx status.
+
+    Args:
+        host: Host to connect to
+        port: Port to connect to
+        path: Request path, e.g. '/health'
+        timeout: Connect and read timeout in seconds
+
+    Returns:
+        True if the endpoint returned a 2xx response
+    """
+    import http.client
+
+    conn = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        conn.request('GET', path)
+        return 200 <= conn.getresponse().status < 300
+    except (OSError, http.client.HTTPException):
+        return False
+    finally:
+        conn.close()
+
+
+def pid_alive(pid: int) -> bool:
+    """
+    Check whether a process with the given PID exists.
+
+    Uses psutil when installed. Without psutil the check is only possible on
+    Unix-like systems; on Windows the process is reported as not running.
+
+    Args:
+        pid: Process ID
+
+    Returns:
+        True if the process exists
+    """
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        pass
+
+    if os.name == 'nt':
+        return False
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # The process exists but belongs to another user
+        return True
+    return True
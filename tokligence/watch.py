@@ -0,0 +1,164 @@
+"""
+Watch a configuration file and reload it when it changes
+
+On Linux the file's directory is watched with inotify (editors often replace
+files by renaming, so watching the file itself would miss updates); elsewhere,
+or if inotify is unavailable, the file is polled with stat().
+"""
+
+import os
+import select
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .config import Config
+
+# inotify event masks (linux/inotify.h)
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+
+def _inotify_fd(directory: str) -> Optional[int]:
+    """Return a non-blocking inotify descriptor watching directory, or None if unsupported."""
+    if not hasattr(os, 'O_NONBLOCK') or not os.path.isdir(directory):
+        return None
+    try:
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        init = libc.inotify_init1
+        add_watch = libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+
+    fd = init(os.O_NONBLOCK | os.O_CLOEXEC)
+    if fd < 0:
+        return None
+    if add_watch(fd, os.fsencode(directory), _IN_WATCH_MASK) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def file_signature(path) -> Optional[Tuple[int, int, int]]:
+    """
+    Return a cheap change signature for a file.
+
+    Args:
+        path: File path
+
+    Returns:
+        (inode, size, mtime_ns), or None if the file does not exist
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+class ConfigWatcher:
+    """
+    Background thread that reloads a Config when its file changes.
+
+    The file is only re-read when its stat signature changes, and a file that
+    fails to parse (e.g. caught halfway through a write) keeps the previous
+    configuration until the next change.
+    """
+
+    def __init__(self, config: 'Config', interval: float = 1.0, use_inotify: bool = True):
+        """
+        Initialize the watcher.
+
+        Args:
+            config: Config to reload
+            interval: Polling interval in seconds (also the stop latency with inotify)
+            use_inotify: Use inotify where available
+        """
+        self.config = config
+        self.interval = interval
+        self.use_inotify = use_inotify
+        self.backend = 'poll'
+        self._signature = file_signature(config.config_path)
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._fd: Optional[int] = None
+
+    def check(self) -> Dict[str, Tuple[Any, Any]]:
+        """
+        Reload the configuration if the file changed since the last check.
+
+        Returns:
+            Changed keys (see Config.reload); empty if nothing changed
+        """
+        signature = file_signature(self.config.config_path)
+        if signature == self._signature:
+            return {}
+        self._signature = signature
+        try:
+            return self.config.reload()
+        except Exception as e:
+            print(f"Warning: reloading {self.config.config_path} failed: {e}")
+            return {}
+
+    def start(self) -> 'ConfigWatcher':
+        """Start watching in a background thread."""
+        if self._thread is not None:
+            return self
+
+        if self.use_inotify:
+            self._fd = _inotify_fd(str(self.config.config_path.parent))
+        self.backend = 'inotify' if self._fd is not None else 'poll'
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='tokligence-config-watcher',
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        """Wait for file events (or the poll interval) and reload on change."""
+        while not self._stop_event.is_set():
+            if self._fd is not None:
+                readable, _, _ = select.select([self._fd], [], [], self.interval)
+                if not readable:
+                    continue
+                try:
+                    while os.read(self._fd, 65536):
+                        pass
+                except BlockingIOError:
+                    pass
+                # Let a burst of writes settle before reading the file
+                if self._stop_event.wait(0.02):
+                    break
+            elif self._stop_event.wait(self.interval):
+                break
+            self.check()
+
+    def stop(self):
+        """Stop the background thread."""
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def matches_prefix(key: str, prefixes) -> bool:
+    """
+    Check whether a dotted key lies under any of the given prefixes.
+
+    Args:
+        key: Dotted configuration key (e.g. 'gateway.port')
+        prefixes: Dotted prefixes (e.g. ('gateway', 'providers.openai'))
+
+    Returns:
+        True if key equals or is nested under one of the prefixes
+    """
+    return any(key == p or key.startswith(p + '.') for p in prefixes)
@@ -0,0 +1,253 @@
+"""
+Persistent worker protocol for the Tokligence Gateway CLI
+
+Instead of forking the ``gateway`` binary for every command, a single child
+process is kept alive and fed one request per line on stdin. Each request is
+answered with one JSON line on stdout:
+
+    -> {"id": 1, "args": ["user", "list", "--json"]}
+    <- {"id": 1, "returncode": 0, "stdout": "[...]", "stderr": ""}
+
+A new worker is first sent a handshake request, which runs no command:
+
+    -> {"id": 0, "handshake": true}
+    <- {"id": 0, "returncode": 0, "stdout": "", "stderr": ""}
+"""
+
+import json
+import queue
+import subprocess
+import sys
+import threading
+from typing import Any, Callable, Dict, IO, List, Optional, Tuple
+
+# Seconds a new worker may take to answer the handshake
+HANDSHAKE_TIMEOUT = 5.0
+
+# Seconds a command may take before the worker is considered hung
+CALL_TIMEOUT = 60.0
+
+
+class WorkerUnavailable(RuntimeError):
+    """Raised when the worker process does not speak the worker protocol."""
+
+
+class GatewayWorker:
+    """
+    Client side of the line-delimited JSON worker protocol.
+
+    A worker is started lazily on the first call and reused until ``close()``.
+    Calls are serialized with a lock, so one worker can be shared by threads.
+
+    Replies are read by a background thread, so every read has a deadline: a
+    worker that does not answer the handshake in time is reported as
+    unavailable, and one that hangs on a command is killed.
+    """
+
+    def __init__(self, command: List[str], env: Optional[Dict[str, str]] = None,
+                 handshake_timeout: float = HANDSHAKE_TIMEOUT,
+                 timeout: Optional[float] = CALL_TIMEOUT):
+        """
+        Initialize the worker client.
+
+        Args:
+            command: Command line that starts the worker process
+            env: Optional environment for the worker process
+            handshake_timeout: Seconds a new worker may take to answer the handshake
+            timeout: Seconds a command may take (None for no limit)
+        """
+        self.command = command
+        self.env = env
+        self.handshake_timeout = handshake_timeout
+        self.timeout = timeout
+        self.process: Optional[subprocess.Popen] = None
+        self._replies: Optional[queue.Queue] = None
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def start(self):
+        """
+        Start the worker process if it is not already running.
+
+        Raises:
+            WorkerUnavailable: If the process does not answer the handshake
+        """
+        if self.process and self.process.poll() is None:
+            return
+
+        try:
+            self.process = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                env=self.env,
+                text=True,
+                bufsize=1,
+            )
+        except OSError as e:
+            raise WorkerUnavailable(f"Cannot start worker: {e}")
+
+        self._replies = queue.Queue()
+        threading.Thread(target=self._read_replies, args=(self.process.stdout, self._replies),
+                         name='tokligence-worker-reader', daemon=True).start()
+
+        # Nothing has run yet, so any failure here is safe to fall back from
+        try:
+            self._exchange({"id": 0, "handshake": True}, self.handshake_timeout)
+        except RuntimeError as e:
+            self._terminate()
+            raise WorkerUnavailable(f"Worker did not answer the handshake ({e}): "
+                                    f"{' '.join(self.command)}")
+
+    @staticmethod
+    def _read_replies(stdout: IO[str], replies: queue.Queue):
+        """Move reply lines into a queue until EOF (signalled by an empty string)."""
+        try:
+            for line in stdout:
+                replies.put(line)
+        except (OSError, ValueError):
+            pass
+        finally:
+            replies.put("")
+            try:
+                stdout.close()
+            except OSError:
+                pass
+
+    def _exchange(self, request: Dict[str, Any], timeout: Optional[float]) -> Dict[str, Any]:
+        """
+        Send one request and wait for its reply.
+
+        Raises:
+            RuntimeError: If the worker died, timed out or replied out of protocol
+                (the worker is stopped in every case)
+        """
+        try:
+            self.process.stdin.write(json.dumps(request) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError):
+            pass  # The reader reports the exit
+
+        try:
+            line = self._replies.get(timeout=timeout)
+        except queue.Empty:
+            self._terminate(kill=True)
+            raise RuntimeError(f"Gateway worker did not reply within {timeout:g}s")
+
+        if not line:
+            self._terminate()
+            raise RuntimeError("Gateway worker exited unexpectedly")
+
+        try:
+            reply = json.loads(line)
+        except json.JSONDecodeError:
+            self._terminate()
+            raise RuntimeError(f"Invalid reply from gateway worker: {line.strip()}")
+
+        if not isinstance(reply, dict) or reply.get("id") != request["id"]:
+            self._terminate()
+            got = reply.get("id") if isinstance(reply, dict) else reply
+            raise RuntimeError(
+                f"Gateway worker reply id mismatch: expected {request['id']}, got {got}"
+            )
+        return reply
+
+    def call(self, args: List[str]) -> subprocess.CompletedProcess:
+        """
+        Run one gateway command through the worker.
+
+        Args:
+            args: Command arguments, as they would be passed to the binary
+
+        Returns:
+            CompletedProcess instance with the captured output
+
+        Raises:
+            WorkerUnavailable: If a new worker failed the handshake (the command
+                was not sent, so it is safe to run it another way)
+            RuntimeError: If the worker died, timed out or replied out of
+                protocol after the command was sent (it may have run)
+        """
+        with self._lock:
+            self.start()
+            self._next_id += 1
+            reply = self._exchange({"id": self._next_id, "args": args}, self.timeout)
+            return subprocess.CompletedProcess(
+                args=args,
+                returncode=int(reply.get("returncode", 1)),
+                stdout=reply.get("stdout", ""),
+                stderr=reply.get("stderr", ""),
+            )
+
+    def close(self):
+        """Shut the worker down, closing its stdin and waiting for it to exit."""
+        with self._lock:
+            self._terminate()
+
+    def _terminate(self, kill: bool = False):
+        """Stop the worker process without taking the lock."""
+        if not self.process:
+            return
+
+        process, self.process = self.process, None
+        if kill:
+            process.kill()
+        try:
+            if process.stdin:
+                process.stdin.close()
+        except OSError:
+            pass
+
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def __enter__(self) -> "GatewayWorker":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+Handler = Callable[[List[str]], Tuple[int, str, str]]
+
+
+def serve(handler: Handler, stdin: Optional[IO[str]] = None, stdout: Optional[IO[str]] = None):
+    """
+    Serve the worker protocol until stdin is closed.
+
+    This is the server half of the protocol. It is used as a stand-in worker
+    for tests and benchmarks, and documents what a worker must implement.
+
+    Args:
+        handler: Callable taking the command args and returning
+            (returncode, stdout, stderr)
+        stdin: Input stream (default: sys.stdin)
+        stdout: Output stream (default: sys.stdout)
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+
+    for line in stdin:
+        if not line.strip():
+            continue
+
+        request: Dict[str, Any] = json.loads(line)
+        if request.get("handshake"):
+            returncode, out, err = 0, "", ""
+        else:
+            try:
+                returncode, out, err = handler(request.get("args", []))
+            except Exception as e:
+                returncode, out, err = 1, "", str(e)
+
+        stdout.write(json.dumps({
+            "id": request.get("id"),
+            "returncode": returncode,
+            "stdout": out,
+            "stderr": err,
+        }) + "\n")
+        stdout.flush()